@@ -1,10 +1,17 @@
+import asyncio
 import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from pymongo import AsyncMongoClient
 
 from app.api.routes.root_router import RootRouter
-from app.page_handler.handler import MetalArchivesPageHandler
+from app.core.config import settings
+from app.db.band_search import band_search_index
+from app.db.indexes import IndexManager
+from app.db.stats_counters import StatsCounters
+from app.page_handler.async_handler import AsyncPageHandler
 from app.middleware.auth import AuthMiddleware
 
 MONGO_HOST = os.environ.get('MONGO_HOST', 'localhost')
@@ -15,11 +22,12 @@ MONGO_DB = os.environ.get('MONGO_DB', 'ma')
 
 
 class MetalParserAPI(FastAPI):
-    def __init__(self, page_handler: MetalArchivesPageHandler, *args, **kwargs):
+    def __init__(self, page_handler: AsyncPageHandler, *args, **kwargs):
         super().__init__(
             title="Metal Archives Parser API",
             description="API для парсинга страниц Metal-Archives.com",
             version='1.0.0',
+            lifespan=self._lifespan,
             *args, **kwargs,
         )
         self.page_handler = page_handler
@@ -33,6 +41,9 @@ class MetalParserAPI(FastAPI):
 
         client = AsyncMongoClient(f'mongodb://{MONGO_USER}:{MONGO_PASS}@{MONGO_HOST}:{MONGO_PORT}/')
         db = client[MONGO_DB]
+        self.db = db
+        self.indexes = IndexManager(db)
+        self.stats_counters = StatsCounters(db)
         self.add_middleware(
             AuthMiddleware,
             users_collection=db['users'],
@@ -41,3 +52,24 @@ class MetalParserAPI(FastAPI):
 
         router = RootRouter(page_handler=self.page_handler, db=db)
         self.include_router(router=router)
+
+    @asynccontextmanager
+    async def _lifespan(self, app: FastAPI):
+        # Индексы строятся в фоне: недоступная база или долгое построение не задерживают запуск
+        tasks = [asyncio.create_task(self._ensure_indexes()), asyncio.create_task(self.stats_counters.run())]
+        if settings.BAND_SEARCH_INDEX_ENABLED:
+            tasks.append(asyncio.create_task(band_search_index.load(self.db.bands)))
+        try:
+            yield
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _ensure_indexes(self):
+        report = await self.indexes.ensure()
+        for collection, status in report.items():
+            for key in ('created', 'missing', 'conflicting', 'undeclared', 'unused'):
+                if status[key]:
+                    print(f"Индексы {collection}, {key}: {', '.join(status[key])}")
+            for name, error in status['failed'].items():
+                print(f"Не удалось создать индекс {collection}.{name}: {error}")
@@ -3,20 +3,26 @@ import dataclasses
 from urllib.parse import quote, urlencode
 
 from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
 from pymongo import AsyncMongoClient
 
 from app.api.routes.band.models import SearchByResponse
+from app.api.streaming import ndjson_response, ndjson_walk_response
+from app.db.stats_counters import StatsCounters, track_counts
 from app.page_handler.data_parser.models import AlbumInformation, Track
-from app.page_handler.handler import MetalArchivesPageHandler
+from app.page_handler.async_handler import AsyncPageHandler
+from app.page_handler.data_parser.parser import PageParser
+from app.page_handler.paginator import MAX_PAGE_SIZE, Paginator
 
 from .models import AlbumInfoResponse, SearchResponse
 from app.utils.utils import slug_string
 
 
 class AlbumRouter(APIRouter):
-    def __init__(self, page_handler: MetalArchivesPageHandler, db: AsyncMongoClient, *args, **kwargs):
+    def __init__(self, page_handler: AsyncPageHandler, db: AsyncMongoClient, *args, **kwargs):
         super().__init__(prefix='/album', *args, **kwargs)
         self.page_handler = page_handler
+        self.paginator = Paginator(page_handler)
         self.add_api_route(
             path='/search',
             endpoint=self.search_albums,
@@ -46,13 +52,29 @@ class AlbumRouter(APIRouter):
             methods=['PATCH']
         )
         self.db = db
+        self.stats = StatsCounters(db)
 
-    async def advance_search(self, request: Request) -> SearchByResponse:
+    async def advance_search(self, request: Request) -> SearchByResponse | StreamingResponse:
         query = dict(request.query_params)
+        stream = query.pop('stream', 'false').lower() == 'true'
+        all_pages = query.pop('all_pages', 'false').lower() == 'true'
+        if all_pages:
+            walk = await self.paginator.walk(
+                url_for=lambda offset: f'https://www.metal-archives.com/search/ajax-advanced/searching/albums/?{urlencode({**query, "iDisplayStart": offset, "iDisplayLength": MAX_PAGE_SIZE})}',
+                decode=PageParser.iter_advanced_search_album_info,
+                request=request,
+            )
+            return ndjson_walk_response(walk)
+
         page = query.get('page', 1)
         offset = (int(page) - 1) * 500
         query['iDisplayStart'] = offset
-        info = self.page_handler.advanced_album_search(url=f'https://www.metal-archives.com/search/ajax-advanced/searching/albums/?{urlencode(query)}')
+        url = f'https://www.metal-archives.com/search/ajax-advanced/searching/albums/?{urlencode(query)}'
+        if stream:
+            info = await self.page_handler.get_page(url=url, request=request)
+            return ndjson_response(info, PageParser.iter_advanced_search_album_info)
+
+        info = await self.page_handler.advanced_album_search(url=url, request=request)
         return SearchByResponse(
             success=True if info.error is None else False,
             data=info.data,
@@ -61,9 +83,10 @@ class AlbumRouter(APIRouter):
             processing_time=info.processing_time,
         )
     
-    async def parse_album(self, album_id: str) -> AlbumInfoResponse:
-        info = self.page_handler.get_album_info(
-            url='https://www.metal-archives.com/albums/view/id/{album_id}'.format(album_id=album_id)
+    async def parse_album(self, album_id: str, request: Request | None = None) -> AlbumInfoResponse:
+        info = await self.page_handler.get_album_info(
+            url='https://www.metal-archives.com/albums/view/id/{album_id}'.format(album_id=album_id),
+            request=request,
         )
         return AlbumInfoResponse(
             success=True if info.error is None else False,
@@ -73,11 +96,11 @@ class AlbumRouter(APIRouter):
             processing_time=info.processing_time,
         )
 
-    async def get_album_by_id(self, album_id: str) -> AlbumInfoResponse:
+    async def get_album_by_id(self, request: Request, album_id: str) -> AlbumInfoResponse:
         start_time = time.time()
         result = await self.db.albums.find_one({'id': int(album_id)})
         if not result:
-            return await self.parse_album(int(album_id))
+            return await self.parse_album(int(album_id), request=request)
 
         album_obj = AlbumInformation(
             id=result['id'],
@@ -115,13 +138,13 @@ class AlbumRouter(APIRouter):
             processing_time=round(time.time() - start_time, 2),
         )
 
-    async def search_albums(self, query: str) -> SearchResponse:
+    async def search_albums(self, request: Request, query: str) -> SearchResponse:
         """
         Search for albums on Metal Archives
         """
         encoded_query = quote(query.strip())
         search_url = f"https://www.metal-archives.com/search/ajax-album-search/?field=title&query={encoded_query}"
-        info = self.page_handler.search_album_info(search_url)
+        info = await self.page_handler.search_album_info(search_url, request=request)
         return SearchResponse(
             success=info.error is None,
             data=info.data,
@@ -132,7 +155,22 @@ class AlbumRouter(APIRouter):
 
     async def update_album_by_id(self, album_id: str, album: AlbumInformation) -> AlbumInfoResponse:
         album.title_slug = slug_string(album.title)
-        await self.db.albums.replace_one({'id': int(album_id)}, dataclasses.asdict(album))
+        previous = await self.db.albums.find_one_and_replace(
+            {'id': int(album_id)}, dataclasses.asdict(album), projection={'tracklist': 1},
+        )
+        if previous is not None:
+            old_songs, old_lyrics = track_counts(previous.get('tracklist'))
+            songs, lyrics = track_counts(album.tracklist)
+            await self.stats.albums_changed(songs=songs - old_songs, lyrics=lyrics - old_lyrics)
+            # Краткая дискография, сохранённая в документах групп
+            await self.db.bands.update_many(
+                {'discography_short.id': int(album_id)},
+                {'$set': {
+                    f'discography_short.$[album].{key}': getattr(album, key)
+                    for key in ('title', 'title_slug', 'type', 'release_date', 'cover_url', 'url')
+                }},
+                array_filters=[{'album.id': int(album_id)}],
+            )
         return AlbumInfoResponse(
             success=True,
             data=album,
@@ -1,16 +1,21 @@
 import dataclasses
-from fastapi import APIRouter, BackgroundTasks
+from fastapi import APIRouter, BackgroundTasks, Request
+from fastapi.responses import StreamingResponse
 from pymongo import AsyncMongoClient
 
-from app.page_handler.handler import MetalArchivesPageHandler
+from app.api.streaming import ndjson_walk_response
+from app.page_handler.async_handler import AsyncPageHandler
+from app.page_handler.data_parser.parser import PageParser
+from app.page_handler.paginator import MAX_PAGE_SIZE, Paginator
 from app.page_handler.data_parser.models import Member, MemberBand, SocialLink
 from .models import MemberInfoResponse, RipMembersInfoResponse
 
 
 class ArtistsRouter(APIRouter):
-    def __init__(self, page_handler: MetalArchivesPageHandler, db: AsyncMongoClient, *args, **kwargs):
+    def __init__(self, page_handler: AsyncPageHandler, db: AsyncMongoClient, *args, **kwargs):
         super().__init__(prefix='/artist', *args, **kwargs)
         self.page_handler = page_handler
+        self.paginator = Paginator(page_handler)
         self.add_api_route(
             path='/rip',
             endpoint=self.parse_rip_artists,
@@ -27,10 +32,21 @@ class ArtistsRouter(APIRouter):
         )
         self.db = db
 
-    async def parse_rip_artists(self, page: str = '1', year: str = '') -> RipMembersInfoResponse:
+    async def parse_rip_artists(
+        self, request: Request, page: str = '1', year: str = '', all_pages: bool = False,
+    ) -> RipMembersInfoResponse | StreamingResponse:
+        if all_pages:
+            walk = await self.paginator.walk(
+                url_for=lambda offset: f'https://www.metal-archives.com/artist/ajax-rip?sSearch={year}&iDisplayStart={offset}&iDisplayLength={MAX_PAGE_SIZE}&iSortCol_0=3&sSortDir_0=desc&iSortingCols=1',
+                decode=PageParser.iter_rip_artists,
+                request=request,
+            )
+            return ndjson_walk_response(walk)
+
         offset = (int(page) - 1) * 100
-        info = self.page_handler.get_rip_artists(
-            url=f'https://www.metal-archives.com/artist/ajax-rip?sSearch={year}&iDisplayStart={offset}&iDisplayLength=100&iSortCol_0=3&sSortDir_0=desc&iSortingCols=1'
+        info = await self.page_handler.get_rip_artists(
+            url=f'https://www.metal-archives.com/artist/ajax-rip?sSearch={year}&iDisplayStart={offset}&iDisplayLength=100&iSortCol_0=3&sSortDir_0=desc&iSortingCols=1',
+            request=request,
         )
         return RipMembersInfoResponse(
             success=True if info.error is None else False,
@@ -40,7 +56,7 @@ class ArtistsRouter(APIRouter):
             processing_time=info.processing_time,
         )
 
-    async def parse_member(self, member_id: str) -> MemberInfoResponse:
+    async def parse_member(self, request: Request, member_id: str) -> MemberInfoResponse:
         member = await self._check_member_in_db(int(member_id))
         url = f'https://www.metal-archives.com/artists/please_dont_ban_me/{member_id}'
         
@@ -51,7 +67,7 @@ class ArtistsRouter(APIRouter):
                 url=url,
                 processing_time=0.0,
             )
-        info = self.page_handler.get_member(url=url)
+        info = await self.page_handler.get_member(url=url, request=request)
         await self._add_member_in_db(info.data)
         return MemberInfoResponse(
             success=True if info.error is None else False,
@@ -1,18 +1,18 @@
-import re
 from datetime import datetime, timezone, timedelta
 from fastapi import APIRouter, HTTPException, Request, status
 from pymongo import AsyncMongoClient
 from pymongo.errors import DuplicateKeyError
 from pprint import pprint
 
-from app.page_handler.handler import MetalArchivesPageHandler
+from app.db.indexes import CASE_INSENSITIVE
+from app.page_handler.async_handler import AsyncPageHandler
 from app.core.security import get_password_hash, verify_password, create_access_token, decode_access_token
 from app.core.config import settings
 
 from .models import UserCreate, UserLogin, Me, Token
 
 class AuthRouter(APIRouter):
-    def __init__(self, page_handler: MetalArchivesPageHandler, db: AsyncMongoClient, *args, **kwargs):
+    def __init__(self, page_handler: AsyncPageHandler, db: AsyncMongoClient, *args, **kwargs):
         super().__init__(prefix='/auth', *args, **kwargs)
         self.page_handler = page_handler
         self.add_api_route(
@@ -112,7 +112,7 @@ class AuthRouter(APIRouter):
     async def update_me(self, request: Request, form_data: Me):
         payload = decode_access_token(request.headers['authorization'])
         del form_data.role
-        await self.db.users.update_one({'username': payload['sub']}, {'$set': form_data.model_dump()})
+        await self.db.users.update_one({'username': payload['sub']}, {'$set': form_data.model_dump()}, collation=CASE_INSENSITIVE)
         user = await self._get_user_by_username(payload['sub'])
         return Me(**user[0])
 
@@ -129,7 +129,7 @@ class AuthRouter(APIRouter):
         pipeline = [
             {
                 "$match": {
-                    "username": re.compile(f"^{username}$", re.IGNORECASE),
+                    "username": username,
                 }
             },
             {"$limit": 1},
@@ -180,7 +180,8 @@ class AuthRouter(APIRouter):
                 }
             }
         ]
-        result = await self.db.users.aggregate(pipeline)
+        # Регистр не учитывается за счёт коллации индекса username_unique_ci
+        result = await self.db.users.aggregate(pipeline, collation=CASE_INSENSITIVE)
         result = await result.to_list(1)
         del result[0]['password']
         return result
@@ -1,3 +1,4 @@
+import asyncio
 import dataclasses
 from datetime import datetime, timezone
 from typing import Dict, Union, List
@@ -5,22 +6,51 @@ from urllib.parse import quote, urlencode
 import re
 
 from fastapi import APIRouter, BackgroundTasks, HTTPException, Request, status
-from pymongo import AsyncMongoClient
+from fastapi.responses import StreamingResponse
+from pymongo import AsyncMongoClient, ReplaceOne
 
+from app.api.streaming import ndjson_response, ndjson_walk_response
+from app.core.config import settings
+from app.db.band_search import SEARCH_PROJECTION, band_search_index
+from app.db.stats_counters import StatsCounters, track_counts
 from app.page_handler.data_parser.models import AlbumInformation, AlbumShortInformation, BandInformation, MemberLineUp, OtherBand, BandSearch
-from app.page_handler.handler import MetalArchivesPageHandler
+from app.page_handler.async_handler import AsyncPageHandler
+from app.page_handler.data_parser.parser import PageParser
+from app.page_handler.paginator import MAX_PAGE_SIZE, Paginator
+from app.page_handler.priority_gate import Priority
 from app.sse.manager import sse_manager
 
 from .models import BandInfoResponse, SearchResponse, SocialLink, SearchByResponse, SimilarBandResponse
 
-from app.messages import get_start_random_message, get_new_album_message, get_album_number_message
+from app.messages import get_start_random_message, get_new_albums_message, get_album_number_message
 from app.utils.utils import slug_string
 
 
+# Поля альбома для SSE-события и краткой дискографии; полный документ при загрузке дискографии не нужен
+ALBUM_SUMMARY_PROJECTION = {field: 1 for field in ('id', 'title', 'title_slug', 'type', 'release_date', 'cover_url', 'url', 'band_names')}
+# Поля альбома для AlbumShortInformation: без треклиста и текстов песен
+ALBUM_SHORT_PROJECTION = {field: 1 for field in ('id', 'title', 'type', 'release_date', 'cover_url', 'url')}
+
+
+def _album_short(album: dict) -> AlbumShortInformation:
+    return AlbumShortInformation(
+        id=album['id'],
+        title=album['title'],
+        # У альбома, страницу которого не удалось разобрать, названия нет
+        title_slug=slug_string(album['title']) if album['title'] else None,
+        type=album['type'],
+        cover_url=album['cover_url'],
+        release_date=album['release_date'],
+        cover_loading=False,
+        url=album.get('url'),
+    )
+
+
 class BandRouter(APIRouter):
-    def __init__(self, page_handler: MetalArchivesPageHandler, db: AsyncMongoClient, *args, **kwargs):
+    def __init__(self, page_handler: AsyncPageHandler, db: AsyncMongoClient, *args, **kwargs):
         super().__init__(prefix='/band', *args, **kwargs)
         self.page_handler = page_handler
+        self.paginator = Paginator(page_handler)
         self.add_api_route(
             path='/random',
             endpoint=self.parse_random,
@@ -85,10 +115,16 @@ class BandRouter(APIRouter):
             methods=["GET"]
         )
         self.db = db
+        self.stats = StatsCounters(db)
 
     async def update_band_by_id(self, band_id: str, band: BandInformation) -> BandInfoResponse:
         band.name_slug = slug_string(band.name)
-        await self.db.bands.replace_one({'id': int(band_id)}, dataclasses.asdict(band))
+        previous = await self.db.bands.find_one_and_replace(
+            {'id': int(band_id)}, dataclasses.asdict(band), projection={'status': 1},
+        )
+        if previous is not None:
+            await self.stats.band_changed(previous.get('status'), band.status)
+        band_search_index.add(band)
         return BandInfoResponse(
             success=True,
             data=band,
@@ -97,11 +133,11 @@ class BandRouter(APIRouter):
             processing_time=0,
         )
     
-    async def parse_band_similar(self, band_id: str, show_more: bool = False) -> SimilarBandResponse:
+    async def parse_band_similar(self, request: Request, band_id: str, show_more: bool = False) -> SimilarBandResponse:
         url = f'https://www.metal-archives.com/band/ajax-recommendations/id/{band_id}'
         if show_more == True:
             url = url + '/showMoreSimilar/1'
-        info = self.page_handler.get_band_similar(url=url)
+        info = await self.page_handler.get_band_similar(url=url, request=request)
         return SimilarBandResponse(
             success=bool(info.error),
             data=info.data,
@@ -110,12 +146,27 @@ class BandRouter(APIRouter):
             processing_time=info.processing_time,
         )
     
-    async def advance_search(self, request: Request) -> SearchByResponse:
+    async def advance_search(self, request: Request) -> SearchByResponse | StreamingResponse:
         query = dict(request.query_params)
+        stream = query.pop('stream', 'false').lower() == 'true'
+        all_pages = query.pop('all_pages', 'false').lower() == 'true'
+        if all_pages:
+            walk = await self.paginator.walk(
+                url_for=lambda offset: f'https://www.metal-archives.com/search/ajax-advanced/searching/bands/?{urlencode({**query, "iDisplayStart": offset, "iDisplayLength": MAX_PAGE_SIZE})}',
+                decode=PageParser.iter_advanced_search_band_info,
+                request=request,
+            )
+            return ndjson_walk_response(walk)
+
         page = query.get('page', 1)
         offset = (int(page) - 1) * 500
         query['iDisplayStart'] = offset
-        info = self.page_handler.advanced_band_search(url=f'https://www.metal-archives.com/search/ajax-advanced/searching/bands/?{urlencode(query)}')
+        url = f'https://www.metal-archives.com/search/ajax-advanced/searching/bands/?{urlencode(query)}'
+        if stream:
+            info = await self.page_handler.get_page(url=url, request=request)
+            return ndjson_response(info, PageParser.iter_advanced_search_band_info)
+
+        info = await self.page_handler.advanced_band_search(url=url, request=request)
         return SearchByResponse(
             success=bool(info.error),
             data=info.data,
@@ -124,10 +175,24 @@ class BandRouter(APIRouter):
             processing_time=info.processing_time,
         )
 
-    async def search_band_by_genre(self, genre: str, page: str = '1') -> SearchByResponse:
+    async def search_band_by_genre(
+        self, request: Request, genre: str, page: str = '1', stream: bool = False, all_pages: bool = False,
+    ) -> SearchByResponse | StreamingResponse:
+        if all_pages:
+            walk = await self.paginator.walk(
+                url_for=lambda offset: f'https://www.metal-archives.com/browse/ajax-genre/g/{genre}?iDisplayStart={offset}&iDisplayLength={MAX_PAGE_SIZE}&iSortCol_0=0&sSortDir_0=asc&iSortingCols=1',
+                decode=PageParser.iter_bands_by_letter,
+                request=request,
+            )
+            return ndjson_walk_response(walk)
+
         offset = (int(page) - 1) * 500
-        
-        info = self.page_handler.get_bands_by_genre(url=f'https://www.metal-archives.com/browse/ajax-genre/g/{genre}?iDisplayStart={offset}&iSortCol_0=0&sSortDir_0=asc&iSortingCols=1')
+        url = f'https://www.metal-archives.com/browse/ajax-genre/g/{genre}?iDisplayStart={offset}&iSortCol_0=0&sSortDir_0=asc&iSortingCols=1'
+        if stream:
+            info = await self.page_handler.get_page(url=url, request=request)
+            return ndjson_response(info, PageParser.iter_bands_by_letter)
+
+        info = await self.page_handler.get_bands_by_genre(url=url, request=request)
         return SearchByResponse(
             success=bool(info.error),
             data=info.data,
@@ -136,10 +201,24 @@ class BandRouter(APIRouter):
             processing_time=info.processing_time,
         )
     
-    async def search_band_by_country(self, country: str, page: str = '1') -> SearchByResponse:
+    async def search_band_by_country(
+        self, request: Request, country: str, page: str = '1', stream: bool = False, all_pages: bool = False,
+    ) -> SearchByResponse | StreamingResponse:
+        if all_pages:
+            walk = await self.paginator.walk(
+                url_for=lambda offset: f'https://www.metal-archives.com/browse/ajax-country/c/{country}?iDisplayStart={offset}&iDisplayLength={MAX_PAGE_SIZE}&iSortCol_0=0&sSortDir_0=asc&iSortingCols=1',
+                decode=PageParser.iter_bands_by_country,
+                request=request,
+            )
+            return ndjson_walk_response(walk)
+
         offset = (int(page) - 1) * 500
-        
-        info = self.page_handler.get_bands_by_country(url=f'https://www.metal-archives.com/browse/ajax-country/c/{country}?iDisplayStart={offset}&iSortCol_0=0&sSortDir_0=asc&iSortingCols=1')
+        url = f'https://www.metal-archives.com/browse/ajax-country/c/{country}?iDisplayStart={offset}&iSortCol_0=0&sSortDir_0=asc&iSortingCols=1'
+        if stream:
+            info = await self.page_handler.get_page(url=url, request=request)
+            return ndjson_response(info, PageParser.iter_bands_by_country)
+
+        info = await self.page_handler.get_bands_by_country(url=url, request=request)
         return SearchByResponse(
             success=bool(info.error),
             data=info.data,
@@ -148,14 +227,29 @@ class BandRouter(APIRouter):
             processing_time=info.processing_time,
         )
     
-    async def search_band_by_letter(self, letter: str, page: str = '1') -> SearchByResponse:
+    async def search_band_by_letter(
+        self, request: Request, letter: str, page: str = '1', stream: bool = False, all_pages: bool = False,
+    ) -> SearchByResponse | StreamingResponse:
         if len(letter) > 3:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Длина должна быть до 3ёх символов"
         )
+        if all_pages:
+            walk = await self.paginator.walk(
+                url_for=lambda offset: f'https://www.metal-archives.com/browse/ajax-letter/l/{letter}?iDisplayStart={offset}&iDisplayLength={MAX_PAGE_SIZE}',
+                decode=PageParser.iter_bands_by_letter,
+                request=request,
+            )
+            return ndjson_walk_response(walk)
+
         offset = (int(page) - 1) * 500
-        info = self.page_handler.get_bands_by_letter(url=f'https://www.metal-archives.com/browse/ajax-letter/l/{letter}?iDisplayStart={offset}')
+        url = f'https://www.metal-archives.com/browse/ajax-letter/l/{letter}?iDisplayStart={offset}'
+        if stream:
+            info = await self.page_handler.get_page(url=url, request=request)
+            return ndjson_response(info, PageParser.iter_bands_by_letter)
+
+        info = await self.page_handler.get_bands_by_letter(url=url, request=request)
         return SearchByResponse(
             success=bool(info.error),
             data=info.data,
@@ -165,9 +259,9 @@ class BandRouter(APIRouter):
         )
 
     
-    async def parse_random(self, background_tasks: BackgroundTasks) -> BandInfoResponse:
+    async def parse_random(self, request: Request, background_tasks: BackgroundTasks) -> BandInfoResponse:
         await sse_manager.send_message(get_start_random_message())
-        info = self.page_handler.get_band_info(url='https://www.metal-archives.com/band/random')
+        info = await self.page_handler.get_band_info(url='https://www.metal-archives.com/band/random', request=request)
         band = await self._check_band_in_db(int(info.data.id))
         if not band:
             await self._add_band_in_db(info.data)
@@ -180,16 +274,16 @@ class BandRouter(APIRouter):
             processing_time=info.processing_time,
         )
 
-    async def parse_band_by_id(self, band_id: str, background_tasks: BackgroundTasks, update: bool = False) -> BandInfoResponse:
+    async def parse_band_by_id(self, request: Request, band_id: str, background_tasks: BackgroundTasks, update: bool = False) -> BandInfoResponse:
         band = await self._check_band_in_db(int(band_id))
         
         url = 'https://www.metal-archives.com/band/view/id/{band_id}'.format(band_id=band_id)
         if band:
             if update:
-                band_info = self.page_handler.get_band_info(url=url)
+                band_info = await self.page_handler.get_band_info(url=url, request=request, refresh=True)
                 diff_ids = self._compare_discography(band.discography, band_info.data.discography)
                 band.discography.extend(diff_ids['only_in_ma'])
-                background_tasks.add_task(self._replace_band_in_db, band=band_info.data)
+                background_tasks.add_task(self._replace_band_in_db, band=band_info.data, refresh=True)
                 return BandInfoResponse(
                     success=True,
                     data=band,
@@ -204,7 +298,7 @@ class BandRouter(APIRouter):
                 processing_time=0.0,
             )
         
-        info = self.page_handler.get_band_info(url=url)
+        info = await self.page_handler.get_band_info(url=url, request=request)
         await self._add_band_in_db(info.data)
         background_tasks.add_task(self._replace_band_in_db, band=info.data)
         return BandInfoResponse(
@@ -215,7 +309,7 @@ class BandRouter(APIRouter):
             processing_time=info.processing_time,
         )
 
-    async def search_bands(self, query: str, only_local: bool = False) -> SearchResponse:
+    async def search_bands(self, request: Request, query: str, only_local: bool = False) -> SearchResponse:
         encoded_query = quote(query.strip())
         result = []
         info = {'error': '', 'url': '', 'processing_time': 0}
@@ -223,7 +317,7 @@ class BandRouter(APIRouter):
             result = await self._search_band_from_db(query)
         else:
             search_url = f"https://www.metal-archives.com/search/ajax-band-search/?field=name&query={encoded_query}"
-            info = self.page_handler.search_band_info(search_url)
+            info = await self.page_handler.search_band_info(search_url, request=request)
             result = info.data
         return SearchResponse(
             success=True,
@@ -261,12 +355,28 @@ class BandRouter(APIRouter):
                     }
                 },
                 {"$limit": 1},
+                # Альбомы подтягиваются, только если краткая дискография не сохранена в документе группы
+                {
+                    "$addFields": {
+                        "_lookup_ids": {
+                            "$cond": [
+                                {"$eq": [
+                                    {"$size": {"$ifNull": ["$discography_short", []]}},
+                                    {"$size": {"$ifNull": ["$discography", []]}},
+                                ]},
+                                [],
+                                "$discography",
+                            ]
+                        }
+                    }
+                },
                 {
                     "$lookup": {
                         "from": "albums",
-                        "localField": "discography",
+                        "localField": "_lookup_ids",
                         "foreignField": "_id",
-                        "as": "discography"
+                        "pipeline": [{"$project": ALBUM_SHORT_PROJECTION}],
+                        "as": "_albums"
                     }
                 }
             ]
@@ -276,6 +386,11 @@ class BandRouter(APIRouter):
             return None
 
         band = result[0]
+        discography = band.get('discography_short') or []
+        if len(discography) != len(band.get('discography') or []):
+            # $lookup не сохраняет порядок массива: восстанавливаем порядок дискографии группы
+            albums = {album['_id']: album for album in band['_albums']}
+            discography = [albums[record_id] for record_id in band['discography'] if record_id in albums]
         return BandInformation(
             id=band['id'],
             name=band['name'],
@@ -316,19 +431,7 @@ class BandRouter(APIRouter):
                 )
                 for member in band['past_lineup']
             ],
-            discography=[
-                AlbumShortInformation(
-                    id=disc['id'],
-                    title=disc['title'],
-                    title_slug=slug_string(disc['title']),
-                    type=disc['type'],
-                    cover_url=disc['cover_url'],
-                    release_date=disc['release_date'],
-                    cover_loading=False,
-                    url=disc['url'],
-                )
-                for disc in band['discography']
-            ],
+            discography=[_album_short(disc) for disc in discography],
             links=[
                 SocialLink(**link)
                 for link in band['links']
@@ -343,45 +446,92 @@ class BandRouter(APIRouter):
     async def _add_band_in_db(self, band: BandInformation):
         band_dict = dataclasses.asdict(band)
         await self.db.bands.insert_one(band_dict)
+        await self.stats.band_changed(None, band.status, created=True)
+        band_search_index.add(band)
     
-    async def _replace_band_in_db(self, band: BandInformation):
-        album_record_ids = []
-        for album in band.discography:
-            album_exist = await self.db.albums.find_one({'id': album.id})
-            if album_exist:
-                album_record_ids.append(album_exist.get('_id'))
-                album_exist.pop('_id')
-                album_model = AlbumInformation(**album_exist)
-                await sse_manager.send_message(get_new_album_message(album_model))
-                continue
+    async def _replace_band_in_db(self, band: BandInformation, refresh: bool = False):
+        album_ids = list(dict.fromkeys(album.id for album in band.discography if album.id is not None))
+
+        # Альбомы, которые уже есть в базе, одним запросом
+        cursor = self.db.albums.find({'id': {'$in': album_ids}}, ALBUM_SUMMARY_PROJECTION)
+        known = await cursor.to_list()
+        record_ids = {album['id']: album.pop('_id') for album in known}
+        if known:
+            await sse_manager.send_message(get_new_albums_message([AlbumInformation(**album) for album in known]))
 
-            album_page_info = self.page_handler.get_album_info(
-                url=f'https://www.metal-archives.com/albums/view/id/{album.id}'
+        shorts = {album['id']: _album_short(album) for album in known}
+        fetched = await self._fetch_albums([album_id for album_id in album_ids if album_id not in record_ids], refresh=refresh)
+        shorts.update({album_id: _album_short(dataclasses.asdict(album)) for album_id, album in fetched})
+        if fetched:
+            result = await self.db.albums.bulk_write(
+                [ReplaceOne({'id': album_id}, dataclasses.asdict(album), upsert=True) for album_id, album in fetched],
+                ordered=False,
             )
-            new_album = await self.db.albums.insert_one(dataclasses.asdict(album_page_info.data))
-            await sse_manager.send_message(get_new_album_message(album_page_info.data))
-            album_record_ids.append(new_album.inserted_id)
+            record_ids.update({fetched[index][0]: record_id for index, record_id in result.upserted_ids.items()})
+            songs = lyrics = 0
+            for index in result.upserted_ids:
+                album_songs, album_lyrics = track_counts(fetched[index][1].tracklist)
+                songs += album_songs
+                lyrics += album_lyrics
+            await self.stats.albums_changed(albums=len(result.upserted_ids), songs=songs, lyrics=lyrics)
+            # Альбом мог быть добавлен параллельно: upsert его заменил и _id не вернул
+            unresolved = [album_id for album_id, _ in fetched if album_id not in record_ids]
+            if unresolved:
+                cursor = self.db.albums.find({'id': {'$in': unresolved}}, {'_id': 1, 'id': 1})
+                record_ids.update({album['id']: album['_id'] for album in await cursor.to_list()})
 
-        band.discography = album_record_ids
-        await sse_manager.send_message(get_album_number_message(len(album_record_ids)))
-        await self.db.bands.replace_one({'id': band.id}, dataclasses.asdict(band), upsert=True)
+        band.discography = [record_ids[album_id] for album_id in album_ids if album_id in record_ids]
+        await sse_manager.send_message(get_album_number_message(len(band.discography)))
+        band_dict = dataclasses.asdict(band)
+        if settings.BAND_EMBED_SHORT_DISCOGRAPHY:
+            band_dict['discography_short'] = [
+                dataclasses.asdict(shorts[album_id]) for album_id in album_ids if album_id in record_ids
+            ]
+        previous = await self.db.bands.find_one_and_replace(
+            {'id': band.id}, band_dict, projection={'status': 1}, upsert=True,
+        )
+        await self.stats.band_changed(previous and previous.get('status'), band.status, created=previous is None)
+        band_search_index.add(band)
+
+    async def _fetch_albums(self, album_ids: list[int], refresh: bool = False) -> list[tuple[int, AlbumInformation]]:
+        """Загружает страницы альбомов одновременно и сообщает о прогрессе пачками"""
+        slots = asyncio.Semaphore(settings.INGEST_ALBUM_CONCURRENCY)
+
+        async def fetch(album_id: int):
+            async with slots:
+                info = await self.page_handler.get_album_info(
+                    url=f'https://www.metal-archives.com/albums/view/id/{album_id}',
+                    priority=Priority.BULK,
+                    refresh=refresh,
+                )
+            return album_id, info
+
+        albums, batch = [], []
+        for completed in asyncio.as_completed([fetch(album_id) for album_id in album_ids]):
+            album_id, info = await completed
+            if info.data is None:
+                continue
+            if info.data.parsing_error:
+                # Не сохраняем: иначе следующая загрузка найдёт альбом в базе и не попробует снова
+                print(f"Альбом {album_id} не сохранён: {info.data.parsing_error}")
+                continue
+            albums.append((album_id, info.data))
+            batch.append(info.data)
+            if len(batch) >= settings.INGEST_PROGRESS_BATCH:
+                await sse_manager.send_message(get_new_albums_message(batch))
+                batch = []
+        if batch:
+            await sse_manager.send_message(get_new_albums_message(batch))
+        return albums
 
     async def _search_band_from_db(self, band_name: str) -> list[BandSearch]:
+        if band_search_index.ready:
+            return band_search_index.search(band_name)
+
+        # Индекс ещё загружается или отключён: поиск по подстроке в самой базе
         regex_pattern = re.compile(re.escape(band_name), re.IGNORECASE)
-        cursor = self.db.bands.find({'name': {'$regex': regex_pattern}}, {'_id': 0})
-        aggregate = await cursor.to_list(length=20)
-        if not aggregate:
-            return None
-        result = []
-        for band in aggregate:
-            result.append(BandSearch(
-                id=band['id'],
-                name=band['name'],
-                name_slug=band['name_slug'],
-                genres=band['genres'],
-                country=band['country'],
-            ))
-        return aggregate
+        cursor = self.db.bands.find({'name': {'$regex': regex_pattern}}, SEARCH_PROJECTION)
+        return [BandSearch(**band) for band in await cursor.to_list(length=20)]
     
     @staticmethod
     def _get_date_difference(
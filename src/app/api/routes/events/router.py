@@ -1,12 +1,12 @@
 from fastapi import APIRouter, BackgroundTasks
 from pymongo import AsyncMongoClient
 
-from app.page_handler.handler import MetalArchivesPageHandler
+from app.page_handler.async_handler import AsyncPageHandler
 from app.sse.manager import sse_manager
 
 
 class EventsRouter(APIRouter):
-    def __init__(self, page_handler: MetalArchivesPageHandler, db: AsyncMongoClient, *args, **kwargs):
+    def __init__(self, page_handler: AsyncPageHandler, db: AsyncMongoClient, *args, **kwargs):
         super().__init__(prefix='/events', *args, **kwargs)
         self.page_handler = page_handler
         self.add_api_route(
@@ -1,12 +1,13 @@
-from fastapi import APIRouter, BackgroundTasks
+from fastapi import APIRouter, BackgroundTasks, Request
 from pymongo import AsyncMongoClient
 
-from app.page_handler.handler import MetalArchivesPageHandler
+from app.db.stats_counters import StatsCounters
+from app.page_handler.async_handler import AsyncPageHandler
 from .models import LyricsInfoResponse
 
 
 class LyricsRouter(APIRouter):
-    def __init__(self, page_handler: MetalArchivesPageHandler, db: AsyncMongoClient, *args, **kwargs):
+    def __init__(self, page_handler: AsyncPageHandler, db: AsyncMongoClient, *args, **kwargs):
         super().__init__(prefix='/lyrics', *args, **kwargs)
         self.page_handler = page_handler
         self.add_api_route(
@@ -17,10 +18,12 @@ class LyricsRouter(APIRouter):
             methods=["GET", ]
         )
         self.db = db
+        self.stats = StatsCounters(db)
 
-    async def parse_lyrics(self, background_tasks: BackgroundTasks, id: str, album_id: str = '',) -> LyricsInfoResponse:
-        info = self.page_handler.get_lyrics(
-            url=f'https://www.metal-archives.com/release/ajax-view-lyrics/id/{id}'
+    async def parse_lyrics(self, request: Request, background_tasks: BackgroundTasks, id: str, album_id: str = '',) -> LyricsInfoResponse:
+        info = await self.page_handler.get_lyrics(
+            url=f'https://www.metal-archives.com/release/ajax-view-lyrics/id/{id}',
+            request=request,
         )
         background_tasks.add_task(self.update_lyrics, lyrics_id=id, album_id=album_id, text=info.data)
         return LyricsInfoResponse(
@@ -32,7 +35,7 @@ class LyricsRouter(APIRouter):
         )
 
     async def update_lyrics(self, lyrics_id: str, album_id: str = '', text: str = '') -> LyricsInfoResponse:
-        await self.db.albums.update_one({
+        previous = await self.db.albums.find_one_and_update({
                     "id": int(album_id),
                     "tracklist.id": int(lyrics_id)
                 },
@@ -40,5 +43,9 @@ class LyricsRouter(APIRouter):
                     "$set": {
                         "tracklist.$.lyrics": text
                     }
-                }
+                },
+                projection={"tracklist.$": 1},
             )
+        if previous is not None:
+            old_text = previous['tracklist'][0].get('lyrics') if previous.get('tracklist') else None
+            await self.stats.albums_changed(lyrics=bool(text) - bool(old_text))
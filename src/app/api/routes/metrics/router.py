@@ -0,0 +1,38 @@
+from fastapi import APIRouter
+from pymongo import AsyncMongoClient
+
+from app.db.band_search import band_search_index
+from app.db.indexes import IndexManager
+from app.page_handler.async_handler import AsyncPageHandler
+from app.sse.manager import sse_manager
+
+
+class MetricsRouter(APIRouter):
+    def __init__(self, page_handler: AsyncPageHandler, db: AsyncMongoClient, *args, **kwargs):
+        super().__init__(prefix='/metrics', *args, **kwargs)
+        self.page_handler = page_handler
+        self.add_api_route(
+            path='/',
+            endpoint=self.get_metrics,
+            tags=['Metrics'],
+            methods=["GET", ]
+        )
+        self.add_api_route(
+            path='/indexes',
+            endpoint=self.get_indexes,
+            tags=['Metrics'],
+            methods=["GET", ]
+        )
+        self.db = db
+        self.indexes = IndexManager(db)
+
+    async def get_metrics(self) -> dict:
+        return {
+            **self.page_handler.get_metrics(),
+            'sse': sse_manager.get_stats(),
+            'band_search': band_search_index.get_stats(),
+        }
+
+    async def get_indexes(self) -> dict:
+        """Отсутствующие, лишние и неиспользуемые индексы MongoDB"""
+        return await self.indexes.report()
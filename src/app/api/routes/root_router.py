@@ -1,7 +1,7 @@
 from fastapi.routing import APIRouter
 from pymongo import AsyncMongoClient
 
-from app.page_handler.handler import MetalArchivesPageHandler
+from app.page_handler.async_handler import AsyncPageHandler
 from .band import BandRouter
 from .album import AlbumRouter
 from .lyrics import LyricsRouter
@@ -10,12 +10,13 @@ from .stats import StatsRouter
 from .artists import ArtistsRouter
 from .auth import AuthRouter
 from .song import SongRouter
+from .metrics import MetricsRouter
 from .file_manager import create_file_manager_router
 
 
 class RootRouter(APIRouter):
 
-    def __init__(self, page_handler: MetalArchivesPageHandler, db: AsyncMongoClient, *args, **kwargs):
+    def __init__(self, page_handler: AsyncPageHandler, db: AsyncMongoClient, *args, **kwargs):
         super().__init__(prefix='/api' ,*args, **kwargs)
 
         band_router = BandRouter(page_handler=page_handler, db=db)
@@ -24,6 +25,7 @@ class RootRouter(APIRouter):
         stats_router = StatsRouter(page_handler=page_handler, db=db)
         artists_router = ArtistsRouter(page_handler=page_handler, db=db)
         song_router = SongRouter(page_handler=page_handler, db=db)
+        metrics_router = MetricsRouter(page_handler=page_handler, db=db)
 
         events_router = EventsRouter(page_handler=page_handler, db=db)
 
@@ -35,6 +37,7 @@ class RootRouter(APIRouter):
         self.include_router(router=stats_router)
         self.include_router(router=artists_router)
         self.include_router(router=song_router)
+        self.include_router(router=metrics_router)
 
         self.include_router(router=events_router)
 
@@ -1,16 +1,21 @@
 from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
 from pymongo import AsyncMongoClient
 from urllib.parse import urlencode
 
 from app.api.routes.band.models import SearchByResponse
-from app.page_handler.handler import MetalArchivesPageHandler
+from app.api.streaming import ndjson_response, ndjson_walk_response
+from app.page_handler.async_handler import AsyncPageHandler
+from app.page_handler.data_parser.parser import PageParser
+from app.page_handler.paginator import MAX_PAGE_SIZE, Paginator
 from .models import SongInfoResponse
 
 
 class SongRouter(APIRouter):
-    def __init__(self, page_handler: MetalArchivesPageHandler, db: AsyncMongoClient, *args, **kwargs):
+    def __init__(self, page_handler: AsyncPageHandler, db: AsyncMongoClient, *args, **kwargs):
         super().__init__(prefix='/song', *args, **kwargs)
         self.page_handler = page_handler
+        self.paginator = Paginator(page_handler)
         self.add_api_route(
             path='/search/advanced',
             endpoint=self.advance_search,
@@ -20,12 +25,27 @@ class SongRouter(APIRouter):
         )
         self.db = db
 
-    async def advance_search(self, request: Request) -> SearchByResponse:
+    async def advance_search(self, request: Request) -> SearchByResponse | StreamingResponse:
         query = dict(request.query_params)
+        stream = query.pop('stream', 'false').lower() == 'true'
+        all_pages = query.pop('all_pages', 'false').lower() == 'true'
+        if all_pages:
+            walk = await self.paginator.walk(
+                url_for=lambda offset: f'https://www.metal-archives.com/search/ajax-advanced/searching/songs/?{urlencode({**query, "iDisplayStart": offset, "iDisplayLength": MAX_PAGE_SIZE})}',
+                decode=PageParser.iter_advanced_search_song_info,
+                request=request,
+            )
+            return ndjson_walk_response(walk)
+
         page = query.get('page', 1)
         offset = (int(page) - 1) * 500
         query['iDisplayStart'] = offset
-        info = self.page_handler.advanced_song_search(url=f'https://www.metal-archives.com/search/ajax-advanced/searching/songs/?{urlencode(query)}')
+        url = f'https://www.metal-archives.com/search/ajax-advanced/searching/songs/?{urlencode(query)}'
+        if stream:
+            info = await self.page_handler.get_page(url=url, request=request)
+            return ndjson_response(info, PageParser.iter_advanced_search_song_info)
+
+        info = await self.page_handler.advanced_song_search(url=url, request=request)
         return SearchByResponse(
             success=True if info.error is None else False,
             data=info.data,
@@ -1,13 +1,19 @@
-from fastapi import APIRouter
+import asyncio
+import time
+
+from fastapi import APIRouter, Request
 from pymongo import AsyncMongoClient
 
-from app.page_handler.data_parser.models import StatInfo, AllStatInfo, BandStatInfo
-from app.page_handler.handler import MetalArchivesPageHandler
+from app.core.config import settings
+from app.db.stats_counters import StatsCounters
+from app.page_handler.data_parser.models import StatInfo, AllStatInfo
+from app.page_handler.async_handler import AsyncPageHandler
+from app.page_handler.models import PageInfo
 from .models import StatsInfoResponse
 
 
 class StatsRouter(APIRouter):
-    def __init__(self, page_handler: MetalArchivesPageHandler, db: AsyncMongoClient, *args, **kwargs):
+    def __init__(self, page_handler: AsyncPageHandler, db: AsyncMongoClient, *args, **kwargs):
         super().__init__(prefix='/stats', *args, **kwargs)
         self.page_handler = page_handler
         self.add_api_route(
@@ -18,9 +24,12 @@ class StatsRouter(APIRouter):
             methods=["GET", ]
         )
         self.db = db
+        self.counters = StatsCounters(db)
+        self._ma_stats: tuple[float, PageInfo] | None = None
+        self._ma_lock = asyncio.Lock()
 
-    async def get_stats(self) -> StatsInfoResponse:
-        info = self.page_handler.get_stats(url='https://www.metal-archives.com/stats')
+    async def get_stats(self, request: Request) -> StatsInfoResponse:
+        info = await self.get_ma_stats(request)
         local = await self.get_local_stats()
         stats = AllStatInfo(local=local, ma=info.data)
         return StatsInfoResponse(
@@ -31,38 +40,20 @@ class StatsRouter(APIRouter):
             processing_time=info.processing_time,
         )
     
-    async def get_local_stats(self) -> StatInfo:
-        stats = await self.db.bands.aggregate([
-            {
-                "$group": {
-                    "_id": "$status",
-                    "count": {"$sum": 1}
-                }
-            }
-        ])
-        stats_list = await stats.to_list()
-        active = list(filter(lambda x: x["_id"] == 'Active', stats_list))[0]['count']
-        on_hold = list(filter(lambda x: x["_id"] == 'On hold', stats_list))[0]['count']
-        split_up = list(filter(lambda x: x["_id"] == 'Split-up', stats_list))[0]['count']
-        changed_name = list(filter(lambda x: x["_id"] == 'Changed name', stats_list))[0]['count']
-        unknown = list(filter(lambda x: x["_id"] == 'Unknown', stats_list))[0]['count']
-        total = active + on_hold + split_up + changed_name + unknown
-        bands = BandStatInfo(
-            active=active, on_hold=on_hold, split_up=split_up,
-            changed_name=changed_name, unknown=unknown, total=total)
+    async def get_ma_stats(self, request: Request | None = None) -> PageInfo:
+        """Статистика Metal Archives, повторно загружается не чаще раза в STATS_MA_TTL"""
+        async with self._ma_lock:
+            if self._ma_stats is not None and time.monotonic() - self._ma_stats[0] < settings.STATS_MA_TTL:
+                return self._ma_stats[1]
+            info = await self.page_handler.get_stats(url='https://www.metal-archives.com/stats', request=request)
+            if info.error is None:
+                self._ma_stats = (time.monotonic(), info)
+            return info
 
-        albums = await self.db.albums.count_documents({})
-        songs_result = await self.db.albums.aggregate([
-            {
-                '$group': {
-                    '_id': None,
-                    'total_tracks': {
-                        '$sum': {'$size': '$tracklist'}
-                    }
-                }
-            }
-        ])
-        songs_list = await songs_result.to_list()
-        songs = songs_list[0]['total_tracks']
-        return StatInfo(bands=bands, albums=int(albums), songs=int(songs))
-   
\ No newline at end of file
+    async def get_local_stats(self) -> StatInfo:
+        """Счётчики из коллекции stats; пока сверки не было, они пересчитываются на месте"""
+        local = await self.counters.read()
+        if local is None:
+            await self.counters.reconcile()
+            local = await self.counters.read()
+        return local
@@ -0,0 +1,72 @@
+import dataclasses
+import json
+from typing import Any, AsyncIterator, Callable, Iterator
+
+from fastapi.responses import StreamingResponse
+
+from app.page_handler.models import PageInfo
+from app.page_handler.paginator import ListingWalk
+
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+
+
+def ndjson_response(info: PageInfo, decode: Callable[[str], tuple[int, Iterator[Any]]]) -> StreamingResponse:
+    """Выдача в формате NDJSON: первая строка с метаданными ответа, затем по строке на запись.
+
+    Строки aaData разбираются по мере отправки: клиент получает первые
+    записи раньше, чем разобрана последняя, и список целиком не собирается.
+    """
+    return StreamingResponse(_lines(info, decode), media_type=NDJSON_MEDIA_TYPE)
+
+
+def _lines(info: PageInfo, decode: Callable[[str], tuple[int, Iterator[Any]]]) -> Iterator[str]:
+    total, items, error = None, iter(()), info.error
+    if error is None:
+        try:
+            total, items = decode(info.html)
+        except Exception as err:
+            error = f"Ошибка при парсинге: {str(err)}"
+
+    yield _dump({
+        'success': error is None,
+        'error': error,
+        'url': info.url,
+        'processing_time': info.processing_time,
+        'total': total,
+    })
+    try:
+        for item in items:
+            yield _dump(dataclasses.asdict(item))
+    except Exception as err:
+        # Заголовок уже отправлен: сообщаем об ошибке последней строкой
+        yield _dump({'success': False, 'error': f"Ошибка при парсинге: {str(err)}"})
+
+
+def ndjson_walk_response(walk: ListingWalk) -> StreamingResponse:
+    """Все страницы выдачи одним потоком NDJSON в порядке смещений.
+
+    Ошибка загрузки отдельной страницы не прерывает поток: вместо её строк
+    отправляется строка с ошибкой и смещением. Если выдача обрезана по
+    PAGINATION_MAX_PAGES, в первой строке truncated равно true.
+    """
+    return StreamingResponse(_walk_lines(walk), media_type=NDJSON_MEDIA_TYPE)
+
+
+async def _walk_lines(walk: ListingWalk) -> AsyncIterator[str]:
+    yield _dump({
+        'success': walk.error is None,
+        'error': walk.error,
+        'url': walk.first.url,
+        'processing_time': walk.first.processing_time,
+        'total': walk.total,
+        'truncated': walk.truncated,
+    })
+    async for page in walk.pages:
+        if page.error is not None:
+            yield _dump({'success': False, 'error': page.error, 'offset': page.offset})
+            continue
+        yield ''.join(_dump(dataclasses.asdict(item)) for item in page.rows)
+
+
+def _dump(value: dict) -> str:
+    return json.dumps(value, ensure_ascii=False) + '\n'
@@ -11,4 +11,97 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 44640
 
+    # Пул браузеров
+    BROWSER_POOL_SIZE: int = int(os.getenv("BROWSER_POOL_SIZE", 2))
+    BROWSER_POOL_MAX_WAITERS: int = int(os.getenv("BROWSER_POOL_MAX_WAITERS", 32))
+    BROWSER_LEASE_TIMEOUT: float = float(os.getenv("BROWSER_LEASE_TIMEOUT", 60))
+    BROWSER_PAGE_LOAD_TIMEOUT: int = int(os.getenv("BROWSER_PAGE_LOAD_TIMEOUT", 30))
+    BROWSER_MAX_CONSECUTIVE_ERRORS: int = int(os.getenv("BROWSER_MAX_CONSECUTIVE_ERRORS", 3))
+    # Перезапуск сессий браузера (0 отключает порог)
+    BROWSER_RECYCLE_MAX_PAGES: int = int(os.getenv("BROWSER_RECYCLE_MAX_PAGES", 500))
+    BROWSER_RECYCLE_MAX_RSS_MB: float = float(os.getenv("BROWSER_RECYCLE_MAX_RSS_MB", 1536))
+    BROWSER_RECYCLE_MAX_ERROR_RATE: float = float(os.getenv("BROWSER_RECYCLE_MAX_ERROR_RATE", 0.5))
+    BROWSER_RECYCLE_ERROR_WINDOW: int = int(os.getenv("BROWSER_RECYCLE_ERROR_WINDOW", 20))
+    BROWSER_RECYCLE_MAX_AGE: float = float(os.getenv("BROWSER_RECYCLE_MAX_AGE", 6 * 60 * 60))
+    BROWSER_WATCHDOG_INTERVAL: float = float(os.getenv("BROWSER_WATCHDOG_INTERVAL", 30))
+    BROWSER_MEMORY_HISTORY_SIZE: int = int(os.getenv("BROWSER_MEMORY_HISTORY_SIZE", 120))
+
+    # Выполнение загрузок вне event loop
+    SCRAPE_MAX_CONCURRENCY: int = int(os.getenv("SCRAPE_MAX_CONCURRENCY", 8))
+    SCRAPE_DISCONNECT_POLL_INTERVAL: float = float(os.getenv("SCRAPE_DISCONNECT_POLL_INTERVAL", 0.5))
+    # Через сколько секунд ожидания загрузка обгоняет запросы на уровень приоритета выше
+    SCRAPE_PRIORITY_AGING_INTERVAL: float = float(os.getenv("SCRAPE_PRIORITY_AGING_INTERVAL", 10.0))
+    SCRAPE_PREFETCH_MAX_CONCURRENCY: int = int(os.getenv("SCRAPE_PREFETCH_MAX_CONCURRENCY", 2))
+    # Фоновые загрузки (альбомы при сохранении дискографии): не меньше INGEST_ALBUM_CONCURRENCY, иначе она не действует
+    SCRAPE_BULK_MAX_CONCURRENCY: int = int(os.getenv("SCRAPE_BULK_MAX_CONCURRENCY", 4))
+
+    # Прямые HTTP-запросы к AJAX-эндпоинтам
+    HTTP_FAST_PATH_ENABLED: bool = os.getenv("HTTP_FAST_PATH_ENABLED", "true").lower() == "true"
+    HTTP_FAST_PATH_HTTP2: bool = os.getenv("HTTP_FAST_PATH_HTTP2", "true").lower() == "true"
+    HTTP_FAST_PATH_TIMEOUT: float = float(os.getenv("HTTP_FAST_PATH_TIMEOUT", 15))
+    HTTP_FAST_PATH_MAX_CONNECTIONS: int = int(os.getenv("HTTP_FAST_PATH_MAX_CONNECTIONS", 20))
+
+    # Cookies прохождения Cloudflare
+    CLEARANCE_STORE_PATH: str = os.getenv("CLEARANCE_STORE_PATH", "clearance.json")
+    CLEARANCE_REFRESH_MARGIN: float = float(os.getenv("CLEARANCE_REFRESH_MARGIN", 300))
+    CLEARANCE_CHECK_INTERVAL: float = float(os.getenv("CLEARANCE_CHECK_INTERVAL", 60))
+
+    # Дисковый кеш ответов
+    RESPONSE_CACHE_ENABLED: bool = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+    RESPONSE_CACHE_DIR: str = os.getenv("RESPONSE_CACHE_DIR", ".cache/responses")
+    RESPONSE_CACHE_MAX_BYTES: int = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+    RESPONSE_CACHE_COMPRESSION_LEVEL: int = int(os.getenv("RESPONSE_CACHE_COMPRESSION_LEVEL", 6))
+
+    # Адаптивное ограничение частоты запросов к Metal Archives
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_INITIAL_RATE: float = float(os.getenv("RATE_LIMIT_INITIAL_RATE", 2.0))
+    RATE_LIMIT_MIN_RATE: float = float(os.getenv("RATE_LIMIT_MIN_RATE", 0.2))
+    RATE_LIMIT_MAX_RATE: float = float(os.getenv("RATE_LIMIT_MAX_RATE", 10.0))
+    RATE_LIMIT_BURST: float = float(os.getenv("RATE_LIMIT_BURST", 4))
+    RATE_LIMIT_ADDITIVE_INCREASE: float = float(os.getenv("RATE_LIMIT_ADDITIVE_INCREASE", 0.1))
+    RATE_LIMIT_MULTIPLICATIVE_DECREASE: float = float(os.getenv("RATE_LIMIT_MULTIPLICATIVE_DECREASE", 0.5))
+    RATE_LIMIT_LATENCY_TARGET: float = float(os.getenv("RATE_LIMIT_LATENCY_TARGET", 5.0))
+    RATE_LIMIT_MAX_WAIT: float = float(os.getenv("RATE_LIMIT_MAX_WAIT", 30.0))
+
+    # Блокировка ресурсов при загрузке страниц браузером
+    RESOURCE_BLOCKING_ENABLED: bool = os.getenv("RESOURCE_BLOCKING_ENABLED", "true").lower() == "true"
+    RESOURCE_BLOCKING_CATEGORIES: str = os.getenv("RESOURCE_BLOCKING_CATEGORIES", "images,fonts,stylesheets,media,third_party")
+    # Категории, которые не блокируются для класса страниц: пары класс:категория через запятую, например "album:images"
+    RESOURCE_BLOCKING_ALLOW: str = os.getenv("RESOURCE_BLOCKING_ALLOW", "")
+
+    # Builder BeautifulSoup для PageParser: html.parser или lxml
+    PARSER_BACKEND: str = os.getenv("PARSER_BACKEND", "html.parser")
+    # Разбор только нужных областей страниц групп, альбомов и участников
+    PARSER_SELECTIVE: bool = os.getenv("PARSER_SELECTIVE", "true").lower() == "true"
+
+    # Разбор страниц в пуле процессов
+    PARSE_POOL_ENABLED: bool = os.getenv("PARSE_POOL_ENABLED", "false").lower() == "true"
+    PARSE_POOL_WORKERS: int = int(os.getenv("PARSE_POOL_WORKERS", max((os.cpu_count() or 2) - 1, 1)))
+    # Страницы меньше порога (в символах) разбираются в вызывающем потоке
+    PARSE_POOL_INLINE_THRESHOLD: int = int(os.getenv("PARSE_POOL_INLINE_THRESHOLD", 64 * 1024))
+    PARSE_POOL_MAX_PENDING: int = int(os.getenv("PARSE_POOL_MAX_PENDING", 32))
+
+    # Загрузка дискографии группы в базу: одновременных загрузок альбомов и альбомов в одном SSE-событии
+    INGEST_ALBUM_CONCURRENCY: int = int(os.getenv("INGEST_ALBUM_CONCURRENCY", 4))
+    INGEST_PROGRESS_BATCH: int = int(os.getenv("INGEST_PROGRESS_BATCH", 20))
+
+    # Обход всех страниц выдачи (all_pages): одновременных загрузок на один обход и предел числа страниц
+    PAGINATION_MAX_CONCURRENCY: int = int(os.getenv("PAGINATION_MAX_CONCURRENCY", 4))
+    PAGINATION_MAX_PAGES: int = int(os.getenv("PAGINATION_MAX_PAGES", 200))
+
+    # Результаты разбора по хешу содержимого страницы
+    PARSE_MEMO_ENABLED: bool = os.getenv("PARSE_MEMO_ENABLED", "true").lower() == "true"
+    PARSE_MEMO_MAX_BYTES: int = int(os.getenv("PARSE_MEMO_MAX_BYTES", 64 * 1024 * 1024))
+    PARSE_MEMO_COMPRESSION_LEVEL: int = int(os.getenv("PARSE_MEMO_COMPRESSION_LEVEL", 1))
+
+    # Поиск групп из базы (only_local) по индексу в памяти, загружаемому при запуске
+    BAND_SEARCH_INDEX_ENABLED: bool = os.getenv("BAND_SEARCH_INDEX_ENABLED", "true").lower() == "true"
+
+    # Локальная статистика: период полного пересчёта счётчиков и время жизни статистики Metal Archives, в секундах
+    STATS_RECONCILE_INTERVAL: int = int(os.getenv("STATS_RECONCILE_INTERVAL", 6 * 60 * 60))
+    STATS_MA_TTL: int = int(os.getenv("STATS_MA_TTL", 5 * 60))
+
+    # Краткая дискография в документе группы: просмотр группы не обращается к коллекции albums
+    BAND_EMBED_SHORT_DISCOGRAPHY: bool = os.getenv("BAND_EMBED_SHORT_DISCOGRAPHY", "true").lower() == "true"
+
 settings = Settings()
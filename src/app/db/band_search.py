@@ -0,0 +1,212 @@
+import bisect
+import heapq
+import math
+import time
+import unicodedata
+from array import array
+from typing import Dict
+
+from pymongo.asynchronous.collection import AsyncCollection
+from pymongo.errors import PyMongoError
+
+from app.core.config import settings
+from app.page_handler.data_parser.models import BandSearch
+
+# Буквы, которые NFKD не раскладывает на базовую букву и диакритику
+_FOLD = str.maketrans({
+    'ø': 'o', 'æ': 'ae', 'œ': 'oe', 'ß': 'ss', 'ł': 'l', 'đ': 'd', 'ð': 'd', 'þ': 'th', 'ı': 'i', 'ə': 'e',
+})
+
+SEARCH_PROJECTION = {'_id': 0, 'id': 1, 'name': 1, 'name_slug': 1, 'genres': 1, 'country': 1}
+
+# Доля общих триграмм, при которой название считается похожим на запрос с опечаткой
+FUZZY_MIN_SIMILARITY = 0.5
+# Предел проверяемых кандидатов для запроса с опечаткой: поиск остаётся быстрым и на частых триграммах
+FUZZY_MAX_CANDIDATES = 2000
+
+
+def fold(text: str | None) -> str:
+    """Нижний регистр без диакритики, знаки препинания заменены пробелами"""
+    if not text:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', text.casefold().translate(_FOLD))
+    letters = ''.join(
+        char if char.isalnum() else ' '
+        for char in decomposed if not unicodedata.combining(char)
+    )
+    return ' '.join(letters.split())
+
+
+def trigrams(folded: str) -> set[str]:
+    return {folded[index:index + 3] for index in range(len(folded) - 2)}
+
+
+def word_tails(folded: str) -> list[str]:
+    """Окончания названия, начинающиеся со второго и следующих слов"""
+    return [folded[index + 1:] for index, char in enumerate(folded) if char == ' ']
+
+
+class BandSearchIndex:
+    """Поиск групп из базы по названию без обращения к MongoDB.
+
+    Названия приводятся к виду без регистра и диакритики («Mötley Crüe»
+    находится по «motley crue»). Совпадения с начала названия и с начала
+    слова берутся двоичным поиском из отсортированных списков, вхождения
+    в середине слова — проверкой кандидатов из самого короткого списка
+    триграмм запроса. Если совпадений нет, выдаются названия с большой
+    долей общих триграмм (опечатки).
+
+    Списки триграмм только дополняются: после переименования группы старые
+    записи остаются, но отсекаются проверкой по текущему названию.
+    """
+
+    def __init__(self):
+        self._bands: Dict[int, BandSearch] = {}
+        self._names: Dict[int, str] = {}
+        self._prefixes: list[tuple[str, int]] = []
+        self._words: list[tuple[str, int]] = []
+        self._postings: Dict[str, array] = {}
+        self.ready = False
+        self._searches = 0
+        self._search_time = 0.0
+
+    async def load(self, collection: AsyncCollection) -> bool:
+        """Заполняет индекс документами коллекции bands"""
+        try:
+            async for band in collection.find({}, SEARCH_PROJECTION):
+                if band.get('id') is not None:
+                    self._add(BandSearch(**band))
+        except PyMongoError as err:
+            print(f"Не удалось загрузить индекс поиска групп: {err}")
+            return False
+        # Отсортированные списки строятся один раз, а не вставками по одной
+        self._prefixes = sorted((name, band_id) for band_id, name in self._names.items())
+        self._words = sorted(
+            (tail, band_id) for band_id, name in self._names.items() for tail in word_tails(name)
+        )
+        self.ready = True
+        return True
+
+    def add(self, band) -> None:
+        """Добавляет или обновляет группу (BandInformation, BandSearch).
+
+        Пока индекс выключен или не загружен, поиск идёт через MongoDB,
+        и держать в памяти отдельные группы незачем.
+        """
+        if not settings.BAND_SEARCH_INDEX_ENABLED or not self.ready:
+            return
+        self._add(band)
+
+    def _add(self, band) -> None:
+        if band.id is None:
+            return
+        self._bands[band.id] = BandSearch(
+            id=band.id,
+            name=band.name,
+            name_slug=band.name_slug,
+            genres=band.genres,
+            country=band.country,
+        )
+        folded = fold(band.name)
+        previous = self._names.get(band.id)
+        if previous == folded:
+            return
+
+        known = set()
+        if previous is not None:
+            known = trigrams(previous)
+            if self.ready:
+                _remove(self._prefixes, (previous, band.id))
+                for tail in word_tails(previous):
+                    _remove(self._words, (tail, band.id))
+        self._names[band.id] = folded
+        if self.ready:
+            bisect.insort(self._prefixes, (folded, band.id))
+            for tail in word_tails(folded):
+                bisect.insort(self._words, (tail, band.id))
+        for gram in trigrams(folded) - known:
+            self._postings.setdefault(gram, array('q')).append(band.id)
+
+    def search(self, query: str, limit: int = 20) -> list[BandSearch]:
+        """Порядок выдачи: начало названия, начало слова, середина слова, похожие.
+
+        Точное совпадение идёт первым, так как короче остальных названий с тем же началом.
+        """
+        started = time.perf_counter()
+        folded = fold(query)
+        found = {}
+        if folded:
+            for sorted_list in (self._prefixes, self._words):
+                for band_id in _starting_with(sorted_list, folded, limit):
+                    found.setdefault(band_id)
+                if len(found) >= limit:
+                    break
+            if len(found) < limit and len(folded) >= 3:
+                for band_id in self._by_substring(folded, limit - len(found), found):
+                    found.setdefault(band_id)
+            if not found and len(folded) >= 3:
+                found = dict.fromkeys(self._by_similarity(folded, limit))
+        self._searches += 1
+        self._search_time += time.perf_counter() - started
+        return [self._bands[band_id] for band_id in list(found)[:limit]]
+
+    def _by_substring(self, folded: str, limit: int, exclude: Dict[int, None]) -> list[int]:
+        postings = [self._postings.get(gram) for gram in trigrams(folded)]
+        if not all(postings):
+            return []
+        names = self._names
+        matches = {
+            (len(names[band_id]), names[band_id], band_id)
+            for band_id in min(postings, key=len)
+            if band_id not in exclude and folded in names[band_id]
+        }
+        return [band_id for _, _, band_id in heapq.nsmallest(limit, matches)]
+
+    def _by_similarity(self, folded: str, limit: int) -> list[int]:
+        grams = trigrams(folded)
+        needed = math.ceil(len(grams) * FUZZY_MIN_SIMILARITY)
+        # Название с needed общими триграммами содержит хотя бы одну из len - needed + 1 самых редких
+        rarest = sorted((self._postings.get(gram, ()) for gram in grams), key=len)[:len(grams) - needed + 1]
+        candidates = set()
+        for posting in rarest:
+            candidates.update(posting[:FUZZY_MAX_CANDIDATES - len(candidates)])
+            if len(candidates) >= FUZZY_MAX_CANDIDATES:
+                break
+        names = self._names
+        scored = []
+        for band_id in candidates:
+            name_grams = trigrams(names[band_id])
+            shared = len(grams & name_grams)
+            if shared >= needed:
+                scored.append((-shared / len(grams | name_grams), len(names[band_id]), band_id))
+        return [band_id for _, _, band_id in heapq.nsmallest(limit, scored)]
+
+    def get_stats(self) -> Dict:
+        return {
+            'ready': self.ready,
+            'bands': len(self._bands),
+            'trigrams': len(self._postings),
+            'postings': sum(len(ids) for ids in self._postings.values()),
+            'searches': self._searches,
+            'avg_search_ms': round(self._search_time / self._searches * 1000, 3) if self._searches else 0.0,
+        }
+
+
+def _starting_with(sorted_list: list[tuple[str, int]], folded: str, limit: int) -> list[int]:
+    start = bisect.bisect_left(sorted_list, (folded, -1))
+    found = []
+    for index in range(start, min(start + limit, len(sorted_list))):
+        name, band_id = sorted_list[index]
+        if not name.startswith(folded):
+            break
+        found.append(band_id)
+    return found
+
+
+def _remove(sorted_list: list[tuple[str, int]], entry: tuple[str, int]):
+    index = bisect.bisect_left(sorted_list, entry)
+    if index < len(sorted_list) and sorted_list[index] == entry:
+        del sorted_list[index]
+
+
+band_search_index = BandSearchIndex()
@@ -0,0 +1,129 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict
+
+from pymongo import ASCENDING, IndexModel
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo.errors import PyMongoError
+
+# Сравнение без учёта регистра: имена пользователей ищутся точным совпадением с этой коллацией
+CASE_INSENSITIVE = {'locale': 'en', 'strength': 2}
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    collection: str
+    name: str
+    keys: tuple[tuple[str, Any], ...]
+    unique: bool = False
+    sparse: bool = False
+    collation: Dict | None = field(default=None, hash=False)
+
+    def model(self) -> IndexModel:
+        options = {'name': self.name, 'unique': self.unique, 'sparse': self.sparse}
+        if self.collation is not None:
+            options['collation'] = self.collation
+        return IndexModel(list(self.keys), **options)
+
+    def matches(self, info: Dict) -> bool:
+        """Совпадают ли ключи и параметры с индексом из index_information()"""
+        if tuple(tuple(key) for key in info['key']) != self.keys:
+            return False
+        if bool(info.get('unique')) != self.unique or bool(info.get('sparse')) != self.sparse:
+            return False
+        collation = info.get('collation')
+        if self.collation is None:
+            return collation is None
+        return collation is not None and all(collation.get(key) == value for key, value in self.collation.items())
+
+
+DEFAULT_INDEXES = [
+    IndexSpec('bands', 'id_unique', (('id', ASCENDING),), unique=True),
+    # Поиск по подстроке названия просматривает ключи индекса, а не документы
+    IndexSpec('bands', 'name', (('name', ASCENDING),)),
+    # Правка альбома обновляет его копию в краткой дискографии групп
+    IndexSpec('bands', 'discography_short_id', (('discography_short.id', ASCENDING),)),
+    IndexSpec('albums', 'id_unique', (('id', ASCENDING),), unique=True),
+    # Обновление текста песни: фильтр по id альбома и tracklist.id
+    IndexSpec('albums', 'id_tracklist_id', (('id', ASCENDING), ('tracklist.id', ASCENDING))),
+    IndexSpec('members', 'id_unique', (('id', ASCENDING),), unique=True),
+    IndexSpec('users', 'username_unique_ci', (('username', ASCENDING),), unique=True, collation=CASE_INSENSITIVE),
+    # AuthMiddleware ищет пользователя по email на каждом запросе
+    IndexSpec('users', 'email', (('email', ASCENDING),), sparse=True),
+]
+
+
+class IndexManager:
+    """Создание индексов MongoDB при запуске и отчёт по ним.
+
+    Недостающие индексы создаются, существующие с другими параметрами
+    и не описанные здесь не удаляются, а попадают в отчёт. По $indexStats
+    отмечаются индексы, к которым не было обращений с запуска сервера.
+    """
+
+    def __init__(self, db: AsyncDatabase, specs: list[IndexSpec] = DEFAULT_INDEXES):
+        self._db = db
+        self._specs = specs
+        self.last_report: Dict | None = None
+
+    async def ensure(self) -> Dict:
+        report = {}
+        for collection in sorted({spec.collection for spec in self._specs}):
+            report[collection] = await self._ensure_collection(collection)
+        self.last_report = report
+        return report
+
+    async def report(self) -> Dict:
+        """Состояние индексов без изменений в базе"""
+        report = {}
+        for collection in sorted({spec.collection for spec in self._specs}):
+            report[collection] = await self._ensure_collection(collection, create=False)
+        return report
+
+    async def _ensure_collection(self, collection: str, create: bool = True) -> Dict:
+        specs = [spec for spec in self._specs if spec.collection == collection]
+        status = {'present': [], 'created': [], 'missing': [], 'conflicting': [], 'failed': {}, 'undeclared': [], 'unused': []}
+        try:
+            existing = await self._db[collection].index_information()
+        except PyMongoError as err:
+            status['failed'][collection] = str(err)
+            return status
+
+        declared = set()
+        for spec in specs:
+            info = existing.get(spec.name)
+            same_keys = [name for name, index in existing.items() if spec.matches(index)]
+            if info is not None and spec.matches(info):
+                status['present'].append(spec.name)
+                declared.add(spec.name)
+            elif info is None and same_keys:
+                # Такой же индекс уже есть под другим именем
+                status['present'].append(same_keys[0])
+                declared.add(same_keys[0])
+            elif info is not None:
+                status['conflicting'].append(spec.name)
+                declared.add(spec.name)
+            elif not create:
+                status['missing'].append(spec.name)
+            else:
+                try:
+                    await self._db[collection].create_indexes([spec.model()])
+                    status['created'].append(spec.name)
+                    declared.add(spec.name)
+                except PyMongoError as err:
+                    # Например, дубликаты id не дают построить уникальный индекс
+                    status['failed'][spec.name] = str(err)
+
+        status['undeclared'] = sorted(set(existing) - declared - {'_id_'})
+        try:
+            usage = await self._usage(collection)
+        except PyMongoError:
+            usage = {}
+        status['unused'] = sorted(
+            name for name, ops in usage.items()
+            if ops == 0 and name != '_id_' and name not in status['created']
+        )
+        return status
+
+    async def _usage(self, collection: str) -> Dict[str, int]:
+        cursor = await self._db[collection].aggregate([{'$indexStats': {}}])
+        return {stats['name']: stats['accesses']['ops'] for stats in await cursor.to_list()}
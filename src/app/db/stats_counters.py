@@ -0,0 +1,169 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import Dict, Iterable
+
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo.errors import DuplicateKeyError, PyMongoError
+
+from app.core.config import settings
+from app.page_handler.data_parser.models import BandStatInfo, StatInfo
+
+COUNTERS_ID = 'local'
+# Сколько раз сверка пересчитывает заново, если счётчики изменились во время пересчёта
+RECONCILE_ATTEMPTS = 3
+
+# Статус группы на Metal Archives -> поле BandStatInfo
+STATUS_FIELDS = {
+    'Active': 'active',
+    'On hold': 'on_hold',
+    'Split-up': 'split_up',
+    'Changed name': 'changed_name',
+    'Unknown': 'unknown',
+}
+
+# Текст есть, если это непустая строка; то же правило, что и в track_counts
+LYRICS_PRESENT = {'$ne': [{'$ifNull': ['$$this.lyrics', '']}, '']}
+
+
+def track_counts(tracklist: Iterable | None) -> tuple[int, int]:
+    """Число песен и песен с текстом (Track или словари из базы)"""
+    songs = lyrics = 0
+    for track in tracklist or ():
+        songs += 1
+        text = track.get('lyrics') if isinstance(track, dict) else track.lyrics
+        lyrics += bool(text)
+    return songs, lyrics
+
+
+class StatsCounters:
+    """Счётчики локальной статистики в одном документе коллекции stats.
+
+    Пути записи в роутерах групп, альбомов и текстов увеличивают их через
+    $inc на разницу между старым и новым документом, поэтому /api/stats
+    читает один документ вместо агрегаций по всем группам и альбомам.
+    Изменения в обход роутеров исправляет периодическая сверка с полным
+    пересчётом. Каждый $inc увеличивает поле version, и сверка заменяет
+    документ, только если версия не изменилась за время пересчёта, иначе
+    пересчитывает заново: одновременные $inc не теряются.
+
+    Сверка ставит поле reconciled_at. Документ без него создан $inc до
+    первой сверки и содержит только приращения, поэтому read() его не отдаёт.
+    """
+
+    def __init__(self, db: AsyncDatabase, reconcile_interval: int = settings.STATS_RECONCILE_INTERVAL):
+        self._db = db
+        self._reconcile_interval = reconcile_interval
+        self.last_reconcile: Dict | None = None
+
+    async def read(self) -> StatInfo | None:
+        document = await self._db.stats.find_one({'_id': COUNTERS_ID})
+        if document is None or document.get('reconciled_at') is None:
+            return None
+        bands = BandStatInfo(**document.get('bands', {}))
+        bands.total = sum(getattr(bands, field) for field in STATUS_FIELDS.values())
+        return StatInfo(
+            bands=bands,
+            albums=document.get('albums', 0),
+            songs=document.get('songs', 0),
+            lyrics=document.get('lyrics', 0),
+        )
+
+    async def band_changed(self, old_status: str | None, new_status: str | None, created: bool = False):
+        increments = {}
+        if not created and old_status in STATUS_FIELDS:
+            increments[f'bands.{STATUS_FIELDS[old_status]}'] = -1
+        if new_status in STATUS_FIELDS:
+            key = f'bands.{STATUS_FIELDS[new_status]}'
+            increments[key] = increments.get(key, 0) + 1
+        await self._inc(increments)
+
+    async def albums_changed(self, albums: int = 0, songs: int = 0, lyrics: int = 0):
+        await self._inc({'albums': albums, 'songs': songs, 'lyrics': lyrics})
+
+    async def _inc(self, increments: Dict[str, int]):
+        increments = {key: value for key, value in increments.items() if value}
+        if not increments:
+            return
+        try:
+            await self._db.stats.update_one(
+                {'_id': COUNTERS_ID}, {'$inc': {**increments, 'version': 1}}, upsert=True,
+            )
+        except PyMongoError as err:
+            # Запись данных уже прошла, счётчик поправит сверка
+            print(f"Не удалось обновить счётчики статистики: {err}")
+
+    async def reconcile(self) -> Dict | None:
+        """Полный пересчёт по коллекциям; возвращает расхождение со счётчиками.
+
+        None, если счётчики менялись во время каждой из попыток: сверка
+        будет повторена в следующий раз.
+        """
+        for _ in range(RECONCILE_ATTEMPTS):
+            stored = await self._db.stats.find_one({'_id': COUNTERS_ID})
+            actual = await self._count()
+            version = (stored or {}).get('version') or 0
+            document = {
+                '_id': COUNTERS_ID,
+                **actual,
+                'version': version + 1,
+                'reconciled_at': datetime.now(timezone.utc),
+            }
+            if stored is None:
+                try:
+                    await self._db.stats.insert_one(document)
+                except DuplicateKeyError:
+                    # Документ создал $inc из пути записи
+                    continue
+            else:
+                # Отсутствующее поле version совпадает с фильтром None
+                result = await self._db.stats.replace_one(
+                    {'_id': COUNTERS_ID, 'version': stored.get('version')}, document,
+                )
+                if result.matched_count == 0:
+                    continue
+
+            stored = stored or {}
+            drift = {
+                f'bands.{field}': count - stored.get('bands', {}).get(field, 0)
+                for field, count in actual['bands'].items()
+            }
+            drift.update({key: actual[key] - stored.get(key, 0) for key in ('albums', 'songs', 'lyrics')})
+            self.last_reconcile = {key: value for key, value in drift.items() if value}
+            return self.last_reconcile
+        return None
+
+    async def _count(self) -> Dict:
+        cursor = await self._db.bands.aggregate([{'$group': {'_id': '$status', 'count': {'$sum': 1}}}])
+        by_status = {row['_id']: row['count'] for row in await cursor.to_list()}
+        cursor = await self._db.albums.aggregate([
+            {'$project': {'tracklist': {'$ifNull': ['$tracklist', []]}}},
+            {'$group': {
+                '_id': None,
+                'albums': {'$sum': 1},
+                'songs': {'$sum': {'$size': '$tracklist'}},
+                'lyrics': {'$sum': {'$size': {'$filter': {
+                    'input': '$tracklist',
+                    'cond': LYRICS_PRESENT,
+                }}}},
+            }},
+        ])
+        totals = (await cursor.to_list()) or [{}]
+        return {
+            'bands': {field: by_status.get(status, 0) for status, field in STATUS_FIELDS.items()},
+            'albums': totals[0].get('albums', 0),
+            'songs': totals[0].get('songs', 0),
+            'lyrics': totals[0].get('lyrics', 0),
+        }
+
+    async def run(self):
+        """Сверка при запуске и затем каждые reconcile_interval секунд"""
+        while True:
+            try:
+                drift = await self.reconcile()
+                if drift is None:
+                    print("Сверка статистики отложена: счётчики менялись во время пересчёта")
+                elif drift:
+                    print(f"Сверка статистики, расхождения: {drift}")
+            except PyMongoError as err:
+                print(f"Ошибка сверки статистики: {err}")
+            await asyncio.sleep(self._reconcile_interval)
@@ -22,17 +22,22 @@ def get_band_links_message():
     'message': 'Началась обработка ссылок группы'
   }
 
-def get_new_album_message(album: AlbumInformation) -> SSE_response:
+def _album_data(album: AlbumInformation) -> dict:
   return {
-    'type': 'new_album',
-    'message': f'Добавлен новый альбом {album.band_names} - {album.title} ({album.release_date})',
+    'id': album.id,
+    'title': album.title,
+    'title_slug': album.title_slug,
+    'type': album.type,
+    'release_date': album.release_date,
+    'cover_url': album.cover_url,
+  }
+
+def get_new_albums_message(albums: List[AlbumInformation]) -> SSE_response:
+  return {
+    'type': 'new_albums',
+    'message': f'Добавлено альбомов: {len(albums)}',
     'data': {
-      'id': album.id,
-      'title': album.title,
-      'title_slug': album.title_slug,
-      'type': album.type,
-      'release_date': album.release_date,
-      'cover_url': album.cover_url,
+      'albums': [_album_data(album) for album in albums],
     }
   }
 
@@ -0,0 +1,235 @@
+import asyncio
+import contextvars
+import copy
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from functools import partial
+from typing import Any, Callable, Hashable
+
+from fastapi import Request
+
+from app.core.config import settings
+from app.page_handler.fanout import SubFetch
+from app.page_handler.handler import MetalArchivesPageHandler, bypass_cache, cancel_token
+from app.page_handler.models import PageInfo
+from app.page_handler.priority_gate import Priority, PriorityGate
+from app.page_handler.single_flight import SingleFlight, normalize_url
+
+# Класс приоритета текущей загрузки: вложенные загрузки ждут слот с тем же приоритетом
+current_priority: ContextVar[Priority] = ContextVar('current_priority', default=Priority.INTERACTIVE)
+
+
+class AsyncPageHandler:
+    """Асинхронный фасад над MetalArchivesPageHandler.
+
+    Загрузка и разбор страниц выполняются в отдельном пуле потоков,
+    поэтому event loop не блокируется на время работы браузера.
+    Слоты пула выдаются по классу приоритета: запросы пользователей
+    (interactive) обслуживаются раньше предзагрузки и фоновых задач.
+    Вложенные загрузки (дискография, ссылки) получают слоты из того же
+    пула и с тем же приоритетом, что и загрузка, которая их запустила.
+    """
+
+    def __init__(
+        self,
+        handler: MetalArchivesPageHandler,
+        max_concurrency: int = settings.SCRAPE_MAX_CONCURRENCY,
+        disconnect_poll_interval: float = settings.SCRAPE_DISCONNECT_POLL_INTERVAL,
+    ):
+        self.sync = handler
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='scrape')
+        self._gate = PriorityGate(capacity=max_concurrency)
+        self._max_concurrency = max_concurrency
+        self._disconnect_poll_interval = disconnect_poll_interval
+        self._flights = SingleFlight()
+        self._in_flight = 0
+        self._waiting = 0
+        self._completed_total = 0
+        self._cancelled_total = 0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        handler.set_dispatcher(self._dispatch_subfetch)
+
+    def close(self):
+        self.sync.set_dispatcher(None)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def get_band_info(
+        self, url: str, request: Request | None = None, priority: Priority = Priority.INTERACTIVE, refresh: bool = False,
+    ) -> PageInfo:
+        return await self._run(self.sync.get_band_info, url, request=request, priority=priority, refresh=refresh)
+
+    async def search_band_info(self, url: str, request: Request | None = None, priority: Priority = Priority.INTERACTIVE) -> PageInfo:
+        return await self._run(self.sync.search_band_info, url, request=request, priority=priority)
+
+    async def search_album_info(self, url: str, request: Request | None = None, priority: Priority = Priority.INTERACTIVE) -> PageInfo:
+        return await self._run(self.sync.search_album_info, url, request=request, priority=priority)
+
+    async def get_band_similar(self, url: str, request: Request | None = None, priority: Priority = Priority.INTERACTIVE) -> PageInfo:
+        return await self._run(self.sync.get_band_similar, url, request=request, priority=priority)
+
+    async def advanced_band_search(self, url: str, request: Request | None = None, priority: Priority = Priority.INTERACTIVE) -> PageInfo:
+        return await self._run(self.sync.advanced_band_search, url, request=request, priority=priority)
+
+    async def advanced_album_search(self, url: str, request: Request | None = None, priority: Priority = Priority.INTERACTIVE) -> PageInfo:
+        return await self._run(self.sync.advanced_album_search, url, request=request, priority=priority)
+
+    async def advanced_song_search(self, url: str, request: Request | None = None, priority: Priority = Priority.INTERACTIVE) -> PageInfo:
+        return await self._run(self.sync.advanced_song_search, url, request=request, priority=priority)
+
+    async def get_album_info(
+        self, url: str, request: Request | None = None, priority: Priority = Priority.INTERACTIVE, refresh: bool = False,
+    ) -> PageInfo:
+        return await self._run(self.sync.get_album_info, url, request=request, priority=priority, refresh=refresh)
+
+    async def get_lyrics(self, url: str, request: Request | None = None, priority: Priority = Priority.INTERACTIVE) -> PageInfo:
+        return await self._run(self.sync.get_lyrics, url, request=request, priority=priority)
+
+    async def get_member(self, url: str, request: Request | None = None, priority: Priority = Priority.INTERACTIVE) -> PageInfo:
+        return await self._run(self.sync.get_member, url, request=request, priority=priority)
+
+    async def get_bands_by_genre(self, url: str, request: Request | None = None, priority: Priority = Priority.INTERACTIVE) -> PageInfo:
+        return await self._run(self.sync.get_bands_by_genre, url, request=request, priority=priority)
+
+    async def get_bands_by_country(self, url: str, request: Request | None = None, priority: Priority = Priority.INTERACTIVE) -> PageInfo:
+        return await self._run(self.sync.get_bands_by_country, url, request=request, priority=priority)
+
+    async def get_bands_by_letter(self, url: str, request: Request | None = None, priority: Priority = Priority.INTERACTIVE) -> PageInfo:
+        return await self._run(self.sync.get_bands_by_letter, url, request=request, priority=priority)
+
+    async def get_rip_artists(self, url: str, request: Request | None = None, priority: Priority = Priority.INTERACTIVE) -> PageInfo:
+        return await self._run(self.sync.get_rip_artists, url, request=request, priority=priority)
+
+    async def get_stats(self, url: str, request: Request | None = None, priority: Priority = Priority.INTERACTIVE) -> PageInfo:
+        return await self._run(self.sync.get_stats, url, request=request, priority=priority)
+
+    async def get_page(self, url: str, request: Request | None = None, priority: Priority = Priority.INTERACTIVE) -> PageInfo:
+        return await self._run(self.sync.get_page, url, request=request, priority=priority)
+
+    def get_metrics(self) -> dict:
+        return {
+            **self.sync.get_metrics(),
+            'executor': {
+                'max_concurrency': self._max_concurrency,
+                'in_flight': self._in_flight,
+                'waiting': self._waiting,
+                'completed_total': self._completed_total,
+                'cancelled_total': self._cancelled_total,
+            },
+            'single_flight': self._flights.get_stats(),
+            'priority': self._gate.get_stats(),
+        }
+
+    async def _run(
+        self,
+        func: Callable[..., PageInfo],
+        url: str,
+        request: Request | None = None,
+        priority: Priority = Priority.INTERACTIVE,
+        refresh: bool = False,
+    ) -> PageInfo:
+        # Одновременные вызовы одного метода с одним URL ждут одну загрузку.
+        # Запрос обновления не присоединяется к загрузке, которая может вернуть ответ из кеша
+        key = (func.__name__, normalize_url(url), refresh)
+        flight, is_leader = self._flights.join(
+            key=key,
+            start=lambda token: self._execute(func, url, token, priority, key, refresh),
+        )
+        if not is_leader:
+            # Загрузка, запущенная фоновой задачей, ещё ждёт слот: ускоряем её для более срочного запроса
+            self._gate.promote(key, priority)
+        try:
+            if request is None:
+                result = await asyncio.shield(flight.task)
+            else:
+                watcher = asyncio.ensure_future(self._wait_disconnect(request))
+                try:
+                    await asyncio.wait({flight.task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    watcher.cancel()
+
+                if not flight.task.done():
+                    # Клиент отключился: если загрузку больше никто не ждёт, она будет отменена
+                    self._cancelled_total += 1
+                    return PageInfo(url=url, processing_time=0.0, error="Клиент отключился, загрузка отменена")
+                result = flight.task.result()
+        finally:
+            self._flights.leave(flight)
+
+        # Ведомые вызовы получают копию, чтобы изменения результата не затрагивали друг друга
+        return result if is_leader else copy.deepcopy(result)
+
+    async def _execute(
+        self,
+        func: Callable[..., PageInfo],
+        url: str,
+        token: threading.Event,
+        priority: Priority,
+        key: Hashable,
+        refresh: bool = False,
+    ) -> PageInfo:
+        self._loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        context.run(cancel_token.set, token)
+        context.run(current_priority.set, priority)
+        context.run(bypass_cache.set, refresh)
+        self._waiting += 1
+        try:
+            granted = await self._gate.acquire(priority, key=key)
+        finally:
+            self._waiting -= 1
+
+        result = await self._submit(partial(context.run, func, url), granted)
+        self._completed_total += 1
+        return result
+
+    def _dispatch_subfetch(self, fetch: SubFetch):
+        """Вызывается из потока родительской загрузки"""
+        priority = fetch.context.get(current_priority, Priority.INTERACTIVE)
+        waiter = asyncio.run_coroutine_threadsafe(self._execute_subfetch(fetch, priority), self._loop)
+        fetch.on_cancel(waiter.cancel)
+
+    async def _execute_subfetch(self, fetch: SubFetch, priority: Priority):
+        self._waiting += 1
+        try:
+            granted = await self._gate.acquire(priority)
+        finally:
+            self._waiting -= 1
+
+        if not fetch.claim():
+            # Родитель дошёл до результата раньше и выполнил загрузку сам, либо отменил её
+            self._gate.release(granted)
+            return
+
+        await self._submit(fetch.run, granted)
+
+    def _submit(self, func: Callable[[], Any], granted: Priority) -> asyncio.Future:
+        """Запускает func в пуле потоков под выданным слотом.
+
+        Слот освобождается, когда поток закончил работу, а не когда отменён
+        ожидающий: иначе отменённая загрузка продолжает занимать браузер,
+        а её слот уже отдан следующей.
+        """
+        loop = asyncio.get_running_loop()
+        self._in_flight += 1
+        try:
+            future = self._executor.submit(func)
+        except RuntimeError:
+            # Пул уже остановлен
+            self._finish(granted)
+            raise
+
+        def done(_):
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(self._finish, granted)
+
+        future.add_done_callback(done)
+        return asyncio.wrap_future(future)
+
+    def _finish(self, granted: Priority):
+        self._in_flight -= 1
+        self._gate.release(granted)
+
+    async def _wait_disconnect(self, request: Request):
+        while not await request.is_disconnected():
+            await asyncio.sleep(self._disconnect_poll_interval)
@@ -0,0 +1,440 @@
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack, contextmanager
+from enum import Enum
+from typing import Callable, ContextManager, Dict, Iterator
+
+import psutil
+from seleniumbase import SB
+
+from app.core.config import settings
+
+
+class BrowserPoolError(Exception):
+    """Ошибка пула браузеров"""
+
+
+class BrowserPoolExhausted(BrowserPoolError):
+    """Нет свободного браузера: очередь ожидания переполнена или истёк таймаут"""
+
+
+class SessionState(str, Enum):
+    IDLE = 'idle'
+    BUSY = 'busy'
+    UNHEALTHY = 'unhealthy'
+    RECYCLING = 'recycling'
+
+
+def default_session_factory() -> ContextManager[SB]:
+    return SB(uc=True, incognito=True, locale="en")
+
+
+def browser_pid(sb: SB) -> int | None:
+    """PID процесса Chrome (в UC-режиме) или chromedriver"""
+    driver = getattr(sb, 'driver', None)
+    pid = getattr(driver, 'browser_pid', None)
+    if pid is None:
+        process = getattr(getattr(driver, 'service', None), 'process', None)
+        pid = getattr(process, 'pid', None)
+    return pid if isinstance(pid, int) else None
+
+
+def process_tree_rss(pid: int) -> int | None:
+    """Суммарный RSS процесса и всех его потомков (renderer, GPU и т.д.) в байтах"""
+    try:
+        root = psutil.Process(pid)
+        processes = [root, *root.children(recursive=True)]
+    except psutil.Error:
+        return None
+    rss = 0
+    for process in processes:
+        try:
+            rss += process.memory_info().rss
+        except psutil.Error:
+            continue
+    return rss
+
+
+class BrowserSession:
+    """Одна сессия undetected-Chrome внутри пула"""
+
+    def __init__(
+        self,
+        session_id: int,
+        factory: Callable[[], ContextManager[SB]],
+        start_hooks: list[Callable[[SB], None]] | None = None,
+    ):
+        self.id = session_id
+        self.sb: SB | None = None
+        self.state = SessionState.IDLE
+        self.pages_loaded = 0
+        self.errors = 0
+        self.consecutive_errors = 0
+        self.restarts = 0
+        self.restart_reasons: Dict[str, int] = {}
+        self.started_at: float | None = None
+        self.last_used_at: float | None = None
+        self.pid: int | None = None
+        self.rss_bytes: int | None = None
+        self.pages_since_restart = 0
+        # Страницы, загруженные без проверки Cloudflare: после первой сессия может грузить в текущей вкладке
+        self.cleared_pages_since_restart = 0
+        # Результаты последних загрузок для оценки доли ошибок
+        self.recent_results: deque[bool] = deque(maxlen=settings.BROWSER_RECYCLE_ERROR_WINDOW)
+        self.memory_history: deque[tuple[float, int]] = deque(maxlen=settings.BROWSER_MEMORY_HISTORY_SIZE)
+        self.recycle_reason: str | None = None
+        self._factory = factory
+        self._start_hooks = start_hooks if start_hooks is not None else []
+        self._stack: ExitStack | None = None
+
+    def start(self):
+        stack = ExitStack()
+        try:
+            self.sb = stack.enter_context(self._factory())
+            self.sb.driver.set_page_load_timeout(settings.BROWSER_PAGE_LOAD_TIMEOUT)
+        except Exception:
+            stack.close()
+            self.sb = None
+            raise
+        self._stack = stack
+        self.started_at = time.time()
+        self.consecutive_errors = 0
+        self.pages_since_restart = 0
+        self.cleared_pages_since_restart = 0
+        self.recent_results.clear()
+        self.recycle_reason = None
+        self.pid = browser_pid(self.sb)
+        self.rss_bytes = None
+        for hook in self._start_hooks:
+            try:
+                hook(self.sb)
+            except Exception as err:
+                # Браузер работоспособен и без подготовки, загрузка просто пройдёт проверку сама
+                print(f"Ошибка подготовки браузера {self.id}: {err}")
+        self.state = SessionState.IDLE
+
+    def close(self):
+        if self._stack is not None:
+            try:
+                self._stack.close()
+            except Exception:
+                pass
+        self._stack = None
+        self.sb = None
+
+    def restart(self, reason: str = 'manual'):
+        self.close()
+        self.restarts += 1
+        self.restart_reasons[reason] = self.restart_reasons.get(reason, 0) + 1
+        self.start()
+
+    def report_success(self, challenged: bool = False):
+        self.pages_loaded += 1
+        self.pages_since_restart += 1
+        if not challenged:
+            self.cleared_pages_since_restart += 1
+        self.consecutive_errors = 0
+        self.recent_results.append(True)
+        self.last_used_at = time.time()
+
+    def report_failure(self):
+        self.errors += 1
+        self.pages_since_restart += 1
+        self.consecutive_errors += 1
+        self.recent_results.append(False)
+        self.last_used_at = time.time()
+
+    @property
+    def passed_challenge(self) -> bool:
+        return self.cleared_pages_since_restart > 0
+
+    @property
+    def error_rate(self) -> float:
+        if not self.recent_results:
+            return 0.0
+        return self.recent_results.count(False) / len(self.recent_results)
+
+    def sample_memory(self) -> int | None:
+        """Снимает RSS процессов браузера и добавляет точку в историю"""
+        if self.pid is None:
+            return None
+        rss = process_tree_rss(self.pid)
+        if rss is not None:
+            self.rss_bytes = rss
+            self.memory_history.append((round(time.time()), rss))
+        return rss
+
+    def get_stats(self) -> Dict:
+        return {
+            'id': self.id,
+            'state': self.state.value,
+            'pages_loaded': self.pages_loaded,
+            'errors': self.errors,
+            'consecutive_errors': self.consecutive_errors,
+            'restarts': self.restarts,
+            'restart_reasons': dict(self.restart_reasons),
+            'started_at': self.started_at,
+            'last_used_at': self.last_used_at,
+            'pages_since_restart': self.pages_since_restart,
+            'cleared_pages_since_restart': self.cleared_pages_since_restart,
+            'error_rate': round(self.error_rate, 3),
+            'rss_mb': round(self.rss_bytes / 2 ** 20, 1) if self.rss_bytes is not None else None,
+            'recycle_pending': self.recycle_reason,
+            # Точки (время, RSS в МБ) для графика памяти
+            'memory_history': [
+                (timestamp, round(rss / 2 ** 20, 1)) for timestamp, rss in self.memory_history
+            ],
+        }
+
+
+class BrowserPool:
+    """Пул из N сессий браузера с арендой, ограниченной очередью ожидания и метриками.
+
+    Фоновый сторож периодически снимает RSS браузеров и перезапускает
+    сессии, превысившие лимиты по числу страниц, памяти, доле ошибок
+    или времени жизни. Занятая сессия перезапускается после возврата
+    в пул, так что выполняющиеся загрузки не прерываются. Перезапуск
+    идёт в фоновом потоке: запрос, вернувший сессию, его не ждёт.
+    """
+
+    def __init__(
+        self,
+        size: int = settings.BROWSER_POOL_SIZE,
+        session_factory: Callable[[], ContextManager[SB]] = default_session_factory,
+        max_waiters: int = settings.BROWSER_POOL_MAX_WAITERS,
+        lease_timeout: float = settings.BROWSER_LEASE_TIMEOUT,
+        max_consecutive_errors: int = settings.BROWSER_MAX_CONSECUTIVE_ERRORS,
+        recycle_max_pages: int = settings.BROWSER_RECYCLE_MAX_PAGES,
+        recycle_max_rss_mb: float = settings.BROWSER_RECYCLE_MAX_RSS_MB,
+        recycle_max_error_rate: float = settings.BROWSER_RECYCLE_MAX_ERROR_RATE,
+        recycle_max_age: float = settings.BROWSER_RECYCLE_MAX_AGE,
+        watchdog_interval: float = settings.BROWSER_WATCHDOG_INTERVAL,
+    ):
+        if size < 1:
+            raise ValueError("Размер пула должен быть не меньше 1")
+        self._start_hooks: list[Callable[[SB], None]] = []
+        self._sessions = [
+            BrowserSession(session_id=i, factory=session_factory, start_hooks=self._start_hooks) for i in range(size)
+        ]
+        self._idle: deque[BrowserSession] = deque()
+        self._condition = threading.Condition()
+        self._max_waiters = max_waiters
+        self._lease_timeout = lease_timeout
+        self._max_consecutive_errors = max_consecutive_errors
+        self._waiters = 0
+        self._leases_total = 0
+        self._rejected_total = 0
+        self._timeouts_total = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+        self._recycle_max_pages = recycle_max_pages
+        self._recycle_max_rss_bytes = recycle_max_rss_mb * 2 ** 20
+        self._recycle_max_error_rate = recycle_max_error_rate
+        self._recycle_max_age = recycle_max_age
+        self._watchdog_interval = watchdog_interval
+        self._stop = threading.Event()
+        self._watchdog: threading.Thread | None = None
+        self._recyclers: set[threading.Thread] = set()
+
+    def __enter__(self) -> "BrowserPool":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def size(self) -> int:
+        return len(self._sessions)
+
+    def add_start_hook(self, hook: Callable[[SB], None]):
+        """Вызывается для каждого браузера после запуска и перезапуска; подключать до start()"""
+        self._start_hooks.append(hook)
+
+    def start(self):
+        started = []
+        try:
+            for session in self._sessions:
+                session.start()
+                started.append(session)
+                with self._condition:
+                    self._idle.append(session)
+                    self._condition.notify()
+        except Exception:
+            # Уже запущенные браузеры не должны остаться висеть
+            with self._condition:
+                self._idle.clear()
+            for session in started:
+                session.close()
+            raise
+        if self._watchdog_interval > 0:
+            self._watchdog = threading.Thread(target=self._watchdog_loop, name='browser-watchdog', daemon=True)
+            self._watchdog.start()
+
+    def close(self):
+        self._stop.set()
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=5)
+        with self._condition:
+            recyclers = list(self._recyclers)
+        for recycler in recyclers:
+            recycler.join(timeout=5)
+        with self._condition:
+            self._idle.clear()
+        for session in self._sessions:
+            session.close()
+
+    @contextmanager
+    def lease(self, timeout: float | None = None) -> Iterator[BrowserSession]:
+        """Арендует сессию на время блока with и возвращает её в пул"""
+        session = self._acquire(self._lease_timeout if timeout is None else timeout)
+        try:
+            if session.state == SessionState.UNHEALTHY:
+                try:
+                    session.restart(reason='unhealthy')
+                except Exception as err:
+                    raise BrowserPoolError(f"Не удалось перезапустить браузер: {err}") from err
+                session.state = SessionState.BUSY
+            yield session
+        finally:
+            self._release(session)
+
+    def _acquire(self, timeout: float) -> BrowserSession:
+        started = time.monotonic()
+        with self._condition:
+            if not self._idle and self._waiters >= self._max_waiters:
+                self._rejected_total += 1
+                raise BrowserPoolExhausted("Очередь ожидания браузера переполнена")
+
+            self._waiters += 1
+            try:
+                deadline = started + timeout
+                while not self._idle:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts_total += 1
+                        raise BrowserPoolExhausted("Не дождались свободного браузера")
+                    self._condition.wait(remaining)
+                session = self._pick_idle()
+            finally:
+                self._waiters -= 1
+
+            waited = time.monotonic() - started
+            self._leases_total += 1
+            self._wait_time_total += waited
+            self._wait_time_max = max(self._wait_time_max, waited)
+            if session.state != SessionState.UNHEALTHY:
+                session.state = SessionState.BUSY
+            return session
+
+    def _pick_idle(self) -> BrowserSession:
+        # Предпочитаем здоровые сессии, чтобы не тратить время на перезапуск
+        for session in self._idle:
+            if session.state != SessionState.UNHEALTHY:
+                self._idle.remove(session)
+                return session
+        return self._idle.popleft()
+
+    def _release(self, session: BrowserSession):
+        reason = self._recycle_reason(session)
+        if reason is None:
+            self._return(session, SessionState.IDLE)
+            return
+
+        recycler = threading.Thread(
+            target=self._recycle, args=(session, reason), name=f'browser-recycle-{session.id}', daemon=True,
+        )
+        with self._condition:
+            session.state = SessionState.RECYCLING
+            # Множество читает close() из другого потока, меняем его только под блокировкой
+            self._recyclers.add(recycler)
+        recycler.start()
+
+    def _recycle(self, session: BrowserSession, reason: str):
+        """Перезапускает сессию вне пула и возвращает её обратно"""
+        try:
+            if self._stop.is_set():
+                session.close()
+                return
+            state = SessionState.IDLE
+            try:
+                session.restart(reason=reason)
+            except Exception:
+                # Следующая аренда попробует перезапустить ещё раз
+                state = SessionState.UNHEALTHY
+            self._return(session, state)
+        finally:
+            with self._condition:
+                self._recyclers.discard(threading.current_thread())
+
+    def _return(self, session: BrowserSession, state: SessionState):
+        with self._condition:
+            session.state = state
+            self._idle.append(session)
+            self._condition.notify()
+
+    def _recycle_reason(self, session: BrowserSession) -> str | None:
+        """Причина, по которой сессию нужно перезапустить, или None"""
+        if session.sb is None:
+            return 'crashed'
+        if session.consecutive_errors >= self._max_consecutive_errors:
+            return 'consecutive_errors'
+        if session.recycle_reason is not None:
+            return session.recycle_reason
+        if self._recycle_max_pages and session.pages_since_restart >= self._recycle_max_pages:
+            return 'pages'
+        if self._recycle_max_rss_bytes and session.rss_bytes is not None and session.rss_bytes >= self._recycle_max_rss_bytes:
+            return 'memory'
+        if (
+            self._recycle_max_error_rate
+            and len(session.recent_results) == session.recent_results.maxlen
+            and session.error_rate >= self._recycle_max_error_rate
+        ):
+            return 'error_rate'
+        if self._recycle_max_age and session.started_at is not None and time.time() - session.started_at >= self._recycle_max_age:
+            return 'age'
+        return None
+
+    def _watchdog_loop(self):
+        while not self._stop.wait(self._watchdog_interval):
+            for session in self._sessions:
+                if self._stop.is_set():
+                    return
+                session.sample_memory()
+                reason = self._recycle_reason(session)
+                if reason is None:
+                    continue
+                with self._condition:
+                    if session not in self._idle:
+                        # Сессия занята: перезапустится при возврате в пул
+                        session.recycle_reason = reason
+                        continue
+                    # Забираем простаивающую сессию, остальные продолжают обслуживать запросы
+                    self._idle.remove(session)
+                    session.state = SessionState.RECYCLING
+                self._recycle(session, reason)
+
+    def get_stats(self) -> Dict:
+        """Получение метрик пула"""
+        with self._condition:
+            sessions = [session.get_stats() for session in self._sessions]
+            return {
+                'size': self.size,
+                'idle': sum(1 for session in self._sessions if session.state == SessionState.IDLE),
+                'busy': sum(1 for session in self._sessions if session.state == SessionState.BUSY),
+                'unhealthy': sum(1 for session in self._sessions if session.state == SessionState.UNHEALTHY),
+                'recycling': sum(1 for session in self._sessions if session.state == SessionState.RECYCLING),
+                'waiters': self._waiters,
+                'max_waiters': self._max_waiters,
+                'leases_total': self._leases_total,
+                'rejected_total': self._rejected_total,
+                'timeouts_total': self._timeouts_total,
+                'wait_time_avg': round(self._wait_time_total / self._leases_total, 3) if self._leases_total else 0.0,
+                'wait_time_max': round(self._wait_time_max, 3),
+                'restarts_total': sum(session.restarts for session in self._sessions),
+                'rss_mb_total': round(
+                    sum(session.rss_bytes or 0 for session in self._sessions) / 2 ** 20, 1
+                ),
+                'sessions': sessions,
+            }
@@ -0,0 +1,234 @@
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict
+
+from seleniumbase import SB
+
+from app.core.config import settings
+from app.page_handler.browser_pool import BrowserPool
+from app.page_handler.http_fetcher import looks_like_challenge
+from app.page_handler.rate_limiter import AdaptiveRateLimiter
+
+CLEARANCE_COOKIE = 'cf_clearance'
+# Cookies Cloudflare, которые нужны вместе с cf_clearance
+CLOUDFLARE_COOKIES = ('cf_clearance', '__cf_bm', '__cflb', '_cfuvid')
+REFRESH_URL = 'https://www.metal-archives.com/'
+# Во сколько раз больше check_interval может вырасти пауза, пока обновление не даёт нового cf_clearance
+MAX_REFRESH_BACKOFF = 8
+
+
+class ClearanceManager:
+    """Хранит cookies прохождения Cloudflare и раздаёт их HTTP-клиентам и браузерам.
+
+    Cookies снимаются с драйвера SeleniumBase, сохраняются на диск и
+    обновляются фоновым визитом браузера до истечения cf_clearance.
+    Каждый запущенный или перезапущенный браузер пула получает их сразу,
+    поэтому не проходит проверку заново.
+
+    Действующий cf_clearance повторным визитом не продлевается, поэтому
+    перед визитом он удаляется из браузера. Если новый так и не выдан,
+    следующая попытка откладывается, с каждым разом всё дольше.
+    """
+
+    def __init__(
+        self,
+        pool: BrowserPool,
+        store_path: str = settings.CLEARANCE_STORE_PATH,
+        refresh_margin: float = settings.CLEARANCE_REFRESH_MARGIN,
+        check_interval: float = settings.CLEARANCE_CHECK_INTERVAL,
+        rate_limiter: AdaptiveRateLimiter | None = None,
+    ):
+        self._pool = pool
+        self._limiter = rate_limiter
+        self._store_path = store_path
+        self._refresh_margin = refresh_margin
+        self._check_interval = check_interval
+        self._lock = threading.Lock()
+        self._cookies: list[dict] = []
+        self._user_agent: str | None = None
+        self._harvested_at: float | None = None
+        self._listeners: list[Callable[[list[dict], str | None], None]] = []
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._refreshes_total = 0
+        self._refresh_errors_total = 0
+        self._refresh_stalls_total = 0
+        self._injected_total = 0
+        pool.add_start_hook(self.inject)
+
+    @property
+    def expires_at(self) -> float | None:
+        for cookie in self._cookies:
+            if cookie['name'] == CLEARANCE_COOKIE and cookie.get('expiry'):
+                return float(cookie['expiry'])
+        return None
+
+    def is_expiring(self) -> bool:
+        expires_at = self.expires_at
+        if expires_at is None:
+            return not self._cookies
+        return expires_at - self._refresh_margin <= time.time()
+
+    def subscribe(self, listener: Callable[[list[dict], str | None], None]):
+        """Подписывает HTTP-клиент на обновления cookies и User-Agent"""
+        self._listeners.append(listener)
+        if self._cookies:
+            listener(list(self._cookies), self._user_agent)
+
+    def harvest(self, sb: SB):
+        """Снимает cookies Metal Archives и Cloudflare с сессии браузера"""
+        cookies = [
+            cookie for cookie in sb.driver.get_cookies()
+            if 'metal-archives.com' in cookie.get('domain', '') or cookie['name'] in CLOUDFLARE_COOKIES
+        ]
+        user_agent = sb.get_user_agent()
+        with self._lock:
+            self._cookies = cookies
+            self._user_agent = user_agent
+            self._harvested_at = time.time()
+        self._save()
+        for listener in self._listeners:
+            listener(list(cookies), user_agent)
+
+    def inject(self, sb: SB):
+        """Передаёт сохранённые cookies в только что запущенный браузер"""
+        with self._lock:
+            cookies = list(self._cookies)
+            user_agent = self._user_agent
+        if not cookies:
+            return
+        # cf_clearance привязан к User-Agent, с другим браузером он бесполезен
+        if user_agent is not None and sb.get_user_agent() != user_agent:
+            return
+        sb.driver.execute_cdp_cmd('Network.setCookies', {'cookies': [_cdp_cookie(cookie) for cookie in cookies]})
+        self._injected_total += 1
+
+    def load(self):
+        """Загружает сохранённые cookies, отбрасывая истёкшие"""
+        if not os.path.exists(self._store_path):
+            return
+        try:
+            with open(self._store_path, encoding='utf-8') as file:
+                stored = json.load(file)
+        except (OSError, ValueError):
+            return
+
+        now = time.time()
+        cookies = [
+            cookie for cookie in stored.get('cookies', [])
+            if not cookie.get('expiry') or cookie['expiry'] > now
+        ]
+        with self._lock:
+            self._cookies = cookies
+            self._user_agent = stored.get('user_agent')
+            self._harvested_at = stored.get('harvested_at')
+        for listener in self._listeners:
+            listener(list(cookies), self._user_agent)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._refresh_loop, name='clearance-refresh', daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def refresh(self):
+        """Проходит проверку заново фоновым визитом браузера"""
+        try:
+            if self._limiter is not None:
+                self._limiter.acquire(REFRESH_URL)
+            with self._pool.lease() as session:
+                self._drop_clearance(session.sb)
+                started = time.time()
+                session.sb.uc_open_with_tab(REFRESH_URL)
+                if self._limiter is not None:
+                    self._limiter.report(
+                        REFRESH_URL,
+                        latency=time.time() - started,
+                        challenged=looks_like_challenge(session.sb.get_page_source()),
+                    )
+                self.harvest(session.sb)
+            self._refreshes_total += 1
+        except Exception as err:
+            self._refresh_errors_total += 1
+            print(f"Ошибка при обновлении cookies Cloudflare: {err}")
+
+    def _drop_clearance(self, sb: SB):
+        """Удаляет cf_clearance из браузера, чтобы Cloudflare выдал новый"""
+        with self._lock:
+            stored = [cookie for cookie in self._cookies if cookie['name'] == CLEARANCE_COOKIE]
+        targets = [{'name': CLEARANCE_COOKIE, 'url': REFRESH_URL}] + [
+            {'name': CLEARANCE_COOKIE, 'domain': cookie.get('domain', '.metal-archives.com'), 'path': cookie.get('path', '/')}
+            for cookie in stored
+        ]
+        for target in targets:
+            sb.driver.execute_cdp_cmd('Network.deleteCookies', target)
+
+    def _refresh_loop(self):
+        stalls = 0
+        while not self._stop.is_set():
+            if self.is_expiring():
+                expires_before = self.expires_at
+                self.refresh()
+                if self.is_expiring() and self.expires_at == expires_before:
+                    # Нового cf_clearance нет: не открываем сайт каждую секунду до истечения старого
+                    stalls += 1
+                    self._refresh_stalls_total += 1
+                    self._stop.wait(self._check_interval * min(2 ** (stalls - 1), MAX_REFRESH_BACKOFF))
+                    continue
+                stalls = 0
+            expires_at = self.expires_at
+            timeout = self._check_interval
+            if expires_at is not None:
+                timeout = min(timeout, max(expires_at - self._refresh_margin - time.time(), 1))
+            self._stop.wait(timeout)
+
+    def _save(self):
+        with self._lock:
+            data = {
+                'cookies': list(self._cookies),
+                'user_agent': self._user_agent,
+                'harvested_at': self._harvested_at,
+            }
+        tmp_path = f'{self._store_path}.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as file:
+                json.dump(data, file, ensure_ascii=False)
+            os.replace(tmp_path, self._store_path)
+        except OSError as err:
+            print(f"Не удалось сохранить cookies Cloudflare: {err}")
+
+    def get_stats(self) -> Dict:
+        expires_at = self.expires_at
+        return {
+            'has_clearance': expires_at is not None,
+            'expires_at': expires_at,
+            'seconds_left': round(expires_at - time.time()) if expires_at is not None else None,
+            'harvested_at': self._harvested_at,
+            'cookies': len(self._cookies),
+            'refreshes_total': self._refreshes_total,
+            'refresh_errors_total': self._refresh_errors_total,
+            'refresh_stalls_total': self._refresh_stalls_total,
+            'injected_total': self._injected_total,
+        }
+
+
+def _cdp_cookie(cookie: dict) -> dict:
+    """Cookie из get_cookies() Selenium в формате Network.setCookies"""
+    converted = {
+        'name': cookie['name'],
+        'value': cookie['value'],
+        'domain': cookie.get('domain', '.metal-archives.com'),
+        'path': cookie.get('path', '/'),
+        'secure': cookie.get('secure', False),
+        'httpOnly': cookie.get('httpOnly', False),
+    }
+    if cookie.get('sameSite'):
+        converted['sameSite'] = cookie['sameSite']
+    if cookie.get('expiry'):
+        converted['expires'] = cookie['expiry']
+    return converted
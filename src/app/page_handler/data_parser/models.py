@@ -71,6 +71,7 @@ class StatInfo:
     bands: BandStatInfo
     albums: int = 0
     songs: int = 0
+    lyrics: int = 0
 
 @dataclass
 class AllStatInfo:
@@ -1,11 +1,16 @@
 import datetime
 import ast
+import json
 import re
 import html
-from typing import Dict, Optional, List
+from typing import Callable, Dict, Iterator, Optional, List
 
-from bs4 import BeautifulSoup, Tag
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+from bs4.builder import builder_registry
 
+from app.core.config import settings
+
+from app.page_handler.data_parser import row_decoder as rows
 from app.page_handler.data_parser.models import (
     AlbumInformation,
     AlbumSearch,
@@ -35,168 +40,199 @@ from app.page_handler.data_parser.models import (
 from app.utils.utils import slug_string
 
 
+ARTIST_ID_PATTERN = re.compile(r'artistId\s*=\s*(\d+);')
+MEMBER_TAB_IDS = ['artist_tab_active', 'artist_tab_past', 'artist_tab_guest', 'artist_tab_live', 'artist_tab_misc']
+
+
+class PageRegions:
+    """Области страницы, которые читает экстрактор.
+
+    markers - пары (подстрока в HTML, поиск в дереве): если подстрока есть в странице,
+    а в разобранных областях элемент не найден, страница разбирается целиком
+    """
+
+    def __init__(self, ids: list[str], markers: list[tuple[str, Callable[[BeautifulSoup], Tag | None]]]):
+        self.strainer = SoupStrainer(id=ids)
+        self.markers = markers
+
+
+BAND_REGIONS = PageRegions(
+    ids=['band_sidebar', 'band_info', 'band_members'],
+    markers=[
+        ('band_name', lambda soup: soup.find(class_='band_name')),
+        ('id="logo"', lambda soup: soup.find('a', id='logo')),
+        ('id="photo"', lambda soup: soup.find('a', id='photo')),
+        ('band_stats', lambda soup: soup.find('dt')),
+        ('band_tab_members_current', lambda soup: soup.find('div', id='band_tab_members_current')),
+        ('band_tab_members_past', lambda soup: soup.find('div', id='band_tab_members_past')),
+    ],
+)
+
+ALBUM_REGIONS = PageRegions(
+    ids=['album_sidebar', 'album_info', 'album_tabs_tracklist'],
+    markers=[
+        ('album_name', lambda soup: soup.find('h1', class_='album_name')),
+        ('id="cover"', lambda soup: soup.find(id='cover')),
+        ('table_lyrics', lambda soup: soup.find('table', {'class': 'display table_lyrics'})),
+    ],
+)
+
+MEMBER_REGIONS = PageRegions(
+    ids=['member_info', *MEMBER_TAB_IDS],
+    markers=[
+        ('band_member_name', lambda soup: soup.find('h1', class_='band_member_name')),
+        ('id="artist"', lambda soup: soup.find('a', id='artist')),
+        ('band_comment', lambda soup: soup.find('div', class_='clear band_comment')),
+        ('float_left', lambda soup: soup.find('dl', class_='float_left')),
+        ('float_right', lambda soup: soup.find('dl', class_='float_right')),
+        *((tab_id, lambda soup, tab_id=tab_id: soup.find('div', id=tab_id)) for tab_id in MEMBER_TAB_IDS),
+    ],
+)
+
+
+def resolve_backend(name: str) -> str:
+    """Возвращает доступный builder BeautifulSoup; без установленного lxml откатывается на html.parser"""
+    if builder_registry.lookup(name) is None:
+        print(f"Бэкенд парсера {name} недоступен, используется html.parser")
+        return 'html.parser'
+    return name
+
+
 class PageParser:
     uid_patter = r'/bands/(?P<slug>[^/]+)/(?P<uid>\d+)'
+    # Builder BeautifulSoup: html.parser (эталонный) или lxml (быстрее в несколько раз)
+    backend = resolve_backend(settings.PARSER_BACKEND)
+    # Разбирать у страниц групп, альбомов и участников только нужные области
+    selective = settings.PARSER_SELECTIVE
 
     @classmethod
-    def extract_advanced_search_song_info(cls, data: str) -> SearchByResults:
-        soup = BeautifulSoup(data, 'html.parser')
-        results = ast.literal_eval(soup.find('pre').decode_contents())
-        albums = []
-        for item in results['aaData']:
-            band_link = html.unescape(item[0])
-            album_link = html.unescape(item[1])
-            album_type = html.unescape(item[2])
-            song_title = html.unescape(item[3])
-            song_link_html = BeautifulSoup(html.unescape(item[4]), 'html.parser')
-            song_link = song_link_html.find('a', href='javascript:;')
-            track_id = song_link.get('id').split('lyricsLink_')[1]
-            
+    def _soup(cls, markup: str, parse_only: SoupStrainer | None = None) -> BeautifulSoup:
+        return BeautifulSoup(markup, cls.backend, parse_only=parse_only)
 
-            band_match = re.search(r'">([^<]+)</a>', band_link)
-            band_name = band_match.group(1) if band_match else band_link
-            band_id_match = re.search(r'/(\d+)"', band_link)
-            band_id = band_id_match.group(1) if band_id_match else None
+    @classmethod
+    def _page_soup(cls, data: str, regions: PageRegions) -> BeautifulSoup:
+        if cls.selective:
+            soup = cls._soup(data, parse_only=regions.strainer)
+            if all(find(soup) is not None for marker, find in regions.markers if marker in data):
+                return soup
+            # Разметка страницы изменилась и нужный элемент оказался вне областей
+        return cls._soup(data)
 
-            album_match = re.search(r'">([^<]+)</a>', album_link)
-            album_title = album_match.group(1) if album_match else album_link
-            album_id_match = re.search(r'/(\d+)"', album_link)
-            album_id = album_id_match.group(1) if band_id_match else None
+    @classmethod
+    def extract_advanced_search_song_info(cls, data: str) -> SearchByResults:
+        total, songs = cls.iter_advanced_search_song_info(data)
+        return SearchByResults(results=list(songs), total=total)
 
+    @classmethod
+    def iter_advanced_search_song_info(cls, data: str) -> tuple[int, Iterator[SongAdvancedSearch]]:
+        results = cls._load_datatable(data)
+        return results['iTotalRecords'], cls._advanced_search_song_rows(results['aaData'])
 
-            album_type = item[2].strip()
-            albums.append(
-                SongAdvancedSearch(
-                    id=int(track_id),
-                    title=song_title,
-                    title_slug=slug_string(song_title),
-                    band_name=band_name,
-                    band_id=int(band_id),
-                    band_name_slug=slug_string(band_name),
-                    album_id=int(album_id),
-                    album_title=album_title,
-                    album_title_slug=slug_string(album_title),
-                    type=album_type
-                )
+    @staticmethod
+    def _advanced_search_song_rows(items: list[list[str]]) -> Iterator[SongAdvancedSearch]:
+        for item in items:
+            band_link, album_link, _, song_title, song_link = item[:5]
+            band_name = rows.link_text(band_link)
+            band_id = rows.link_id(band_link)
+            album_title = rows.link_text(album_link)
+            album_id = rows.link_id(album_link) if band_id is not None else None
+            yield SongAdvancedSearch(
+                id=int(rows.lyrics_id(song_link)),
+                title=song_title,
+                title_slug=rows.slug(song_title),
+                band_name=band_name,
+                band_id=int(band_id),
+                band_name_slug=rows.slug(band_name),
+                album_id=int(album_id),
+                album_title=album_title,
+                album_title_slug=rows.slug(album_title),
+                type=rows.escaped(item[2]).strip()
             )
-
-        return SearchByResults(results=albums, total=results['iTotalRecords'])
     
     @classmethod
     def extract_advanced_search_album_info(cls, data: str) -> SearchByResults:
-        soup = BeautifulSoup(data, 'html.parser')
-        results = ast.literal_eval(soup.find('pre').decode_contents())
-        albums = []
-        for item in results['aaData']:
-            band_link = html.unescape(item[0])
-            album_link = html.unescape(item[1])
-
-            band_match = re.search(r'">([^<]+)</a>', band_link)
-            band_name = band_match.group(1) if band_match else band_link
-            band_id_match = re.search(r'/(\d+)"', band_link)
-            band_id = band_id_match.group(1) if band_id_match else None
-
-            album_match = re.search(r'">([^<]+)</a>', album_link)
-            album_title = album_match.group(1) if album_match else album_link
-            album_id_match = re.search(r'/(\d+)"', album_link)
-            album_id = album_id_match.group(1) if band_id_match else None
+        total, albums = cls.iter_advanced_search_album_info(data)
+        return SearchByResults(results=list(albums), total=total)
 
+    @classmethod
+    def iter_advanced_search_album_info(cls, data: str) -> tuple[int, Iterator[AlbumAdvancedSearch]]:
+        results = cls._load_datatable(data)
+        return results['iTotalRecords'], cls._advanced_search_album_rows(results['aaData'])
 
-            album_type = item[2].strip()
-            albums.append(
-                AlbumAdvancedSearch(
-                    id=int(album_id),
-                    title=album_title,
-                    title_slug=slug_string(album_title),
-                    band_id=int(band_id),
-                    band_name=band_name,
-                    band_name_slug=slug_string(band_name),
-                    type=album_type
-                )
+    @staticmethod
+    def _advanced_search_album_rows(items: list[list[str]]) -> Iterator[AlbumAdvancedSearch]:
+        for item in items:
+            band_link, album_link = item[0], item[1]
+            band_name = rows.link_text(band_link)
+            band_id = rows.link_id(band_link)
+            album_title = rows.link_text(album_link)
+            album_id = rows.link_id(album_link) if band_id is not None else None
+            yield AlbumAdvancedSearch(
+                id=int(album_id),
+                title=album_title,
+                title_slug=rows.slug(album_title),
+                band_id=int(band_id),
+                band_name=band_name,
+                band_name_slug=rows.slug(band_name),
+                type=rows.escaped(item[2]).strip()
             )
-
-        return SearchByResults(results=albums, total=results['iTotalRecords'])
     
     @classmethod
     def extract_advanced_search_band_info(cls, data: str) -> SearchByResults:
-        soup = BeautifulSoup(data, 'html.parser')
-        results = ast.literal_eval(soup.find('pre').decode_contents())
-        bands = []
-        for item in results['aaData']:
-            html_content = html.unescape(item[0])
+        total, bands = cls.iter_advanced_search_band_info(data)
+        return SearchByResults(results=list(bands), total=total)
 
-            match = re.search(r'">([^<]+)</a>', html_content)
-            name = match.group(1) if match else html_content
+    @classmethod
+    def iter_advanced_search_band_info(cls, data: str) -> tuple[int, Iterator[BandSearch]]:
+        results = cls._load_datatable(data)
+        return results['iTotalRecords'], cls._advanced_search_band_rows(results['aaData'])
 
-            id_match = re.search(r'/(\d+)"', html_content)
-            band_id = id_match.group(1) if id_match else None
-            genre = item[1].strip()
-            country = item[2].strip()
-            bands.append(
-                BandSearch(
-                    id=int(band_id),
-                    name=name,
-                    name_slug=slug_string(name),
-                    genres=genre,
-                    country=country,
-                )
+    @staticmethod
+    def _advanced_search_band_rows(items: list[list[str]]) -> Iterator[BandSearch]:
+        for item in items:
+            name = rows.link_text(item[0])
+            yield BandSearch(
+                id=int(rows.link_id(item[0])),
+                name=name,
+                name_slug=rows.slug(name),
+                genres=rows.escaped(item[1]).strip(),
+                country=rows.escaped(item[2]).strip(),
             )
-
-        return SearchByResults(results=bands, total=results['iTotalRecords'])
     
     @classmethod
     def extract_search_album_info(cls, data: str) -> list[AlbumSearch]:
-        soup = BeautifulSoup(data, 'html.parser')
-        soup
-        results = ast.literal_eval(soup.find('pre').text)['aaData']
+        results = cls._load_datatable(data)['aaData']
         albums = []
         for album in results:
-            band_soup = BeautifulSoup(album[0], 'html.parser').find('a')
-            band_id = band_soup.get('href').split('/').pop()
-            band_name = band_soup.text.strip()
-            band_name_slug = slug_string(band_soup.text.strip())
-            album_soup = BeautifulSoup(album[1], 'html.parser').find('a')
-            album_id = album_soup.get('href').split('/').pop()
-            album_name = album_soup.text.strip()
-            album_type = album[2]
-            album_release_date = album[3].split(' <!')[0]
-
+            band_href, band_name = rows.first_anchor(album[0])
+            album_href, album_name = rows.first_anchor(album[1])
             albums.append(
                 AlbumSearch(
-                    id=int(album_id),
+                    id=int(album_href.split('/').pop()),
                     title=album_name,
-                    title_slug=slug_string(album_name),
+                    title_slug=rows.slug(album_name),
                     band_name=band_name,
-                    band_name_slug=band_name_slug,
-                    band_id=int(band_id),
-                    type=album_type,
-                    release_date=album_release_date,
+                    band_name_slug=rows.slug(band_name),
+                    band_id=int(band_href.split('/').pop()),
+                    type=album[2],
+                    release_date=album[3].split(' <!')[0],
                 )
             )
         return albums
 
     @classmethod
     def extract_search_band_info(cls, data: str) -> list[BandSearch]:
-        soup = BeautifulSoup(data, 'html.parser')
-        results = ast.literal_eval(soup.find('pre').text)['aaData']
+        results = cls._load_datatable(data)['aaData']
         bands = []
         for item in results:
-            html_content = item[0]
-
-            match = re.search(r'">([^<]+)</a>', html_content)
-            name = match.group(1) if match else html_content
-
-            id_match = re.search(r'/(\d+)"', html_content)
-            band_id = id_match.group(1) if id_match else None
-            genre = item[1].strip()
-            country = item[2].strip()
+            name = rows.link_text(item[0])
             bands.append(
                 BandSearch(
-                    id=int(band_id),
+                    id=int(rows.link_id(item[0])),
                     name=name,
-                    name_slug=slug_string(name),
-                    genres=genre,
-                    country=country,
+                    name_slug=rows.slug(name),
+                    genres=item[1].strip(),
+                    country=item[2].strip(),
                 )
             )
 
@@ -204,7 +240,7 @@ class PageParser:
 
     @classmethod
     def extract_band_info(cls, data: str) -> BandInformation:
-        soup = BeautifulSoup(data, 'html.parser')
+        soup = cls._page_soup(data, BAND_REGIONS)
         band_info = BandInformation()
         try:
             band_name, band_name_slug, band_id = cls._get_band_name_and_id(soup)
@@ -234,22 +270,22 @@ class PageParser:
 
     @classmethod
     def extract_band_similar_info(cls, data: str) -> list[SimilarBand]:
-        soup = BeautifulSoup(data, 'html.parser')
+        soup = cls._soup(data)
         return cls._get_similar(soup)
     
     @classmethod
     def extract_discography_info(cls, data: str) -> list[AlbumShortInformation]:
-        soup = BeautifulSoup(data, 'html.parser')
+        soup = cls._soup(data)
         return cls._get_discography(soup)
 
     @classmethod
     def extract_lyrics_info(cls, data: str) -> str:
-        soup = BeautifulSoup(data, 'html.parser')
+        soup = cls._soup(data)
         return soup.find('body').decode_contents()
     
     @classmethod
     def extract_band_description(cls, data: str) -> str:
-        soup = BeautifulSoup(data, 'html.parser')
+        soup = cls._soup(data)
         return soup.find('body').decode_contents()\
             .replace('https://www.metal-archives.com/bands', '/bands') \
             .replace('https://www.metal-archives.com/albums', '/albums') \
@@ -257,16 +293,11 @@ class PageParser:
     
     @classmethod
     def extract_member_info(cls, data: str) -> Member:
-        soup = BeautifulSoup(data, 'html.parser')
+        soup = cls._page_soup(data, MEMBER_REGIONS)
         fullname = soup.find('h1', class_='band_member_name').get_text(strip=True)
-        scripts = soup.find_all('script')
-        id = 0
-        for script in scripts:
-            if script.string and 'artistId' in script.string:
-                match = re.search(r'artistId\s*=\s*(\d+);', script.string)
-                if match:
-                    id = int(match.group(1))
-                    break
+        # artistId объявлен во встроенном скрипте, который не входит в разбираемые области
+        match = ARTIST_ID_PATTERN.search(data)
+        id = int(match.group(1)) if match else 0
         age = soup.find('dl', class_='float_left').find_all('dd')[1].get_text(strip=True)
         right_side = soup.find('dl', class_='float_right').find_all('dd')
         place_of_birth = right_side[0].get_text(strip=True)
@@ -282,37 +313,13 @@ class PageParser:
             for tag in h2:
                 tag.decompose()
             biography = biography_div.decode_contents().strip().replace('https://www.metal-archives.com/bands', '/bands').replace('\t', '').replace('\n', '')
-        active_bands = []
-        past_bands = []
-        guest_session = []
-        live = []
-        misc_staff = []
-        
-        active_bands_div = soup.find('div', id='artist_tab_active')
-        if active_bands_div:
-            member_in_active_band_divs = active_bands_div.find_all('div', class_='member_in_band')
-            active_bands = cls._parse_member_bands(member_in_active_band_divs)
-        
-        past_bands_div = soup.find('div', id='artist_tab_past')
-        if past_bands_div:
-            member_in_past_band_divs = past_bands_div.find_all('div', class_='member_in_band')
-            past_bands = cls._parse_member_bands(member_in_past_band_divs)
-        
-        guest_session_div = soup.find('div', id='artist_tab_guest')
-        if guest_session_div:
-            member_in_guest_session_divs = guest_session_div.find_all('div', class_='member_in_band')
-            guest_session = cls._parse_member_bands(member_in_guest_session_divs)
-        
-        live_div = soup.find('div', id='artist_tab_live')
-        if live_div:
-            member_in_live_divs = live_div.find_all('div', class_='member_in_band')
-            live = cls._parse_member_bands(member_in_live_divs)
-        
-        misc_staff_div = soup.find('div', id='artist_tab_misc')
-        if misc_staff_div:
-            member_in_misc_staff_divs = misc_staff_div.find_all('div', class_='member_in_band')
-            misc_staff = cls._parse_member_bands(member_in_misc_staff_divs)
-        
+        # Вкладки с группами находятся одним проходом по дереву
+        tabs = {tab.get('id'): tab for tab in soup.find_all('div', id=MEMBER_TAB_IDS)}
+        active_bands, past_bands, guest_session, live, misc_staff = (
+            cls._parse_member_bands(tabs[tab_id].find_all('div', class_='member_in_band')) if tab_id in tabs else []
+            for tab_id in MEMBER_TAB_IDS
+        )
+
         return Member(
             id=id,
             fullname=fullname,
@@ -332,7 +339,7 @@ class PageParser:
     
     @classmethod
     def extract_social_links(cls, data: str) -> List[SocialLink]:
-        soup = BeautifulSoup(data, 'html.parser')
+        soup = cls._soup(data)
         all_links = soup.find_all('a', target='_blank')
         band_links = []
         for link in all_links:
@@ -343,107 +350,74 @@ class PageParser:
     
     @classmethod
     def extract_rip_artists(cls, data: str) -> RipArtistsResults:
-        soup = BeautifulSoup(data, 'html.parser')
-        results = ast.literal_eval(soup.find('pre').decode_contents())
-        members = []
-        for item in results['aaData']:
-            html_content = html.unescape(item[0])
-
-            match = re.search(r'">([^<]+)</a>', html_content)
-            fullname = match.group(1) if match else html_content
-            artist_id_match = re.search(r'/(\d+)', html_content)
-            artist_id = artist_id_match.group(1) if artist_id_match else None
-            country = item[1].strip()
-            bands_links = item[2].split(', ')
+        total, members = cls.iter_rip_artists(data)
+        return RipArtistsResults(results=list(members), total=total)
+
+    @classmethod
+    def iter_rip_artists(cls, data: str) -> tuple[int, Iterator[ShortMember]]:
+        results = cls._load_datatable(data)
+        return results['iTotalRecords'], cls._rip_artist_rows(results['aaData'])
+
+    @staticmethod
+    def _rip_artist_rows(items: list[list[str]]) -> Iterator[ShortMember]:
+        for item in items:
+            fullname = rows.link_text(item[0])
             bands = []
-            for link in bands_links:
-                band_link = html.unescape(link)
+            for band_link in item[2].split(', '):
                 if band_link:
-                    match_link = re.search(r'>([^<]+)</a>', band_link)
-                    band_name = match_link.group(1) if match_link else band_link
-                    band_id_match = re.search(r'/(\d+)', band_link)
-                    if band_id_match:
-                        band_id = band_id_match.group(1) if band_id_match else None
-                        bands.append(ShortBandInfo(id=int(band_id), band_name=band_name, band_name_slug=slug_string(band_name)))
-
-            date_of_death = item[3]
-            cause_of_death = item[4]
-            
-            members.append(
-                ShortMember(
-                    id=int(artist_id),
-                    fullname=fullname,
-                    fullname_slug=slug_string(fullname),
-                    country=country,
-                    bands=bands,
-                    date_of_death=date_of_death,
-                    cause_of_death=cause_of_death
-                )
+                    band_id = rows.link_id(band_link, rows.ANY_ID)
+                    if band_id:
+                        band_name = rows.link_text(band_link, rows.LINK_TEXT_END)
+                        bands.append(ShortBandInfo(id=int(band_id), band_name=band_name, band_name_slug=rows.slug(band_name)))
+
+            yield ShortMember(
+                id=int(rows.link_id(item[0], rows.ANY_ID)),
+                fullname=fullname,
+                fullname_slug=rows.slug(fullname),
+                country=rows.escaped(item[1]).strip(),
+                bands=bands,
+                date_of_death=rows.escaped(item[3]),
+                cause_of_death=rows.escaped(item[4])
             )
-        return RipArtistsResults(results=members, total=results['iTotalRecords'])
     
     @classmethod
     def extract_bands_by_country(cls, data: str) -> SearchByResults:
-        soup = BeautifulSoup(data, 'html.parser')
-        results = ast.literal_eval(soup.find('pre').decode_contents())
-        bands = []
-        for item in results['aaData']:
-            html_content = html.unescape(item[0])
-
-            match = re.search(r"'>([^<]+)</a>", html_content)
-            name = match.group(1) if match else html_content
-
-            id_match = re.search(r"/(\d+)'", html_content)
-            band_id = id_match.group(1) if id_match else None
-            genres = item[1].strip()
-            country = item[2].strip()
-            status_match = re.search(r'>([^<]+)<', html.unescape(item[3]))
-            status = status_match.group(1)
-            bands.append(
-                BandSearchBy(
-                    id=int(band_id),
-                    name=name,
-                    name_slug=slug_string(name),
-                    genres=genres,
-                    country=country,
-                    status=status
-                )
-            )
-        return SearchByResults(results=bands, total=results['iTotalRecords'])
+        total, bands = cls.iter_bands_by_country(data)
+        return SearchByResults(results=list(bands), total=total)
+
+    @classmethod
+    def iter_bands_by_country(cls, data: str) -> tuple[int, Iterator[BandSearchBy]]:
+        results = cls._load_datatable(data)
+        return results['iTotalRecords'], cls._browse_band_rows(results['aaData'], genres_column=1, country_column=2)
     
     @classmethod
     def extract_bands_by_letter(cls, data: str) -> SearchByResults:
-        soup = BeautifulSoup(data, 'html.parser')
-        results = ast.literal_eval(soup.find('pre').decode_contents())
-        bands = []
-        for item in results['aaData']:
-            html_content = html.unescape(item[0])
-
-            match = re.search(r"'>([^<]+)</a>", html_content)
-            name = match.group(1) if match else html_content
-
-            id_match = re.search(r"/(\d+)'", html_content)
-            band_id = id_match.group(1) if id_match else None
-            country = item[1].strip()
-            genres = item[2].strip()
-            status_match = re.search(r'>([^<]+)<', html.unescape(item[3]))
-            status = status_match.group(1)
-            bands.append(
-                BandSearchBy(
-                    id=int(band_id),
-                    name=name,
-                    name_slug=slug_string(name),
-                    genres=genres,
-                    country=country,
-                    status=status
-                )
+        total, bands = cls.iter_bands_by_letter(data)
+        return SearchByResults(results=list(bands), total=total)
+
+    @classmethod
+    def iter_bands_by_letter(cls, data: str) -> tuple[int, Iterator[BandSearchBy]]:
+        results = cls._load_datatable(data)
+        return results['iTotalRecords'], cls._browse_band_rows(results['aaData'], genres_column=2, country_column=1)
+
+    @staticmethod
+    def _browse_band_rows(items: list[list[str]], genres_column: int, country_column: int) -> Iterator[BandSearchBy]:
+        """Строки выдачи browse: в выдаче по стране и по букве колонки жанра и страны переставлены"""
+        for item in items:
+            band_id, name = rows.browse_link(item[0])
+            yield BandSearchBy(
+                id=int(band_id),
+                name=name,
+                name_slug=rows.slug(name),
+                genres=rows.escaped(item[genres_column]).strip(),
+                country=rows.escaped(item[country_column]).strip(),
+                status=rows.tag_text(item[3])
             )
-        return SearchByResults(results=bands, total=results['iTotalRecords'])
 
     
     @classmethod
     def extract_stats_info(cls, data: str) -> StatInfo:
-        soup = BeautifulSoup(data, 'html.parser')
+        soup = cls._soup(data)
         active = int(soup.find('span', class_='active').text.strip())
         on_hold = int(soup.find('span', class_='on_hold').text.strip())
         split_up = int(soup.find('span', class_='split_up').text.strip())
@@ -463,7 +437,7 @@ class PageParser:
     
     @classmethod
     def extract_album_info(cls, data: str) -> AlbumInformation:
-        soup = BeautifulSoup(data, 'html.parser')
+        soup = cls._page_soup(data, ALBUM_REGIONS)
         album_info = AlbumInformation()
         try:
             album_info = cls._parse_common_album_info(soup, album_info)
@@ -473,6 +447,16 @@ class PageParser:
 
         return album_info
 
+    @classmethod
+    def _load_datatable(cls, data: str) -> Dict:
+        """Разбирает ответ DataTables: сырое JSON-тело или HTML, где Chrome оборачивает JSON в <pre>"""
+        text = data if data.lstrip().startswith('{') else cls._soup(data).find('pre').text
+        try:
+            return json.loads(text)
+        except ValueError:
+            # Metal Archives иногда отдаёт невалидный JSON (например, висячие запятые)
+            return ast.literal_eval(text)
+
     def _parse_member_bands(member_in_band_divs: list[Tag]) -> list[MemberBand]:
         active_bands = []
         for band_div in member_in_band_divs:
@@ -0,0 +1,74 @@
+"""Разбор ячеек aaData в ответах DataTables Metal Archives без построения DOM.
+
+Ячейки приходят HTML-фрагментами вида <a href="https://.../bands/Name/123">Name</a>,
+поэтому нужные поля достаются заранее скомпилированными регулярными выражениями.
+Функции принимают сырые ячейки из JSON (без экранирования, которое добавлял <pre>).
+"""
+import html
+import re
+from functools import lru_cache
+
+from app.utils.utils import slug_string
+
+# Текст ссылки и id из href; в разных эндпоинтах атрибуты в двойных или одинарных кавычках
+LINK_TEXT = re.compile(r'">([^<]+)</a>')
+LINK_TEXT_SINGLE_QUOTED = re.compile(r"'>([^<]+)</a>")
+LINK_TEXT_END = re.compile(r'>([^<]+)</a>')
+LINK_ID = re.compile(r'/(\d+)"')
+LINK_ID_SINGLE_QUOTED = re.compile(r"/(\d+)'")
+# Ссылка на группу в выдаче browse: id в конце href и текст одним поиском
+BROWSE_LINK = re.compile(r"/(\d+)'>([^<]+)</a>")
+ANY_ID = re.compile(r'/(\d+)')
+TAG_TEXT = re.compile(r'>([^<]+)<')
+LYRICS_LINK_ID = re.compile(r'lyricsLink_(\d+)')
+FIRST_ANCHOR = re.compile(r'<a\b[^>]*?\bhref=(["\'])(.*?)\1[^>]*>(.*?)</a>', re.IGNORECASE | re.DOTALL)
+TAG = re.compile(r'<[^>]*>')
+
+
+def link_text(cell: str, pattern: re.Pattern = LINK_TEXT) -> str:
+    """Текст ссылки или вся ячейка, если ссылки нет"""
+    match = pattern.search(cell)
+    return match.group(1) if match else cell
+
+
+def link_id(cell: str, pattern: re.Pattern = LINK_ID) -> str | None:
+    """Числовой id в конце href"""
+    match = pattern.search(cell)
+    return match.group(1) if match else None
+
+
+def browse_link(cell: str) -> tuple[str | None, str]:
+    """id и текст ссылки из ячейки browse с href в одинарных кавычках"""
+    match = BROWSE_LINK.search(cell)
+    if match:
+        return match.group(1), match.group(2)
+    return link_id(cell, LINK_ID_SINGLE_QUOTED), link_text(cell, LINK_TEXT_SINGLE_QUOTED)
+
+
+def tag_text(cell: str) -> str:
+    """Текст первого тега, например статус группы из <span class="active">Active</span>"""
+    return TAG_TEXT.search(cell).group(1)
+
+
+def lyrics_id(cell: str) -> str:
+    """id трека из ссылки lyricsLink_<id>"""
+    return LYRICS_LINK_ID.search(cell).group(1)
+
+
+def first_anchor(cell: str) -> tuple[str, str]:
+    """href и текст первой ссылки с раскрытыми HTML-сущностями, как у BeautifulSoup"""
+    match = FIRST_ANCHOR.search(cell)
+    href, text = match.group(2), match.group(3)
+    return html.unescape(href), html.unescape(TAG.sub('', text)).strip()
+
+
+def escaped(cell: str) -> str:
+    """Ячейка в том виде, в каком её возвращал decode_contents() у <pre>"""
+    # Большинство ячеек (страна, жанр, даты) экранировать нечего
+    if '&' not in cell and '<' not in cell and '>' not in cell:
+        return cell
+    return html.escape(cell, quote=False)
+
+
+# Названия групп и альбомов повторяются между страницами выдачи
+slug = lru_cache(maxsize=8192)(slug_string)
@@ -0,0 +1,70 @@
+import contextvars
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable
+
+
+class SubFetch:
+    """Вложенная загрузка страницы (дискография, ссылки, описание).
+
+    Выполняет её тот, кто первым заберёт: слот общего пула загрузок или
+    родительская загрузка, которая дошла до result() раньше. Поэтому
+    родитель, занимающий слот, не ждёт слота для вложенной загрузки и
+    пул не может зависнуть, даже если все слоты заняты родителями.
+    """
+
+    def __init__(self, func: Callable[..., Any], *args):
+        # Копируем контекст, чтобы флаг отмены запроса действовал и во вложенной загрузке
+        self.context = contextvars.copy_context()
+        self._func = func
+        self._args = args
+        self._lock = threading.Lock()
+        self._claimed = False
+        self._future: Future = Future()
+        self._on_cancel: Callable[[], Any] | None = None
+        self._waiter_released = False
+
+    def claim(self) -> bool:
+        with self._lock:
+            if self._claimed:
+                return False
+            self._claimed = True
+            return True
+
+    def run(self):
+        """Выполняет забранную загрузку в текущем потоке"""
+        self._future.set_running_or_notify_cancel()
+        try:
+            result = self.context.run(self._func, *self._args)
+        except BaseException as err:
+            self._future.set_exception(err)
+        else:
+            self._future.set_result(result)
+
+    def on_cancel(self, callback: Callable[[], Any]):
+        """Снимает ожидание слота, если загрузку забрал родитель или она отменена"""
+        with self._lock:
+            if not self._waiter_released:
+                self._on_cancel = callback
+                return
+        # Родитель забрал загрузку раньше, чем было зарегистрировано ожидание
+        callback()
+
+    def _release_waiter(self):
+        with self._lock:
+            self._waiter_released = True
+            callback, self._on_cancel = self._on_cancel, None
+        if callback is not None:
+            callback()
+
+    def result(self) -> Any:
+        if self.claim():
+            # Слот для этой загрузки больше не нужен: не ждём его и не занимаем
+            self._release_waiter()
+            self.run()
+        return self._future.result()
+
+    def cancel(self):
+        if self.claim():
+            self._future.cancel()
+            self._release_waiter()
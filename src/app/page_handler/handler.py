@@ -1,144 +1,282 @@
+import re
+import threading
 import time
-from typing import Optional
+from contextvars import ContextVar
+from typing import Any, Callable, Optional
 
-from seleniumbase import SB
+import httpx
 
+from app.page_handler.browser_pool import BrowserPool, BrowserPoolError, BrowserSession
+from app.page_handler.clearance import ClearanceManager
 from app.page_handler.data_parser.models import AlbumShortInformation
 from app.page_handler.data_parser.parser import PageParser
+from app.page_handler.fanout import SubFetch
+from app.page_handler.http_fetcher import ChallengeDetected, HttpFetcher, looks_like_challenge
 from app.page_handler.models import PageInfo
+from app.page_handler.parse_memo import ParseMemo, content_hash
+from app.page_handler.parse_pool import ParsePool
+from app.page_handler.rate_limiter import AdaptiveRateLimiter, RateLimitExceeded
+from app.page_handler.resource_blocking import ResourceBlocker
+from app.page_handler.response_cache import ResponseCache
+
+# Флаг отмены текущей загрузки, выставляется асинхронным фасадом при отключении клиента
+cancel_token: ContextVar[threading.Event | None] = ContextVar('cancel_token', default=None)
+# Явный запрос обновления: страница и вложенные страницы берутся с сайта, кеш только пополняется
+bypass_cache: ContextVar[bool] = ContextVar('bypass_cache', default=False)
+
+BAND_ID_PATTERN = re.compile(r'/band/view/id/(\d+)')
+MEMBER_ID_PATTERN = re.compile(r'/artists/[^/]+/(\d+)')
+
+# Эндпоинты DataTables: их JSON забирается из сети без разбора DOM
+DATATABLE_URL_PATTERN = re.compile(
+    r'/search/ajax-(band|album)-search/|/search/ajax-advanced/searching/|/browse/ajax-(letter|country|genre)/|/artist/ajax-rip'
+)
+
+# Запрос из контекста открытой вкладки Metal Archives: cookies и проверка Cloudflare уже на месте
+IN_PAGE_FETCH_SCRIPT = """
+const [url, done] = [arguments[0], arguments[arguments.length - 1]];
+fetch(url, {credentials: 'include', headers: {'X-Requested-With': 'XMLHttpRequest'}})
+    .then(response => response.text().then(body => done({status: response.status, body: body})))
+    .catch(error => done({status: 0, body: String(error)}));
+"""
+
+PRE_TEXT_SCRIPT = "const pre = document.querySelector('pre'); return pre ? pre.textContent : null;"
 
 
 class MetalArchivesPageHandler:
     _instance: Optional["MetalArchivesPageHandler"] = None
 
-    def __new__(cls, sb: SB, *args, **kwargs) -> "MetalArchivesPageHandler":
+    def __new__(cls, pool: BrowserPool, *args, **kwargs) -> "MetalArchivesPageHandler":
         if cls._instance is None:
             cls._instance = super().__new__(cls)
         return cls._instance
 
-    def __init__(self, sb: SB):
+    def __init__(
+        self,
+        pool: BrowserPool,
+        http_fetcher: HttpFetcher | None = None,
+        clearance: ClearanceManager | None = None,
+        cache: ResponseCache | None = None,
+        rate_limiter: AdaptiveRateLimiter | None = None,
+        resource_blocker: ResourceBlocker | None = None,
+        parse_pool: ParsePool | None = None,
+        parse_memo: ParseMemo | None = None,
+    ):
         self._parser_cls = PageParser
-        self._sb = sb
+        self._pool = pool
+        self._http = http_fetcher
+        self._clearance = clearance
+        self._cache = cache
+        self._limiter = rate_limiter
+        self._resources = resource_blocker
+        self._parse_pool = parse_pool
+        self._memo = parse_memo
+        self._json_captured_total = 0
+        self._json_fallbacks_total = 0
+        self._dispatch: Callable[[SubFetch], None] | None = None
+
+    def set_dispatcher(self, dispatch: Callable[[SubFetch], None] | None):
+        """Запуск вложенных загрузок в общем пуле; без него они выполняются родителем по очереди"""
+        self._dispatch = dispatch
+
+    def get_metrics(self) -> dict:
+        metrics = {
+            'browser_pool': self._pool.get_stats(),
+            'json_capture': {
+                'captured_total': self._json_captured_total,
+                'fallbacks_total': self._json_fallbacks_total,
+            },
+        }
+        if self._http is not None:
+            metrics['http_fast_path'] = self._http.get_stats()
+        if self._clearance is not None:
+            metrics['clearance'] = self._clearance.get_stats()
+        if self._cache is not None:
+            metrics['response_cache'] = self._cache.get_stats()
+        if self._limiter is not None:
+            metrics['rate_limiter'] = self._limiter.get_stats()
+        if self._resources is not None:
+            metrics['resources'] = self._resources.get_stats()
+        if self._parse_pool is not None:
+            metrics['parse_pool'] = self._parse_pool.get_stats()
+        if self._memo is not None:
+            metrics['parse_memo'] = self._memo.get_stats()
+        return metrics
 
     def get_band_info(self, url: str) -> PageInfo:
-        data = self._get_data(url)
-        if data.html is not None:
-            band_info = self._parser_cls.extract_band_info(data=data.html)
-            band_info.discography = self._get_band_discography(band_id=band_info.id)
-            band_info.links = self._get_band_links(f'https://www.metal-archives.com/link/ajax-list/type/band/id/{band_info.id}').data
-            band_info.description = self._get_band_description(f'https://www.metal-archives.com/band/read-more/id/{band_info.id}').data
-            data.data = band_info
-        return data
+        # Если id известен из URL, вложенные страницы грузятся параллельно с основной
+        band_id = self._id_from_url(url, BAND_ID_PATTERN)
+        subresources = self._submit_band_subresources(band_id) if band_id is not None else None
+        try:
+            data = self._get_data(url)
+            if data.html is not None:
+                band_info = self._parse(self._parser_cls.extract_band_info, data)
+                if subresources is None:
+                    subresources = self._submit_band_subresources(band_info.id)
+                discography, links, description = (fetch.result() for fetch in subresources)
+                band_info.discography = discography
+                band_info.links = links.data
+                band_info.description = description.data
+                data.data = band_info
+            return data
+        finally:
+            # Ошибка разбора или загрузки: не начатые вложенные загрузки не нужны
+            for fetch in subresources or ():
+                fetch.cancel()
 
     def search_band_info(self, url: str) -> PageInfo:
         data = self._get_data(url)
         if data.html is not None:
-            data.data = self._parser_cls.extract_search_band_info(data=data.html)
+            data.data = self._parse(self._parser_cls.extract_search_band_info, data)
         return data
 
     def search_album_info(self, url: str) -> PageInfo:
         data = self._get_data(url)
         if data.html is not None:
-            data.data = self._parser_cls.extract_search_album_info(data=data.html)
+            data.data = self._parse(self._parser_cls.extract_search_album_info, data)
         return data
     
     def get_band_similar(self, url: str) -> PageInfo:
         data = self._get_data(url)
         if data.html is not None:
-            data.data = self._parser_cls.extract_band_similar_info(data=data.html)
+            data.data = self._parse(self._parser_cls.extract_band_similar_info, data)
         return data
     
     def advanced_band_search(self, url: str) -> PageInfo:
         data = self._get_data(url)
         if data.html is not None:
-            data.data = self._parser_cls.extract_advanced_search_band_info(data=data.html)
+            data.data = self._parse(self._parser_cls.extract_advanced_search_band_info, data)
         return data
     
     def advanced_album_search(self, url: str) -> PageInfo:
         data = self._get_data(url)
         if data.html is not None:
-            data.data = self._parser_cls.extract_advanced_search_album_info(data=data.html)
+            data.data = self._parse(self._parser_cls.extract_advanced_search_album_info, data)
         return data
     
     def advanced_song_search(self, url: str) -> PageInfo:
         data = self._get_data(url)
         if data.html is not None:
-            data.data = self._parser_cls.extract_advanced_search_song_info(data=data.html)
+            data.data = self._parse(self._parser_cls.extract_advanced_search_song_info, data)
         return data
 
     def get_album_info(self, url: str) -> PageInfo:
         data = self._get_data(url)
         if data.html is not None:
-            data.data = self._parser_cls.extract_album_info(data=data.html)
+            data.data = self._parse(self._parser_cls.extract_album_info, data)
         return data
     
     def get_lyrics(self, url: str) -> PageInfo:
         data = self._get_data(url)
         if data.html is not None:
-            data.data = self._parser_cls.extract_lyrics_info(data=data.html)
+            data.data = self._parse(self._parser_cls.extract_lyrics_info, data)
         return data
     
     def get_member(self, url: str) -> PageInfo:
-        data = self._get_data(url)
-        if data.html is not None:
-            member_info = self._parser_cls.extract_member_info(data=data.html)
-            member_info.links = self._get_member_links(f'https://www.metal-archives.com/link/ajax-list/type/person/id/{member_info.id}').data
-            data.data = member_info
-        return data
+        member_id = self._id_from_url(url, MEMBER_ID_PATTERN)
+        links = self._submit_member_links(member_id) if member_id is not None else None
+        try:
+            data = self._get_data(url)
+            if data.html is not None:
+                member_info = self._parse(self._parser_cls.extract_member_info, data)
+                if links is None:
+                    links = self._submit_member_links(member_info.id)
+                member_info.links = links.result().data
+                data.data = member_info
+            return data
+        finally:
+            if links is not None:
+                links.cancel()
     
     def get_bands_by_genre(self, url: str) -> PageInfo:
         data = self._get_data(url)
         if data.html is not None:
-            data.data = self._parser_cls.extract_bands_by_letter(data=data.html)
+            data.data = self._parse(self._parser_cls.extract_bands_by_letter, data)
         return data
     
     def get_bands_by_country(self, url: str) -> PageInfo:
         data = self._get_data(url)
         if data.html is not None:
-            data.data = self._parser_cls.extract_bands_by_country(data=data.html)
+            data.data = self._parse(self._parser_cls.extract_bands_by_country, data)
         return data
     
     def get_bands_by_letter(self, url: str) -> PageInfo:
         data = self._get_data(url)
         if data.html is not None:
-            data.data = self._parser_cls.extract_bands_by_letter(data=data.html)
+            data.data = self._parse(self._parser_cls.extract_bands_by_letter, data)
         return data
     
     def get_rip_artists(self, url: str) -> PageInfo:
         data = self._get_data(url)
         if data.html is not None:
-            data.data = self._parser_cls.extract_rip_artists(data=data.html)
+            data.data = self._parse(self._parser_cls.extract_rip_artists, data)
         return data
     
+    def get_page(self, url: str) -> PageInfo:
+        """Страница без разбора: для потоковой выдачи строки разбираются при отправке"""
+        return self._get_data(url)
+
     def get_stats(self, url: str) -> PageInfo:
         data = self._get_data(url)
         if data.html is not None:
-            data.data = self._parser_cls.extract_stats_info(data=data.html)
+            data.data = self._parse(self._parser_cls.extract_stats_info, data)
         return data
     
     def _get_band_links(self, url: str) -> PageInfo:
         data = self._get_data(url)
         if data.html is not None:
-            data.data = self._parser_cls.extract_social_links(data=data.html)
+            data.data = self._parse(self._parser_cls.extract_social_links, data)
         return data
     
     def _get_member_links(self, url: str) -> PageInfo:
         data = self._get_data(url)
         if data.html is not None:
-            data.data = self._parser_cls.extract_social_links(data=data.html)
+            data.data = self._parse(self._parser_cls.extract_social_links, data)
         return data
 
     def _get_band_discography(self, band_id: str | int) -> list[AlbumShortInformation]:
         url = f'https://www.metal-archives.com/band/discography/id/{band_id}/tab/all'
         data = self._get_data(url=url)
         if data.html is not None:
-            return self._parser_cls.extract_discography_info(data=data.html)
+            return self._parse(self._parser_cls.extract_discography_info, data)
         return []
     
+    def _parse(self, extractor: Callable[[str], Any], data: PageInfo) -> Any:
+        data.content_hash = content_hash(data.html)
+        if self._memo is not None:
+            return self._memo.parse(extractor, data.content_hash, lambda: self._run_extractor(extractor, data.html))
+        return self._run_extractor(extractor, data.html)
+
+    def _run_extractor(self, extractor: Callable[[str], Any], payload: str) -> Any:
+        if self._parse_pool is not None:
+            return self._parse_pool.parse(extractor, payload)
+        return extractor(payload)
+
+    def _submit_band_subresources(self, band_id: str | int) -> tuple[SubFetch, SubFetch, SubFetch]:
+        return (
+            self._submit(self._get_band_discography, band_id),
+            self._submit(self._get_band_links, f'https://www.metal-archives.com/link/ajax-list/type/band/id/{band_id}'),
+            self._submit(self._get_band_description, f'https://www.metal-archives.com/band/read-more/id/{band_id}'),
+        )
+
+    def _submit_member_links(self, member_id: str | int) -> SubFetch:
+        return self._submit(self._get_member_links, f'https://www.metal-archives.com/link/ajax-list/type/person/id/{member_id}')
+
+    def _submit(self, func: Callable, *args) -> SubFetch:
+        fetch = SubFetch(func, *args)
+        if self._dispatch is not None:
+            self._dispatch(fetch)
+        return fetch
+
+    @staticmethod
+    def _id_from_url(url: str, pattern: re.Pattern) -> str | None:
+        match = pattern.search(url)
+        return match.group(1) if match else None
+
     def _get_band_description(self, url: str) -> PageInfo:
         data = self._get_data(url)
         if data.html is not None:
-            data.data = self._parser_cls.extract_band_description(data=data.html)
+            data.data = self._parse(self._parser_cls.extract_band_description, data)
         return data
     
     def _get_data(
@@ -148,24 +286,118 @@ class MetalArchivesPageHandler:
         save_screenshot: bool = True
     ) -> PageInfo:
         start_time = time.time()
+        token = cancel_token.get()
+        if token is not None and token.is_set():
+            return PageInfo(
+                url=url,
+                processing_time=0.0,
+                error="Загрузка отменена",
+            )
+
+        if self._cache is not None and not bypass_cache.get():
+            html = self._cache.get(url)
+            if html is not None:
+                return PageInfo(
+                    url=url,
+                    processing_time=round(time.time() - start_time, 2),
+                    html=html,
+                    from_cache=True,
+                )
+
+        data = self._fetch(url, start_time, save_screenshot)
+        if self._cache is not None and data.error is None and data.html is not None and not looks_like_challenge(data.html):
+            self._cache.put(url, data.html)
+        return data
+
+    def _fetch(self, url: str, start_time: float, save_screenshot: bool = True) -> PageInfo:
+        if self._http is not None and self._http.supports(url):
+            try:
+                self._throttle(url)
+                request_started = time.time()
+                html = self._http.fetch(url)
+                self._report(url, request_started)
+                return PageInfo(
+                    url=url,
+                    processing_time=round(time.time() - start_time, 2),
+                    html=html,
+                )
+            except ChallengeDetected:
+                # Проходим проверку в браузере, он же обновит cookies для HTTP-клиента
+                self._report(url, request_started, challenged=True)
+            except httpx.HTTPStatusError as err:
+                retry_after = err.response.headers.get('retry-after', '')
+                self._report(
+                    url, request_started,
+                    status=err.response.status_code,
+                    retry_after=float(retry_after) if retry_after.isdigit() else None,
+                )
+                return PageInfo(
+                    url=url,
+                    processing_time=round(time.time() - start_time, 2),
+                    error=f"Ошибка при парсинге: {str(err)}",
+                )
+            except httpx.HTTPError as err:
+                self._report(url, request_started)
+                return PageInfo(
+                    url=url,
+                    processing_time=round(time.time() - start_time, 2),
+                    error=f"Ошибка при парсинге: {str(err)}",
+                )
+            except RateLimitExceeded as err:
+                return PageInfo(
+                    url=url,
+                    processing_time=round(time.time() - start_time, 2),
+                    error=f"Ошибка при парсинге: {str(err)}",
+                )
+
         try:
-            self._sb.uc_open_with_tab(url)
-            # self._sb.uc_gui_click_captcha()
-            # self._sb.uc_gui_click_cf()
+            self._throttle(url)
+            with self._pool.lease() as session:
+                return self._load_page(session, url, start_time, save_screenshot)
+        except (BrowserPoolError, RateLimitExceeded) as err:
+            return PageInfo(
+                url=url,
+                processing_time=round(time.time() - start_time, 2),
+                error=f"Ошибка при парсинге: {str(err)}",
+            )
+
+    def _load_page(
+        self,
+        session: BrowserSession,
+        url: str,
+        start_time: float,
+        save_screenshot: bool = True
+    ) -> PageInfo:
+        sb = session.sb
+        request_started = time.time()
+        try:
+            # sb.uc_gui_click_captcha()
+            # sb.uc_gui_click_cf()
             # time.sleep(wait_time)
             # Получаем HTML и извлекаем информацию
+            html = self._open(session, url)
+            challenged = looks_like_challenge(html)
+            self._report(url, request_started, challenged=challenged)
+            session.report_success(challenged=challenged)
+            if self._clearance is not None:
+                if self._clearance.is_expiring() or (self._http is not None and self._http.needs_identity):
+                    self._clearance.harvest(sb)
+            elif self._http is not None and self._http.needs_identity:
+                self._http.update_identity(sb.driver.get_cookies(), sb.get_user_agent())
             return PageInfo(
                 url=url,
                 processing_time=round(time.time() - start_time, 2),
-                html=self._sb.get_page_source(),
+                html=html,
             )
 
         except Exception as err:
+            self._report(url, request_started)
+            session.report_failure()
             error_msg = f"Ошибка при парсинге: {str(err)}"
             if save_screenshot:
                 try:
                     screenshot_name = f"error_{int(time.time())}.png"
-                    self._sb.save_screenshot(screenshot_name)
+                    sb.save_screenshot(screenshot_name)
                     error_msg += f" (скриншот сохранен как {screenshot_name})"
                 except:
                     pass
@@ -176,4 +408,46 @@ class MetalArchivesPageHandler:
                 error=error_msg,
             )
 
-    
+    def _open(self, session: BrowserSession, url: str) -> str:
+        if DATATABLE_URL_PATTERN.search(url):
+            return self._open_datatable(session, url)
+        if self._resources is not None:
+            # В текущей вкладке можно грузить только после того, как сессия прошла проверку
+            return self._resources.load(session.sb, url, in_tab=session.passed_challenge)
+        session.sb.uc_open_with_tab(url)
+        return session.sb.get_page_source()
+
+    def _open_datatable(self, session: BrowserSession, url: str) -> str:
+        """Возвращает сырое JSON-тело ответа DataTables вместо HTML страницы"""
+        sb = session.sb
+        if session.passed_challenge:
+            try:
+                response = sb.driver.execute_async_script(IN_PAGE_FETCH_SCRIPT, url) or {}
+            except Exception:
+                response = {}
+            body = response.get('body') or ''
+            if response.get('status') == 200 and body.lstrip().startswith('{'):
+                self._json_captured_total += 1
+                return body
+            self._json_fallbacks_total += 1
+
+        sb.uc_open_with_tab(url)
+        body = sb.driver.execute_script(PRE_TEXT_SCRIPT)
+        if body and body.lstrip().startswith('{'):
+            self._json_captured_total += 1
+            return body
+        return sb.get_page_source()
+
+    def _throttle(self, url: str):
+        if self._limiter is not None:
+            self._limiter.acquire(url)
+
+    def _report(self, url: str, request_started: float, status: int | None = None, challenged: bool = False, retry_after: float | None = None):
+        if self._limiter is not None:
+            self._limiter.report(
+                url,
+                latency=time.time() - request_started,
+                status=status,
+                challenged=challenged,
+                retry_after=retry_after,
+            )
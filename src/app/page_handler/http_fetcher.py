@@ -0,0 +1,143 @@
+import re
+import threading
+from typing import Dict
+
+import httpx
+
+from app.core.config import settings
+
+
+# AJAX-эндпоинты, которые отдают JSON или HTML-фрагмент и не требуют полноценной вкладки
+AJAX_URL_PATTERNS = [
+    re.compile(pattern) for pattern in (
+        r'/search/ajax-band-search/',
+        r'/search/ajax-album-search/',
+        r'/search/ajax-advanced/searching/',
+        r'/browse/ajax-(letter|country|genre)/',
+        r'/artist/ajax-rip',
+        r'/link/ajax-list/',
+        r'/band/read-more/',
+        r'/band/ajax-recommendations/',
+        r'/release/ajax-view-lyrics/',
+        r'/band/discography/id/\d+/tab/',
+    )
+]
+
+CHALLENGE_MARKERS = (
+    '<title>Just a moment...</title>',
+    'challenges.cloudflare.com',
+    '_cf_chl_opt',
+    'cf-chl-',
+)
+
+
+def looks_like_challenge(text: str) -> bool:
+    return any(marker in text for marker in CHALLENGE_MARKERS)
+
+
+class ChallengeDetected(Exception):
+    """Cloudflare вернул страницу проверки вместо данных"""
+
+
+class HttpFetcher:
+    """Прямые HTTP-запросы к AJAX-эндпоинтам Metal Archives.
+
+    Использует cookies и User-Agent браузера, поэтому запросы выглядят
+    для Cloudflare так же, как запросы из вкладки.
+    """
+
+    def __init__(
+        self,
+        http2: bool = settings.HTTP_FAST_PATH_HTTP2,
+        timeout: float = settings.HTTP_FAST_PATH_TIMEOUT,
+        max_connections: int = settings.HTTP_FAST_PATH_MAX_CONNECTIONS,
+        transport: httpx.BaseTransport | None = None,
+    ):
+        self._client = httpx.Client(
+            http2=http2,
+            timeout=timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            transport=transport,
+        )
+        self._lock = threading.Lock()
+        self._user_agent: str | None = None
+        self.needs_identity = True
+        self._requests_total = 0
+        self._challenges_total = 0
+        self._errors_total = 0
+
+    def close(self):
+        self._client.close()
+
+    @staticmethod
+    def supports(url: str) -> bool:
+        return any(pattern.search(url) for pattern in AJAX_URL_PATTERNS)
+
+    def update_identity(self, cookies: list[dict], user_agent: str | None):
+        """Переносит cookies и User-Agent из сессии браузера"""
+        with self._lock:
+            for cookie in cookies:
+                self._client.cookies.set(
+                    cookie['name'],
+                    cookie['value'],
+                    domain=cookie.get('domain', ''),
+                    path=cookie.get('path', '/'),
+                )
+            if user_agent:
+                self._user_agent = user_agent
+            self.needs_identity = False
+
+    def fetch(self, url: str) -> str:
+        """Загружает URL и возвращает сырое JSON-тело или HTML в том же виде, что и get_page_source() браузера"""
+        headers = {
+            'Accept': 'application/json, text/javascript, text/html, */*; q=0.01',
+            'X-Requested-With': 'XMLHttpRequest',
+            'Referer': 'https://www.metal-archives.com/',
+        }
+        if self._user_agent:
+            headers['User-Agent'] = self._user_agent
+
+        self._requests_total += 1
+        try:
+            response = self._client.get(url, headers=headers)
+        except httpx.HTTPError:
+            self._errors_total += 1
+            raise
+
+        if self.is_challenge(response):
+            self._challenges_total += 1
+            self.needs_identity = True
+            raise ChallengeDetected(f"Cloudflare challenge для {url}")
+
+        if response.is_error:
+            self._errors_total += 1
+            response.raise_for_status()
+        return self.to_page_source(response)
+
+    @staticmethod
+    def is_challenge(response: httpx.Response) -> bool:
+        if response.headers.get('cf-mitigated') == 'challenge':
+            return True
+        if response.status_code in (403, 429, 503):
+            return looks_like_challenge(response.text)
+        return False
+
+    @staticmethod
+    def to_page_source(response: httpx.Response) -> str:
+        text = response.text
+        content_type = response.headers.get('content-type', '')
+        # JSON отдаётся парсеру как есть, а фрагменты Chrome оборачивает в <body>
+        if 'json' in content_type or text.lstrip().startswith('{'):
+            return text
+        if '<body' not in text:
+            return f'<html><head></head><body>{text}</body></html>'
+        return text
+
+    def get_stats(self) -> Dict:
+        return {
+            'requests_total': self._requests_total,
+            'challenges_total': self._challenges_total,
+            'errors_total': self._errors_total,
+            'needs_identity': self.needs_identity,
+        }
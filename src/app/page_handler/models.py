@@ -9,5 +9,8 @@ class PageInfo:
     processing_time: float
     error: str | None = None
     html: str | None = None
+    from_cache: bool = False
+    # sha256 полученной страницы: по нему повторная загрузка без изменений видна без разбора
+    content_hash: str | None = None
     data: BandInformation | AlbumInformation | StatInfo | list[SocialLink] | list[BandSearch] | list[BandSearchBy] | None = None
 
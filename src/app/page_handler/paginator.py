@@ -0,0 +1,136 @@
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Iterator
+
+from fastapi import Request
+
+from app.core.config import settings
+from app.page_handler.async_handler import AsyncPageHandler
+from app.page_handler.models import PageInfo
+from app.page_handler.priority_gate import Priority
+
+# Больше строк за один запрос DataTables Metal Archives не отдаёт
+MAX_PAGE_SIZE = 500
+
+
+@dataclass
+class ListingPage:
+    offset: int
+    rows: list[Any]
+    error: str | None = None
+
+
+@dataclass
+class ListingWalk:
+    """Обход выдачи: первая страница уже загружена, остальные приходят через pages.
+
+    truncated означает, что выдача длиннее max_pages страниц и отдана не целиком.
+    """
+    first: PageInfo
+    total: int | None
+    error: str | None
+    pages: AsyncIterator[ListingPage]
+    truncated: bool = False
+
+
+class Paginator:
+    """Загрузка всех страниц выдачи DataTables.
+
+    По первой странице определяются iTotalRecords и размер страницы,
+    остальные смещения загружаются с опережением не больше чем на
+    max_concurrency страниц от отдаваемой (общий лимит частоты соблюдает
+    обработчик) и отдаются по порядку смещений.
+    """
+
+    def __init__(
+        self,
+        page_handler: AsyncPageHandler,
+        max_concurrency: int = settings.PAGINATION_MAX_CONCURRENCY,
+        max_pages: int = settings.PAGINATION_MAX_PAGES,
+    ):
+        self._page_handler = page_handler
+        self._max_concurrency = max_concurrency
+        self._max_pages = max_pages
+
+    async def walk(
+        self,
+        url_for: Callable[[int], str],
+        decode: Callable[[str], tuple[int, Iterator[Any]]],
+        request: Request | None = None,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> ListingWalk:
+        first = await self._page_handler.get_page(url=url_for(0), request=request, priority=priority)
+        if first.error is not None:
+            return ListingWalk(first=first, total=None, error=first.error, pages=_empty())
+
+        try:
+            total, rows = await asyncio.to_thread(_decode_page, decode, first.html)
+        except Exception as err:
+            return ListingWalk(first=first, total=None, error=f"Ошибка при парсинге: {str(err)}", pages=_empty())
+
+        # Шаг берётся из фактического числа строк: эндпоинт может отдавать меньше запрошенного
+        step = len(rows)
+        all_offsets = range(step, total, step) if step else range(0)
+        offsets = all_offsets[:self._max_pages - 1]
+        return ListingWalk(
+            first=first,
+            total=total,
+            error=None,
+            pages=self._pages(ListingPage(offset=0, rows=rows), offsets, url_for, decode, request, priority),
+            truncated=len(offsets) < len(all_offsets),
+        )
+
+    async def _pages(
+        self,
+        first: ListingPage,
+        offsets: range,
+        url_for: Callable[[int], str],
+        decode: Callable[[str], tuple[int, Iterator[Any]]],
+        request: Request | None,
+        priority: Priority,
+    ) -> AsyncIterator[ListingPage]:
+        yield first
+        pending: deque[tuple[int, asyncio.Future]] = deque()
+        remaining = iter(offsets)
+
+        def fill():
+            # Задачи создаются по мере отдачи: если клиент читает медленно, загрузки не уходят вперёд
+            while len(pending) < self._max_concurrency:
+                offset = next(remaining, None)
+                if offset is None:
+                    return
+                task = asyncio.ensure_future(
+                    self._page_handler.get_page(url=url_for(offset), request=request, priority=priority)
+                )
+                pending.append((offset, task))
+
+        try:
+            fill()
+            while pending:
+                offset, task = pending.popleft()
+                info = await task
+                fill()
+                if info.error is not None:
+                    yield ListingPage(offset=offset, rows=[], error=info.error)
+                    continue
+                try:
+                    _, rows = await asyncio.to_thread(_decode_page, decode, info.html)
+                except Exception as err:
+                    yield ListingPage(offset=offset, rows=[], error=f"Ошибка при парсинге: {str(err)}")
+                    continue
+                yield ListingPage(offset=offset, rows=rows)
+        finally:
+            # Клиент отключился или обход прерван: оставшиеся загрузки не нужны
+            for _, task in pending:
+                task.cancel()
+
+
+def _decode_page(decode: Callable[[str], tuple[int, Iterator[Any]]], payload: str) -> tuple[int, list[Any]]:
+    total, rows = decode(payload)
+    return total, list(rows)
+
+
+async def _empty() -> AsyncIterator[ListingPage]:
+    return
+    yield
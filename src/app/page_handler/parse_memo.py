@@ -0,0 +1,115 @@
+import datetime
+import hashlib
+import inspect
+import os
+import pickle
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict
+
+from app.core.config import settings
+
+
+def content_hash(payload: str) -> str:
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+_versions: Dict[type, str] = {}
+
+
+def parser_version(parser_cls: type) -> str:
+    """Отпечаток исходников парсера и его настроек.
+
+    Любая правка в пакете data_parser или смена бэкенда меняет версию,
+    и ранее сохранённые результаты перестают находиться.
+    """
+    version = _versions.get(parser_cls)
+    if version is None:
+        package_directory = os.path.dirname(inspect.getfile(parser_cls))
+        digest = hashlib.sha256(f'{parser_cls.backend}:{parser_cls.selective}'.encode())
+        for filename in sorted(os.listdir(package_directory)):
+            if filename.endswith('.py'):
+                with open(os.path.join(package_directory, filename), 'rb') as file:
+                    digest.update(file.read())
+        version = _versions[parser_cls] = digest.hexdigest()[:16]
+    return version
+
+
+class ParseMemo:
+    """Результаты разбора страниц, адресуемые содержимым страницы.
+
+    Ключ: экстрактор, версия парсера и sha256 страницы. Результат хранится
+    сжатым pickle, так что каждый вызов получает собственную копию и может
+    её дополнять (например, дискографией группы). При превышении лимита
+    вытесняются давно не читанные записи.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = settings.PARSE_MEMO_MAX_BYTES,
+        compression_level: int = settings.PARSE_MEMO_COMPRESSION_LEVEL,
+    ):
+        self._max_bytes = max_bytes
+        self._compression_level = compression_level
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[str, str, str], tuple[bytes, float]] = OrderedDict()
+        self._stored_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._parse_time_saved = 0.0
+
+    def parse(self, extractor: Callable[[str], Any], payload_hash: str, parse: Callable[[], Any]) -> Any:
+        parser_cls = extractor.__self__
+        key = (extractor.__name__, parser_version(parser_cls), payload_hash)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                self._parse_time_saved += entry[1]
+            else:
+                self._misses += 1
+
+        if entry is not None:
+            result = pickle.loads(zlib.decompress(entry[0]))
+            # Страница не изменилась, но получена сейчас
+            if hasattr(result, 'updated_at'):
+                result.updated_at = datetime.datetime.now(datetime.timezone.utc)
+            return result
+
+        started = time.perf_counter()
+        result = parse()
+        elapsed = time.perf_counter() - started
+        blob = zlib.compress(pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL), self._compression_level)
+        self._store(key, blob, elapsed)
+        return result
+
+    def _store(self, key: tuple[str, str, str], blob: bytes, parse_time: float):
+        if len(blob) > self._max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._stored_bytes -= len(previous[0])
+            self._entries[key] = (blob, parse_time)
+            self._stored_bytes += len(blob)
+            while self._stored_bytes > self._max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._stored_bytes -= len(evicted)
+                self._evictions += 1
+
+    def get_stats(self) -> Dict:
+        requests = self._hits + self._misses
+        return {
+            'entries': len(self._entries),
+            'stored_bytes': self._stored_bytes,
+            'max_bytes': self._max_bytes,
+            'hits': self._hits,
+            'misses': self._misses,
+            'hit_ratio': round(self._hits / requests, 3) if requests else 0.0,
+            'evictions': self._evictions,
+            'parse_time_saved': round(self._parse_time_saved, 3),
+        }
@@ -0,0 +1,127 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict
+
+from app.core.config import settings
+
+
+def _warm_up():
+    """Импортирует парсер в процессе-обработчике до первых реальных задач"""
+    from app.page_handler.data_parser.parser import PageParser
+    PageParser._soup('<html><body></body></html>')
+    return multiprocessing.current_process().pid
+
+
+def _run_extractor(extractor: Callable[[str], Any], payload: str) -> tuple[Any, float]:
+    started = time.perf_counter()
+    return extractor(payload), time.perf_counter() - started
+
+
+class ParsePool:
+    """Пул процессов для разбора страниц.
+
+    Разбор больших страниц уходит в отдельные процессы и не держит GIL
+    потоков загрузки. Маленькие страницы разбираются на месте: передача
+    данных между процессами обходится дороже самого разбора. При
+    заполненной очереди задача тоже выполняется на месте, вызывающий
+    поток сам становится обработчиком.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = settings.PARSE_POOL_WORKERS,
+        inline_threshold: int = settings.PARSE_POOL_INLINE_THRESHOLD,
+        max_pending: int = settings.PARSE_POOL_MAX_PENDING,
+    ):
+        self._max_workers = max_workers
+        self._inline_threshold = inline_threshold
+        self._max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._executor: ProcessPoolExecutor | None = None
+        self._pending = 0
+        self._offloaded_total = 0
+        self._inline_total = 0
+        self._overflow_total = 0
+        self._restarts_total = 0
+        self._worker_time_total = 0.0
+
+    def start(self):
+        """Запускает процессы и дожидается их готовности"""
+        # spawn, а не fork: в родительском процессе работают потоки браузеров и event loop
+        self._executor = ProcessPoolExecutor(
+            max_workers=self._max_workers,
+            mp_context=multiprocessing.get_context('spawn'),
+        )
+        futures = [self._executor.submit(_warm_up) for _ in range(self._max_workers)]
+        for future in futures:
+            future.result()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def parse(self, extractor: Callable[[str], Any], payload: str) -> Any:
+        executor = self._executor
+        if executor is None or len(payload) < self._inline_threshold:
+            self._inline_total += 1
+            return extractor(payload)
+
+        if not self._slots.acquire(blocking=False):
+            self._overflow_total += 1
+            return extractor(payload)
+
+        with self._lock:
+            self._pending += 1
+        try:
+            try:
+                future = executor.submit(_run_extractor, extractor, payload)
+            except RuntimeError:
+                # Пул остановлен другим потоком (перезапуск или close) между чтением
+                # self._executor и submit: разбираем на месте
+                self._inline_total += 1
+                return extractor(payload)
+            result, worker_time = future.result()
+        except BrokenProcessPool:
+            # Процесс-обработчик упал: поднимаем пул заново, а эту страницу разбираем на месте
+            self._restart(executor)
+            self._inline_total += 1
+            return extractor(payload)
+        except CancelledError:
+            # Задачу снял shutdown(cancel_futures=True) при перезапуске или close
+            self._inline_total += 1
+            return extractor(payload)
+        finally:
+            with self._lock:
+                self._pending -= 1
+            self._slots.release()
+
+        self._offloaded_total += 1
+        self._worker_time_total += worker_time
+        return result
+
+    def _restart(self, broken: ProcessPoolExecutor):
+        with self._lock:
+            if self._executor is not broken:
+                return
+            self._restarts_total += 1
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self.start()
+
+    def get_stats(self) -> Dict:
+        return {
+            'workers': self._max_workers,
+            'inline_threshold': self._inline_threshold,
+            'max_pending': self._max_pending,
+            'pending': self._pending,
+            'offloaded_total': self._offloaded_total,
+            'inline_total': self._inline_total,
+            'overflow_total': self._overflow_total,
+            'restarts_total': self._restarts_total,
+            'worker_time_avg': round(self._worker_time_total / self._offloaded_total, 4) if self._offloaded_total else 0.0,
+        }
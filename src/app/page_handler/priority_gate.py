@@ -0,0 +1,158 @@
+import asyncio
+import itertools
+import time
+from collections import deque
+from enum import Enum
+from typing import Deque, Dict, Hashable
+
+from app.core.config import settings
+
+
+class Priority(str, Enum):
+    INTERACTIVE = 'interactive'
+    PREFETCH = 'prefetch'
+    BULK = 'bulk'
+
+
+# Чем меньше ранг, тем раньше класс получает слот
+PRIORITY_RANKS = {
+    Priority.INTERACTIVE: 0,
+    Priority.PREFETCH: 1,
+    Priority.BULK: 2,
+}
+
+
+class Ticket:
+    """Ожидание слота одной загрузкой"""
+
+    def __init__(self, priority: Priority, key: Hashable | None, seq: int):
+        self.priority = priority
+        self.key = key
+        self.seq = seq
+        self.enqueued_at = time.monotonic()
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class PriorityGate:
+    """Семафор с классами приоритета для загрузок страниц.
+
+    Свободный слот получает ожидающий с наименьшим виртуальным сроком
+    enqueued_at + rank * aging_interval: фоновые загрузки уступают
+    интерактивным, но после ожидания в aging_interval на каждый уровень
+    приоритета обгоняют более новые запросы. Число одновременных загрузок
+    фоновых классов ограничено, чтобы они не занимали все браузеры.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        aging_interval: float = settings.SCRAPE_PRIORITY_AGING_INTERVAL,
+        class_limits: Dict[Priority, int] | None = None,
+    ):
+        self._capacity = capacity
+        self._aging_interval = aging_interval
+        if class_limits is None:
+            class_limits = {
+                Priority.PREFETCH: settings.SCRAPE_PREFETCH_MAX_CONCURRENCY,
+                Priority.BULK: settings.SCRAPE_BULK_MAX_CONCURRENCY,
+            }
+        self._limits = {
+            priority: max(1, min(capacity, class_limits.get(priority, capacity)))
+            for priority in Priority
+        }
+        self._queues: Dict[Priority, Deque[Ticket]] = {priority: deque() for priority in Priority}
+        self._waiting_by_key: Dict[Hashable, Ticket] = {}
+        self._active: Dict[Priority, int] = {priority: 0 for priority in Priority}
+        self._seq = itertools.count()
+        self._granted_total: Dict[Priority, int] = {priority: 0 for priority in Priority}
+        self._promoted_total = 0
+        self._wait_time_total: Dict[Priority, float] = {priority: 0.0 for priority in Priority}
+        self._wait_time_max: Dict[Priority, float] = {priority: 0.0 for priority in Priority}
+
+    async def acquire(self, priority: Priority = Priority.INTERACTIVE, key: Hashable | None = None) -> Priority:
+        """Ждёт слот. Возвращает класс, под которым слот выдан (он может быть повышен через promote)"""
+        ticket = Ticket(priority, key, next(self._seq))
+        self._queues[priority].append(ticket)
+        if key is not None:
+            self._waiting_by_key[key] = ticket
+        self._dispatch()
+        try:
+            return await ticket.future
+        except asyncio.CancelledError:
+            if ticket.future.done() and not ticket.future.cancelled():
+                # Слот уже выдан, но ожидающий отменён: возвращаем слот
+                self.release(ticket.future.result())
+            else:
+                self._remove(ticket)
+            raise
+
+    def release(self, priority: Priority):
+        self._active[priority] -= 1
+        self._dispatch()
+
+    def promote(self, key: Hashable, priority: Priority):
+        """Повышает класс ожидающей загрузки, к которой присоединился более срочный запрос"""
+        ticket = self._waiting_by_key.get(key)
+        if ticket is None or PRIORITY_RANKS[priority] >= PRIORITY_RANKS[ticket.priority]:
+            return
+        self._queues[ticket.priority].remove(ticket)
+        ticket.priority = priority
+        # Сохраняем место в очереди по времени постановки
+        queue = self._queues[priority]
+        index = next((i for i, other in enumerate(queue) if other.seq > ticket.seq), len(queue))
+        queue.insert(index, ticket)
+        self._promoted_total += 1
+        self._dispatch()
+
+    def _dispatch(self):
+        while sum(self._active.values()) < self._capacity:
+            ticket = self._next_ticket()
+            if ticket is None:
+                return
+            self._remove(ticket)
+            if ticket.future.done():
+                # Ожидающий уже отменён, его обработчик ещё не успел убрать билет
+                continue
+            self._active[ticket.priority] += 1
+            waited = time.monotonic() - ticket.enqueued_at
+            self._granted_total[ticket.priority] += 1
+            self._wait_time_total[ticket.priority] += waited
+            self._wait_time_max[ticket.priority] = max(self._wait_time_max[ticket.priority], waited)
+            ticket.future.set_result(ticket.priority)
+
+    def _next_ticket(self) -> Ticket | None:
+        best: Ticket | None = None
+        best_deadline = 0.0
+        for priority, queue in self._queues.items():
+            if not queue or self._active[priority] >= self._limits[priority]:
+                continue
+            head = queue[0]
+            deadline = head.enqueued_at + PRIORITY_RANKS[priority] * self._aging_interval
+            if best is None or deadline < best_deadline:
+                best, best_deadline = head, deadline
+        return best
+
+    def _remove(self, ticket: Ticket):
+        queue = self._queues[ticket.priority]
+        if ticket in queue:
+            queue.remove(ticket)
+        if ticket.key is not None and self._waiting_by_key.get(ticket.key) is ticket:
+            del self._waiting_by_key[ticket.key]
+
+    def get_stats(self) -> Dict:
+        return {
+            'capacity': self._capacity,
+            'promoted_total': self._promoted_total,
+            'classes': {
+                priority.value: {
+                    'limit': self._limits[priority],
+                    'active': self._active[priority],
+                    'waiting': len(self._queues[priority]),
+                    'granted_total': self._granted_total[priority],
+                    'wait_time_avg': round(self._wait_time_total[priority] / self._granted_total[priority], 3)
+                    if self._granted_total[priority] else 0.0,
+                    'wait_time_max': round(self._wait_time_max[priority], 3),
+                }
+                for priority in Priority
+            },
+        }
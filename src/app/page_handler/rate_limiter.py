@@ -0,0 +1,127 @@
+import threading
+import time
+from typing import Dict
+from urllib.parse import urlsplit
+
+from app.core.config import settings
+
+
+class RateLimitExceeded(Exception):
+    """Ожидание токена превысило допустимое время"""
+
+
+class HostBucket:
+    """Корзина токенов одного хоста"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+        self.latency_ewma: float | None = None
+        self.requests_total = 0
+        self.throttled_total = 0
+        self.slow_total = 0
+        self.wait_time_total = 0.0
+
+    def refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+
+class AdaptiveRateLimiter:
+    """Ограничитель запросов к внешним хостам с подстройкой скорости (AIMD).
+
+    Скорость растёт на additive_increase после каждого успешного ответа
+    и умножается на multiplicative_decrease при 429/503, странице проверки
+    Cloudflare или задержке выше latency_target.
+    """
+
+    def __init__(
+        self,
+        initial_rate: float = settings.RATE_LIMIT_INITIAL_RATE,
+        min_rate: float = settings.RATE_LIMIT_MIN_RATE,
+        max_rate: float = settings.RATE_LIMIT_MAX_RATE,
+        burst: float = settings.RATE_LIMIT_BURST,
+        additive_increase: float = settings.RATE_LIMIT_ADDITIVE_INCREASE,
+        multiplicative_decrease: float = settings.RATE_LIMIT_MULTIPLICATIVE_DECREASE,
+        latency_target: float = settings.RATE_LIMIT_LATENCY_TARGET,
+        max_wait: float = settings.RATE_LIMIT_MAX_WAIT,
+    ):
+        self._initial_rate = initial_rate
+        self._min_rate = min_rate
+        self._max_rate = max_rate
+        self._burst = burst
+        self._additive_increase = additive_increase
+        self._multiplicative_decrease = multiplicative_decrease
+        self._latency_target = latency_target
+        self._max_wait = max_wait
+        self._buckets: Dict[str, HostBucket] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, url: str) -> float:
+        """Резервирует токен для запроса и ждёт его. Возвращает время ожидания"""
+        host = self._host(url)
+        with self._lock:
+            bucket = self._bucket(host)
+            now = time.monotonic()
+            bucket.refill(now)
+            # Токен резервируется сразу, поэтому ожидающие обслуживаются по очереди
+            wait = max((1 - bucket.tokens) / bucket.rate, bucket.blocked_until - now, 0.0)
+            if wait > self._max_wait:
+                raise RateLimitExceeded(f"Слишком много запросов к {host}, ожидание {wait:.1f} с")
+            bucket.tokens -= 1
+            bucket.requests_total += 1
+            bucket.wait_time_total += wait
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def report(self, url: str, latency: float, status: int | None = None, challenged: bool = False, retry_after: float | None = None):
+        """Сообщает результат запроса и подстраивает скорость хоста"""
+        host = self._host(url)
+        with self._lock:
+            bucket = self._bucket(host)
+            bucket.latency_ewma = latency if bucket.latency_ewma is None else 0.8 * bucket.latency_ewma + 0.2 * latency
+
+            if status in (429, 503) or challenged:
+                bucket.throttled_total += 1
+                bucket.rate = max(self._min_rate, bucket.rate * self._multiplicative_decrease)
+                bucket.tokens = min(bucket.tokens, 0.0)
+                if retry_after:
+                    bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + retry_after)
+            elif latency > self._latency_target:
+                bucket.slow_total += 1
+                bucket.rate = max(self._min_rate, bucket.rate * self._multiplicative_decrease)
+            else:
+                bucket.rate = min(self._max_rate, bucket.rate + self._additive_increase)
+
+    def _bucket(self, host: str) -> HostBucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = HostBucket(rate=self._initial_rate, burst=self._burst)
+            self._buckets[host] = bucket
+        return bucket
+
+    @staticmethod
+    def _host(url: str) -> str:
+        return (urlsplit(url).hostname or '').lower()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            now = time.monotonic()
+            return {
+                host: {
+                    'rate': round(bucket.rate, 3),
+                    'tokens': round(min(bucket.burst, bucket.tokens + (now - bucket.updated_at) * bucket.rate), 3),
+                    'blocked_for': round(max(bucket.blocked_until - now, 0.0), 3),
+                    'latency_ewma': round(bucket.latency_ewma, 3) if bucket.latency_ewma is not None else None,
+                    'requests_total': bucket.requests_total,
+                    'throttled_total': bucket.throttled_total,
+                    'slow_total': bucket.slow_total,
+                    'wait_time_total': round(bucket.wait_time_total, 3),
+                }
+                for host, bucket in self._buckets.items()
+            }
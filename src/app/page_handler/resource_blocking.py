@@ -0,0 +1,198 @@
+import re
+import threading
+import time
+from typing import Dict
+
+from seleniumbase import SB
+
+from app.core.config import settings
+from app.page_handler.http_fetcher import looks_like_challenge
+
+
+def _extension_patterns(*extensions: str) -> list[str]:
+    return [pattern for extension in extensions for pattern in (f'*.{extension}', f'*.{extension}?*')]
+
+
+# Шаблоны URL для Network.setBlockedURLs по категориям ресурсов
+RESOURCE_CATEGORIES: Dict[str, list[str]] = {
+    'images': _extension_patterns('jpg', 'jpeg', 'png', 'gif', 'webp', 'svg', 'ico', 'bmp'),
+    'fonts': _extension_patterns('woff', 'woff2', 'ttf', 'otf', 'eot') + ['*fonts.googleapis.com*', '*fonts.gstatic.com*'],
+    'stylesheets': _extension_patterns('css'),
+    'media': _extension_patterns('mp3', 'mp4', 'webm', 'ogg'),
+    'third_party': [
+        '*googlesyndication.com*',
+        '*doubleclick.net*',
+        '*google-analytics.com*',
+        '*googletagmanager.com*',
+        '*googletagservices.com*',
+        '*adservice.google.*',
+        '*amazon-adsystem.com*',
+        '*quantserve.com*',
+        '*scorecardresearch.com*',
+        '*facebook.net*',
+        '*platform.twitter.com*',
+        '*addthis.com*',
+    ],
+}
+
+
+class ResourcePolicy:
+    """Класс URL и категории ресурсов, которые для него разрешены"""
+
+    def __init__(self, name: str, pattern: str, allowed: frozenset[str] = frozenset()):
+        self.name = name
+        self.pattern = re.compile(pattern)
+        self.allowed = allowed
+
+
+# Страницы, для которых PageParser читает только HTML. Прочие URL грузятся как есть
+RESOURCE_POLICY_PATTERNS: Dict[str, str] = {
+    'band': r'/band/view/id/\d+|/band/random',
+    'album': r'/albums/view/id/\d+',
+    'artist': r'/artists/[^/]+/\d+',
+    'stats': r'metal-archives\.com/stats$',
+}
+
+
+def parse_allow_list(value: str) -> Dict[str, frozenset[str]]:
+    """Разбор RESOURCE_BLOCKING_ALLOW: "album:images,band:stylesheets" -> {'album': {'images'}, ...}"""
+    allowed: Dict[str, set[str]] = {}
+    for item in value.split(','):
+        if not item.strip():
+            continue
+        name, _, category = (part.strip() for part in item.partition(':'))
+        if name not in RESOURCE_POLICY_PATTERNS:
+            raise ValueError(f"Неизвестный класс страниц в RESOURCE_BLOCKING_ALLOW: {name}")
+        if category not in RESOURCE_CATEGORIES:
+            raise ValueError(f"Неизвестная категория ресурсов в RESOURCE_BLOCKING_ALLOW: {category}")
+        allowed.setdefault(name, set()).add(category)
+    return {name: frozenset(categories) for name, categories in allowed.items()}
+
+
+def build_policies(allow: str) -> list[ResourcePolicy]:
+    allowed = parse_allow_list(allow)
+    return [
+        ResourcePolicy(name, pattern, allowed.get(name, frozenset()))
+        for name, pattern in RESOURCE_POLICY_PATTERNS.items()
+    ]
+
+
+DEFAULT_RESOURCE_POLICIES = build_policies(settings.RESOURCE_BLOCKING_ALLOW)
+
+PERFORMANCE_SCRIPT = """
+const navigation = performance.getEntriesByType('navigation')[0];
+const resources = performance.getEntriesByType('resource');
+return {
+    bytes: (navigation ? navigation.transferSize : 0)
+        + resources.reduce((total, entry) => total + (entry.transferSize || 0), 0),
+    load_time: navigation ? navigation.duration / 1000 : null,
+    resources: resources.length,
+};
+"""
+
+
+class ResourceBlocker:
+    """Блокировка картинок, шрифтов, стилей и сторонних скриптов при загрузке страниц.
+
+    uc_open_with_tab открывает новую вкладку при отключённом chromedriver,
+    поэтому перехват через CDP для неё установить нельзя. Сессия, уже
+    прошедшая проверку Cloudflare, загружает страницу в текущей вкладке
+    с Network.setBlockedURLs; если вместо данных пришла проверка,
+    страница открывается заново обычным способом.
+
+    Для каждой загрузки по классу URL снимаются байты и время из
+    Performance API, отдельно для режимов blocked и full, так что
+    эффект блокировки виден в /metrics.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = settings.RESOURCE_BLOCKING_ENABLED,
+        blocked_categories: str = settings.RESOURCE_BLOCKING_CATEGORIES,
+        policies: list[ResourcePolicy] = DEFAULT_RESOURCE_POLICIES,
+    ):
+        blocked_categories = [category.strip() for category in blocked_categories.split(',') if category.strip()]
+        unknown = set(blocked_categories) - set(RESOURCE_CATEGORIES)
+        if unknown:
+            raise ValueError(f"Неизвестные категории ресурсов: {', '.join(sorted(unknown))}")
+        self.enabled = enabled
+        self._blocked_categories = blocked_categories
+        self._policies = policies
+        self._lock = threading.Lock()
+        self._stats: Dict[tuple[str, str], Dict] = {}
+        self._fallbacks_total = 0
+
+    def policy_for(self, url: str) -> ResourcePolicy | None:
+        for policy in self._policies:
+            if policy.pattern.search(url):
+                return policy
+        return None
+
+    def blocked_patterns(self, policy: ResourcePolicy) -> list[str]:
+        return [
+            pattern
+            for category in self._blocked_categories if category not in policy.allowed
+            for pattern in RESOURCE_CATEGORIES[category]
+        ]
+
+    def load(self, sb: SB, url: str, in_tab: bool) -> str:
+        """Открывает URL и возвращает HTML страницы"""
+        policy = self.policy_for(url)
+        patterns = self.blocked_patterns(policy) if policy is not None and self.enabled else []
+        started = time.time()
+
+        if patterns and in_tab:
+            sb.driver.execute_cdp_cmd('Network.enable', {})
+            sb.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+            try:
+                sb.driver.default_get(url)
+                html = sb.get_page_source()
+            finally:
+                sb.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': []})
+            if not looks_like_challenge(html):
+                self._measure(sb, policy, 'blocked', time.time() - started)
+                return html
+            with self._lock:
+                self._fallbacks_total += 1
+            started = time.time()
+
+        sb.uc_open_with_tab(url)
+        html = sb.get_page_source()
+        if policy is not None:
+            self._measure(sb, policy, 'full', time.time() - started)
+        return html
+
+    def _measure(self, sb: SB, policy: ResourcePolicy, mode: str, elapsed: float):
+        try:
+            performance = sb.driver.execute_script(PERFORMANCE_SCRIPT) or {}
+        except Exception:
+            performance = {}
+
+        with self._lock:
+            stats = self._stats.setdefault((policy.name, mode), {
+                'loads': 0, 'bytes_total': 0, 'load_time_total': 0.0, 'wall_time_total': 0.0, 'resources_total': 0,
+            })
+            stats['loads'] += 1
+            stats['bytes_total'] += int(performance.get('bytes') or 0)
+            stats['load_time_total'] += float(performance.get('load_time') or 0.0)
+            stats['wall_time_total'] += elapsed
+            stats['resources_total'] += int(performance.get('resources') or 0)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            classes: Dict[str, Dict] = {}
+            for (name, mode), stats in self._stats.items():
+                loads = stats['loads']
+                classes.setdefault(name, {})[mode] = {
+                    'loads': loads,
+                    'bytes_avg': round(stats['bytes_total'] / loads),
+                    'load_time_avg': round(stats['load_time_total'] / loads, 3),
+                    'wall_time_avg': round(stats['wall_time_total'] / loads, 3),
+                    'resources_avg': round(stats['resources_total'] / loads, 1),
+                }
+            return {
+                'enabled': self.enabled,
+                'blocked_categories': self._blocked_categories,
+                'fallbacks_total': self._fallbacks_total,
+                'classes': classes,
+            }
@@ -0,0 +1,247 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict
+
+from app.core.config import settings
+from app.page_handler.single_flight import normalize_url
+
+# Время жизни ответа в секундах по классам URL. URL без политики не кешируются (например, band/random)
+DEFAULT_TTL_POLICIES: list[tuple[re.Pattern, int]] = [
+    (re.compile(pattern), ttl) for pattern, ttl in (
+        (r'metal-archives\.com/stats$', 5 * 60),
+        (r'/search/ajax-(band|album)-search/', 10 * 60),
+        (r'/search/ajax-advanced/searching/', 10 * 60),
+        (r'/browse/ajax-(letter|country|genre)/', 60 * 60),
+        (r'/artist/ajax-rip', 60 * 60),
+        (r'/band/view/id/\d+', 60 * 60),
+        (r'/band/discography/id/\d+/tab/', 60 * 60),
+        (r'/band/read-more/id/\d+', 24 * 60 * 60),
+        (r'/band/ajax-recommendations/id/\d+', 3 * 24 * 60 * 60),
+        (r'/link/ajax-list/', 7 * 24 * 60 * 60),
+        (r'/albums/view/id/\d+', 24 * 60 * 60),
+        (r'/artists/[^/]+/\d+', 24 * 60 * 60),
+        (r'/release/ajax-view-lyrics/id/\d+', 7 * 24 * 60 * 60),
+    )
+]
+
+# Сколько отметок о чтении копится в памяти до записи в индекс
+ACCESS_FLUSH_BATCH = 256
+
+
+class ResponseCache:
+    """Дисковый кеш ответов Metal Archives.
+
+    Тела хранятся сжатыми в файлах, адресуемых хешем содержимого,
+    индекс URL -> хеш лежит в SQLite. При превышении лимита размера
+    вытесняются давно не читанные записи.
+
+    Общий размер хранится в памяти и меняется при появлении и удалении
+    тел. Время чтения записывается в индекс пачками, а не при каждом
+    попадании; чтение и сжатие тел выполняются вне блокировки.
+    """
+
+    def __init__(
+        self,
+        directory: str = settings.RESPONSE_CACHE_DIR,
+        max_bytes: int = settings.RESPONSE_CACHE_MAX_BYTES,
+        ttl_policies: list[tuple[re.Pattern, int]] = DEFAULT_TTL_POLICIES,
+    ):
+        self._directory = directory
+        self._blobs_directory = os.path.join(directory, 'blobs')
+        self._max_bytes = max_bytes
+        self._ttl_policies = ttl_policies
+        os.makedirs(self._blobs_directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(directory, 'index.sqlite3'), check_same_thread=False)
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            'url TEXT PRIMARY KEY, content_hash TEXT NOT NULL, size INTEGER NOT NULL, '
+            'expires_at REAL NOT NULL, accessed_at REAL NOT NULL)'
+        )
+        self._db.execute('CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS entries_content_hash ON entries (content_hash)')
+        self._db.commit()
+        self._stored_bytes = self._total_bytes()
+        self._pending_access: Dict[str, float] = {}
+
+        self._hits = 0
+        self._misses = 0
+        self._expired = 0
+        self._stores = 0
+        self._evictions = 0
+        self._bytes_served = 0
+        self._bytes_written = 0
+
+    def ttl_for(self, url: str) -> int | None:
+        for pattern, ttl in self._ttl_policies:
+            if pattern.search(url):
+                return ttl
+        return None
+
+    def get(self, url: str) -> str | None:
+        if self.ttl_for(url) is None:
+            return None
+
+        key = normalize_url(url)
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                'SELECT content_hash, expires_at FROM entries WHERE url = ?', (key,)
+            ).fetchone()
+            if row is None:
+                self._misses += 1
+                return None
+
+            content_hash, expires_at = row
+            if expires_at <= now:
+                self._expired += 1
+                self._misses += 1
+                self._delete_entry(key, content_hash)
+                return None
+
+        try:
+            with open(self._blob_path(content_hash), 'rb') as file:
+                text = zlib.decompress(file.read()).decode('utf-8')
+        except (OSError, zlib.error):
+            with self._lock:
+                self._misses += 1
+                self._delete_entry(key, content_hash)
+            return None
+
+        with self._lock:
+            self._pending_access[key] = now
+            if len(self._pending_access) >= ACCESS_FLUSH_BATCH:
+                self._flush_access()
+                self._db.commit()
+            self._hits += 1
+            self._bytes_served += len(text)
+        return text
+
+    def put(self, url: str, text: str):
+        ttl = self.ttl_for(url)
+        if ttl is None:
+            return
+
+        key = normalize_url(url)
+        raw = text.encode('utf-8')
+        content_hash = hashlib.sha256(raw).hexdigest()
+        blob_path = self._blob_path(content_hash)
+        # Сжатие — самая долгая часть записи, его не нужно делать под блокировкой
+        compressed = None
+        if not os.path.exists(blob_path):
+            compressed = zlib.compress(raw, settings.RESPONSE_CACHE_COMPRESSION_LEVEL)
+        now = time.time()
+        with self._lock:
+            if os.path.exists(blob_path):
+                size = os.path.getsize(blob_path)
+            else:
+                if compressed is None:
+                    # Тело удалено вытеснением, пока шло сжатие
+                    compressed = zlib.compress(raw, settings.RESPONSE_CACHE_COMPRESSION_LEVEL)
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                tmp_path = f'{blob_path}.tmp'
+                with open(tmp_path, 'wb') as file:
+                    file.write(compressed)
+                os.replace(tmp_path, blob_path)
+                size = len(compressed)
+                self._bytes_written += size
+
+            if not self._hash_in_use(content_hash):
+                self._stored_bytes += size
+            previous = self._db.execute('SELECT content_hash, size FROM entries WHERE url = ?', (key,)).fetchone()
+            self._db.execute(
+                'INSERT OR REPLACE INTO entries (url, content_hash, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)',
+                (key, content_hash, size, now + ttl, now),
+            )
+            self._pending_access.pop(key, None)
+            if previous is not None and previous[0] != content_hash:
+                self._delete_blob_if_orphan(*previous)
+            self._stores += 1
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        if self._stored_bytes <= self._max_bytes:
+            return
+        # Порядок вытеснения учитывает чтения, ещё не записанные в индекс
+        self._flush_access()
+        rows = self._db.execute('SELECT url, content_hash FROM entries ORDER BY accessed_at').fetchall()
+        for url, content_hash in rows:
+            if self._stored_bytes <= self._max_bytes:
+                break
+            self._delete_entry(url, content_hash, commit=False)
+            self._evictions += 1
+
+    def _flush_access(self):
+        if self._pending_access:
+            self._db.executemany(
+                'UPDATE entries SET accessed_at = ? WHERE url = ?',
+                [(accessed_at, url) for url, accessed_at in self._pending_access.items()],
+            )
+            self._pending_access.clear()
+
+    def _total_bytes(self) -> int:
+        row = self._db.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT content_hash, size FROM entries)'
+        ).fetchone()
+        return row[0]
+
+    def _delete_entry(self, url: str, content_hash: str, commit: bool = True):
+        # Запись могла быть перезаписана другим телом, пока тело читалось вне блокировки
+        row = self._db.execute(
+            'SELECT size FROM entries WHERE url = ? AND content_hash = ?', (url, content_hash)
+        ).fetchone()
+        if row is None:
+            return
+        self._db.execute('DELETE FROM entries WHERE url = ?', (url,))
+        self._pending_access.pop(url, None)
+        self._delete_blob_if_orphan(content_hash, row[0])
+        if commit:
+            self._db.commit()
+
+    def _delete_blob_if_orphan(self, content_hash: str, size: int):
+        if self._hash_in_use(content_hash):
+            return
+        self._stored_bytes -= size
+        try:
+            os.remove(self._blob_path(content_hash))
+        except OSError:
+            pass
+
+    def _hash_in_use(self, content_hash: str) -> bool:
+        row = self._db.execute('SELECT 1 FROM entries WHERE content_hash = ? LIMIT 1', (content_hash,)).fetchone()
+        return row is not None
+
+    def _blob_path(self, content_hash: str) -> str:
+        return os.path.join(self._blobs_directory, content_hash[:2], f'{content_hash}.zz')
+
+    def close(self):
+        with self._lock:
+            self._flush_access()
+            self._db.commit()
+            self._db.close()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            entries = self._db.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+            stored_bytes = self._stored_bytes
+        requests = self._hits + self._misses
+        return {
+            'entries': entries,
+            'stored_bytes': stored_bytes,
+            'max_bytes': self._max_bytes,
+            'hits': self._hits,
+            'misses': self._misses,
+            'hit_ratio': round(self._hits / requests, 3) if requests else 0.0,
+            'expired': self._expired,
+            'stores': self._stores,
+            'evictions': self._evictions,
+            'bytes_served': self._bytes_served,
+            'bytes_written': self._bytes_written,
+        }
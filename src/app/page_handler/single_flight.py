@@ -0,0 +1,65 @@
+import asyncio
+import threading
+from typing import Awaitable, Callable, Dict, Hashable
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+def normalize_url(url: str) -> str:
+    """Приводит URL к каноничному виду: регистр хоста, порядок параметров, без якоря"""
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip('/') or '/'
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, query, ''))
+
+
+class Flight:
+    """Одна выполняющаяся загрузка и число ожидающих её вызовов"""
+
+    def __init__(self, key: Hashable, task: asyncio.Task, token: threading.Event):
+        self.key = key
+        self.task = task
+        self.token = token
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Реестр выполняющихся загрузок: одновременные вызовы с одним ключом ждут одну загрузку"""
+
+    def __init__(self):
+        self._flights: Dict[Hashable, Flight] = {}
+        self._started_total = 0
+        self._coalesced_total = 0
+
+    def join(self, key: Hashable, start: Callable[[threading.Event], Awaitable]) -> tuple[Flight, bool]:
+        """Присоединяется к загрузке по ключу или запускает новую. Возвращает (flight, is_leader)"""
+        flight = self._flights.get(key)
+        is_leader = flight is None
+        if is_leader:
+            token = threading.Event()
+            flight = Flight(key=key, task=asyncio.ensure_future(start(token)), token=token)
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(flight))
+            self._started_total += 1
+        else:
+            self._coalesced_total += 1
+        flight.waiters += 1
+        return flight, is_leader
+
+    def leave(self, flight: Flight):
+        """Отсоединяется от загрузки; последний ушедший отменяет незавершённую загрузку"""
+        flight.waiters -= 1
+        if flight.waiters <= 0 and not flight.task.done():
+            self._forget(flight)
+            flight.token.set()
+            flight.task.cancel()
+
+    def _forget(self, flight: Flight):
+        if self._flights.get(flight.key) is flight:
+            del self._flights[flight.key]
+
+    def get_stats(self) -> Dict:
+        return {
+            'in_flight': len(self._flights),
+            'started_total': self._started_total,
+            'coalesced_total': self._coalesced_total,
+        }
@@ -0,0 +1,239 @@
+"""Корпус страниц для бенчмарков PageParser.
+
+Синтетические страницы повторяют разметку Metal Archives и покрывают все
+extract_* методы, включая крайние случаи: маленькие и огромные группы,
+сплиты, многодисковые релизы, участники с длинной историей и выдачи на
+500 строк. Страницы, записанные benchmarks.recorder в каталог fixtures/,
+добавляются к корпусу и заменяют синтетические с тем же именем.
+"""
+import json
+import os
+from typing import Dict
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+FIXTURE_EXTENSIONS = ('.html', '.json')
+BASE = 'https://www.metal-archives.com'
+
+COUNTRIES = ['Sweden', 'Norway', 'Finland', 'Germany', 'United States', 'Brazil', 'Japan']
+GENRES = ['Melodic Death Metal', 'Black Metal', 'Heavy/Power Metal', 'Doom/Sludge Metal', 'Thrash Metal']
+
+
+def _chrome(body: str) -> str:
+    """Обвязка страницы: меню, скрипты и подвал, которые парсер пропускает"""
+    menu = ''.join(
+        '<div class="menu"><ul>'
+        + ''.join(f'<li><a href="{BASE}/section/{i}/{j}">Item {j}</a></li>' for j in range(20))
+        + '</ul></div>'
+        for i in range(40)
+    )
+    footer = (
+        '<div id="auditTrail"><table><tr><td>Added by: <a href="#">user</a></td></tr></table></div>'
+        '<div id="footer">' + '<p>Metal Archives &amp; friends</p>' * 200 + '</div>'
+    )
+    return (
+        '<html><head><title>Metal Archives</title><script type="text/javascript">var siteRoot = "/";</script></head>'
+        f'<body><div id="wrapper">{menu}<div id="content_wrapper">{body}</div>{footer}</div></body></html>'
+    )
+
+
+def _band_anchor(i: int, quote: str = '"') -> str:
+    return f'<a href={quote}{BASE}/bands/Band_{i}_%26_Co/{i}{quote}>Band {i} &amp; Co</a>'
+
+
+def _album_anchor(i: int) -> str:
+    return f'<a href="{BASE}/albums/Band_{i}/Album_{i}/{i + 10000}">Album {i}</a>'
+
+
+def _lineup(kind: str, size: int) -> str:
+    rows = ''.join(
+        f'<tr class="lineupRow"><td width="200"><a href="{BASE}/artists/Artist_{i}/{1000 + i}" class="bold">Artist {i}</a></td>'
+        f'<td>Guitars ({1990 + i % 20}-present)</td></tr>'
+        f'<tr class="lineupBandsRow"><td colspan="2">See also: <a href="{BASE}/bands/Other_{i}/{5000 + i}">Other {i}</a>, '
+        f'ex-Defunct {i}, <a href="{BASE}/bands/Side_{i}/{6000 + i}">Side {i}</a></td></tr>'
+        for i in range(size)
+    )
+    return f'<div id="band_tab_members_{kind}"><div class="ui-tabs-panel-wrapper"><table class="display lineupTable">{rows}</table></div></div>'
+
+
+def band_page(band_id: int, members: int, albums: int) -> str:
+    discography = ''.join(
+        f'<tr><td><a href="{BASE}/albums/Band/Album_{i}/{band_id * 100 + i}" class="album">Album {i}</a></td>'
+        f'<td class="album">Full-length</td><td class="album">{1990 + i % 30}</td></tr>'
+        for i in range(albums)
+    )
+    body = (
+        f'<div id="band_content"><div id="band_sidebar">'
+        f'<div class="band_name_img"><a class="image" id="logo" href="{BASE}/images/{band_id}_logo.jpg"><img src="x"/></a></div>'
+        f'<div class="band_img"><a class="image" id="photo" href="{BASE}/images/{band_id}_photo.jpg"><img src="y"/></a></div></div>'
+        f'<div id="band_info"><h1 class="band_name"><a href="{BASE}/bands/Band_{band_id}/{band_id}">Band {band_id}</a></h1>'
+        '<div class="clear"></div><div id="band_stats">'
+        '<dl class="float_left"><dt>Country of origin:</dt><dd><a href="#">Sweden</a></dd><dt>Location:</dt><dd>Gothenburg</dd>'
+        '<dt>Status:</dt><dd class="active">Active</dd><dt>Formed in:</dt><dd>1990</dd></dl>'
+        '<dl class="float_right"><dt>Genre:</dt><dd>Melodic Death Metal</dd><dt>Themes:</dt><dd>War, Death</dd>'
+        '<dt>Current label:</dt><dd><a href="#">Nuclear Blast</a></dd></dl>'
+        '<dl class="clear"><dt>Years active:</dt><dd>1990-1995 (as Ceremony),\n      1995-present</dd></dl></div></div>'
+        f'<div id="band_tabs"><div id="band_members">{_lineup("all", members * 2)}{_lineup("current", members)}{_lineup("past", members)}</div>'
+        f'<div id="band_disco"><table class="display discog">{discography}</table></div></div></div>'
+    )
+    return _chrome(body)
+
+
+def album_page(album_id: int, bands: int, discs: int, tracks_per_disc: int) -> str:
+    band_links = ' / '.join(f'<a href="{BASE}/bands/Band_{i}/{i + 1}">Band {i}</a>' for i in range(bands))
+    rows = []
+    for disc in range(discs):
+        if discs > 1:
+            rows.append(f'<tr class="discRow"><td colspan="4">Disc {disc + 1}</td></tr>')
+        for side in ('A', 'B'):
+            rows.append(f'<tr><td colspan="4">Side {side}</td></tr>')
+            for i in range(tracks_per_disc // 2):
+                track_id = album_id * 1000 + disc * 100 + i
+                rows.append(
+                    f'<tr class="{"even" if i % 2 else "odd"}"><td width="20"><a name="{track_id}" class="anchor"> </a>{i + 1}.</td>'
+                    f'<td class="wrapWords">Track {i} &amp; more</td><td align="right">0{i % 10}:3{i % 6}</td>'
+                    f'<td nowrap="nowrap"><a href="#{track_id}" id="lyricsButton{track_id}">Show lyrics</a></td></tr>'
+                )
+    body = (
+        f'<div id="album_content"><div id="album_sidebar"><div class="album_img">'
+        f'<a class="image" id="cover" href="{BASE}/images/{album_id}.jpg"><img/></a></div></div>'
+        f'<div id="album_info"><h1 class="album_name"><a href="{BASE}/albums/Band/Album/{album_id}">Album {album_id}</a></h1>'
+        f'<h2 class="band_name">{band_links}</h2>'
+        '<dl class="float_left"><dt>Type:</dt><dd>Split</dd><dt>Release date:</dt><dd>May 1st, 2000</dd></dl>'
+        '<dl class="float_right"><dt>Label:</dt><dd>Label X</dd></dl></div>'
+        f'<div id="album_tabs"><div id="album_tabs_tracklist"><table class="display table_lyrics">{"".join(rows)}</table></div>'
+        '<div id="album_tabs_lineup">' + '<p>lineup</p>' * 200 + '</div></div></div>'
+    )
+    return _chrome(body)
+
+
+def _member_bands(count: int, albums: int) -> str:
+    return ''.join(
+        f'<div class="member_in_band"><h3 class="member_in_band_name"><a href="{BASE}/bands/Band_{i}/{i + 1}#band_tab_members">Band {i}</a></h3>'
+        '<p class="member_in_band_role">Vocals (1995-2005)</p><table>'
+        + ''.join(
+            f'<tr><td>{1995 + j}</td><td><a href="{BASE}/albums/Band_{i}/Album_{j}/{i * 1000 + j}">Album {j}</a></td><td>Vocals\t</td></tr>'
+            for j in range(albums)
+        )
+        + '</table></div>'
+        for i in range(count)
+    )
+
+
+def member_page(member_id: int, bands: int, albums: int) -> str:
+    body = (
+        f'<div id="member_content"><div id="member_info"><h1 class="band_member_name">Artist {member_id}</h1>'
+        f'<div class="member_img"><a class="image" id="artist" href="{BASE}/images/artist_{member_id}.jpg"><img/></a></div>'
+        '<dl class="float_left"><dt>Real/full name:</dt><dd>Artist</dd><dt>Age:</dt><dd>45 (born Jan 1st, 1980)</dd></dl>'
+        '<dl class="float_right"><dt>Place of birth:</dt><dd>Sweden (Gothenburg)</dd><dt>Gender:</dt><dd>Male</dd></dl>'
+        f'<div class="clear band_comment"><h2>Biography</h2>Played in <a href="{BASE}/bands/Band_1/2">Band 1</a>.\n\t</div></div>'
+        f'<div id="member_tabs"><div id="artist_tab_active">{_member_bands(bands // 2, albums)}</div>'
+        f'<div id="artist_tab_past">{_member_bands(bands, albums)}</div>'
+        f'<div id="artist_tab_guest">{_member_bands(bands // 4, 2)}</div>'
+        f'<div id="artist_tab_live">{_member_bands(bands // 4, 1)}</div></div></div>'
+        f'<script type="text/javascript">var artistId = {member_id};</script>'
+    )
+    return _chrome(body)
+
+
+def _datatable(rows: list[list[str]]) -> str:
+    return json.dumps({'error': '', 'iTotalRecords': len(rows), 'iTotalDisplayRecords': len(rows), 'sEcho': 1, 'aaData': rows})
+
+
+def listing_pages(size: int) -> Dict[str, str]:
+    return {
+        'search_band_info': _datatable([
+            [_band_anchor(i), GENRES[i % len(GENRES)], COUNTRIES[i % len(COUNTRIES)]] for i in range(size)
+        ]),
+        'search_album_info': _datatable([
+            [_band_anchor(i), _album_anchor(i), 'Full-length', f'March 3rd, {1990 + i % 30} <!-- {1990 + i % 30}-03-03 -->']
+            for i in range(size)
+        ]),
+        'advanced_search_band_info': _datatable([
+            [_band_anchor(i), GENRES[i % len(GENRES)], COUNTRIES[i % len(COUNTRIES)]] for i in range(size)
+        ]),
+        'advanced_search_album_info': _datatable([
+            [_band_anchor(i), _album_anchor(i), 'Split'] for i in range(size)
+        ]),
+        'advanced_search_song_info': _datatable([
+            [_band_anchor(i), _album_anchor(i), 'Full-length', f'Song {i} &amp; Reprise',
+             f'<a href="javascript:;" id="lyricsLink_{i + 20000}" title="Toggle lyrics display" class="viewLyrics">Show lyrics</a>']
+            for i in range(size)
+        ]),
+        'bands_by_letter': _datatable([
+            [_band_anchor(i, "'"), COUNTRIES[i % len(COUNTRIES)], GENRES[i % len(GENRES)], '<span class="active">Active</span>']
+            for i in range(size)
+        ]),
+        'bands_by_country': _datatable([
+            [_band_anchor(i, "'"), GENRES[i % len(GENRES)], 'Gothenburg', '<span class="split_up">Split-up</span>']
+            for i in range(size)
+        ]),
+        'rip_artists': _datatable([
+            [f'<a href="{BASE}/artists/Artist_{i}/{i + 1}">Artist {i}</a>', COUNTRIES[i % len(COUNTRIES)],
+             ', '.join(_band_anchor(i + j) for j in range(3)), f'{1990 + i % 30}-01-01', 'Unknown']
+            for i in range(size)
+        ]),
+    }
+
+
+def other_pages() -> Dict[str, str]:
+    similar = ''.join(
+        f'<tr><td><a href="{BASE}/bands/Band_{i}/{i + 1}">Band {i}</a></td><td>{COUNTRIES[i % len(COUNTRIES)]}</td>'
+        f'<td>{GENRES[i % len(GENRES)]}</td><td>{200 - i}</td></tr>'
+        for i in range(100)
+    )
+    discography = ''.join(
+        f'<tr><td><a href="{BASE}/albums/Band/Album_{i}/{i + 1}" class="album">Album {i}</a></td>'
+        f'<td class="album">Full-length</td><td class="album">{1980 + i % 45}</td></tr>'
+        for i in range(150)
+    )
+    links = ''.join(
+        f'<tr><td><a href="https://example.com/{i}" target="_blank">Site {i}</a></td></tr>' for i in range(40)
+    )
+    stats = (
+        '<div id="content"><p>There is a total of <span class="active">70000</span> active, <span class="on_hold">2000</span> on hold, '
+        '<span class="split_up">60000</span> split-up, <span class="changed_name">4000</span> changed name and '
+        '<span class="unknown">9000</span> unknown.</p><p>Albums: <strong>450000</strong></p><p>Songs: <strong>3500000</strong></p></div>'
+    )
+    return {
+        'band_similar_info': f'<html><body><table id="artist_list"><thead><tr><th>Name</th></tr></thead><tbody>{similar}</tbody></table></body></html>',
+        'discography_info': f'<html><body><table class="display discog"><tbody>{discography}</tbody></table></body></html>',
+        'lyrics_info': '<html><body>' + 'Line of lyrics<br/>\n' * 60 + '</body></html>',
+        'band_description': '<html><body>' + f'Founded by <a href="{BASE}/artists/A/1">A</a>. ' * 80 + '</body></html>',
+        'social_links': f'<html><body><table id="linksTableOfficial">{links}</table></body></html>',
+        'stats_info': _chrome(stats),
+    }
+
+
+def recorded_names() -> list[str]:
+    """Имена страниц, записанных benchmarks.recorder"""
+    if not os.path.isdir(FIXTURES_DIR):
+        return []
+    return [
+        os.path.splitext(filename)[0]
+        for filename in sorted(os.listdir(FIXTURES_DIR)) if filename.endswith(FIXTURE_EXTENSIONS)
+    ]
+
+
+def load_corpus() -> Dict[str, tuple[str, str]]:
+    """Имя страницы -> (экстрактор, содержимое)"""
+    corpus: Dict[str, tuple[str, str]] = {
+        'band_info-small': ('extract_band_info', band_page(1, members=3, albums=3)),
+        'band_info-huge': ('extract_band_info', band_page(2, members=40, albums=120)),
+        'album_info-single': ('extract_album_info', album_page(1, bands=1, discs=1, tracks_per_disc=10)),
+        'album_info-split': ('extract_album_info', album_page(2, bands=4, discs=1, tracks_per_disc=16)),
+        'album_info-multi_cd': ('extract_album_info', album_page(3, bands=1, discs=4, tracks_per_disc=20)),
+        'member_info-short': ('extract_member_info', member_page(1, bands=2, albums=2)),
+        'member_info-long': ('extract_member_info', member_page(2, bands=40, albums=15)),
+    }
+    for name, payload in listing_pages(500).items():
+        corpus[f'{name}-500'] = (f'extract_{name}', payload)
+    for name, payload in other_pages().items():
+        corpus[name] = (f'extract_{name}', payload)
+
+    for filename in sorted(os.listdir(FIXTURES_DIR)) if os.path.isdir(FIXTURES_DIR) else ():
+        name, extension = os.path.splitext(filename)
+        if extension not in FIXTURE_EXTENSIONS:
+            continue
+        with open(os.path.join(FIXTURES_DIR, filename), encoding='utf-8') as file:
+            corpus[name] = (f"extract_{name.split('-')[0]}", file.read())
+    return corpus
@@ -0,0 +1,95 @@
+"""Сравнение бэкендов PageParser по скорости, пиковой памяти и результату.
+
+Страницы берутся из каталога, имя файла начинается с имени экстрактора без
+префикса extract_: band_info.html, album_info-2.html, search_band_info.json и т.д.
+Вариант задаётся как бэкенд с необязательным суффиксом +selective (разбор только
+нужных областей страницы) или +full (разбор страницы целиком).
+
+    cd src && python -m benchmarks.parser_backends pages/ --backends html.parser+full lxml+selective
+"""
+import argparse
+import dataclasses
+import os
+import time
+import tracemalloc
+from typing import Any
+
+from app.page_handler.data_parser.parser import PageParser
+
+# Поля, которые зависят от времени разбора, а не от страницы
+VOLATILE_FIELDS = {'updated_at'}
+
+
+def parser_for(variant: str) -> type[PageParser]:
+    backend, _, mode = variant.partition('+')
+    attributes = {'backend': backend}
+    if mode:
+        attributes['selective'] = mode == 'selective'
+    return type(f'PageParser[{variant}]', (PageParser,), attributes)
+
+
+def normalize(value: Any) -> Any:
+    if dataclasses.is_dataclass(value):
+        value = dataclasses.asdict(value)
+    if isinstance(value, dict):
+        return {key: normalize(item) for key, item in value.items() if key not in VOLATILE_FIELDS}
+    if isinstance(value, (list, tuple)):
+        return [normalize(item) for item in value]
+    return value
+
+
+def extractor_name(filename: str) -> str | None:
+    stem = os.path.splitext(filename)[0].split('-')[0]
+    name = f'extract_{stem}'
+    return name if hasattr(PageParser, name) else None
+
+
+def measure(parser: type[PageParser], extractor: str, data: str, repeat: int) -> tuple[float, int, Any]:
+    method = getattr(parser, extractor)
+    tracemalloc.start()
+    result = method(data)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        method(data)
+    return (time.perf_counter() - started) / repeat, peak, normalize(result)
+
+
+def main():
+    arguments = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arguments.add_argument('pages', help='Каталог с сохранёнными страницами')
+    arguments.add_argument('--backends', nargs='+', default=['html.parser+full', 'html.parser+selective', 'lxml+selective'])
+    arguments.add_argument('--repeat', type=int, default=20)
+    args = arguments.parse_args()
+
+    baseline, *others = args.backends
+    parsers = {backend: parser_for(backend) for backend in args.backends}
+    mismatches = 0
+
+    print(f"{'страница':<32} {'вариант':<22} {'мс/вызов':>10} {'ускорение':>10} {'пик, КБ':>10}  совпадает")
+    for filename in sorted(os.listdir(args.pages)):
+        extractor = extractor_name(filename)
+        if extractor is None:
+            continue
+        with open(os.path.join(args.pages, filename), encoding='utf-8') as file:
+            data = file.read()
+
+        base_time, base_peak, base_result = measure(parsers[baseline], extractor, data, args.repeat)
+        print(f"{filename:<32} {baseline:<22} {base_time * 1000:>10.2f} {1.0:>10.2f} {base_peak / 1024:>10.0f}  -")
+        for backend in others:
+            elapsed, peak, result = measure(parsers[backend], extractor, data, args.repeat)
+            same = result == base_result
+            mismatches += not same
+            print(
+                f"{'':<32} {backend:<22} {elapsed * 1000:>10.2f} {base_time / elapsed:>10.2f} "
+                f"{peak / 1024:>10.0f}  {'да' if same else 'НЕТ'}"
+            )
+
+    if mismatches:
+        raise SystemExit(f"Результаты отличаются от {baseline}: {mismatches}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Запись страниц Metal Archives в корпус бенчмарков.
+
+Страницы загружаются тем же MetalArchivesPageHandler, что и в сервисе,
+и сохраняются в benchmarks/fixtures/<экстрактор>-<метка>.<ext>. Имя задаётся
+как <экстрактор>-<метка>=<url>; без аргументов записывается набор по умолчанию.
+Текстам песен нужен id трека, их URL передаётся аргументом.
+
+После записи базовые замеры обновляются, а сравнение только по записанным
+страницам запускается с --recorded:
+
+    cd src && python -m benchmarks.recorder
+    cd src && python -m benchmarks.recorder lyrics_info-battery=https://www.metal-archives.com/release/ajax-view-lyrics/id/<id>
+    cd src && python -m benchmarks.suite --recorded --update-baseline
+"""
+import argparse
+import os
+
+from app.page_handler.browser_pool import BrowserPool
+from app.page_handler.handler import MetalArchivesPageHandler
+from benchmarks.fixtures import FIXTURES_DIR
+
+BASE = 'https://www.metal-archives.com'
+
+DEFAULT_PAGES = {
+    'band_info-metallica': f'{BASE}/band/view/id/125',
+    'band_info-iron_maiden': f'{BASE}/band/view/id/25',
+    'album_info-master_of_puppets': f'{BASE}/albums/view/id/547',
+    'member_info-hetfield': f'{BASE}/artists/please_dont_ban_me/184',
+    'discography_info-metallica': f'{BASE}/band/discography/id/125/tab/all',
+    'band_similar_info-metallica': f'{BASE}/band/ajax-recommendations/id/125',
+    'band_description-metallica': f'{BASE}/band/read-more/id/125',
+    'social_links-metallica': f'{BASE}/link/ajax-list/type/band/id/125',
+    'search_band_info-iron': f'{BASE}/search/ajax-band-search/?field=name&query=iron',
+    'search_album_info-live': f'{BASE}/search/ajax-album-search/?field=title&query=live',
+    'advanced_search_band_info-iron': f'{BASE}/search/ajax-advanced/searching/bands/?bandName=iron',
+    'advanced_search_album_info-live': f'{BASE}/search/ajax-advanced/searching/albums/?releaseTitle=live',
+    'advanced_search_song_info-battery': f'{BASE}/search/ajax-advanced/searching/songs/?songTitle=battery',
+    'bands_by_letter-a': f'{BASE}/browse/ajax-letter/l/A?iDisplayStart=0',
+    'bands_by_country-se': f'{BASE}/browse/ajax-country/c/SE?iDisplayStart=0&iSortCol_0=0&sSortDir_0=asc&iSortingCols=1',
+    'rip_artists-2020': f'{BASE}/artist/ajax-rip?sSearch=2020&iDisplayStart=0&iDisplayLength=100&iSortCol_0=3&sSortDir_0=desc&iSortingCols=1',
+    'stats_info': f'{BASE}/stats',
+}
+
+
+def parse_page(argument: str) -> tuple[str, str]:
+    name, separator, url = argument.partition('=')
+    if not separator or not url:
+        raise argparse.ArgumentTypeError(f'Ожидается <экстрактор>-<метка>=<url>: {argument}')
+    return name, url
+
+
+def main():
+    arguments = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arguments.add_argument('pages', nargs='*', type=parse_page, help='<экстрактор>-<метка>=<url>')
+    args = arguments.parse_args()
+    pages = dict(args.pages) or DEFAULT_PAGES
+
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    with BrowserPool() as pool:
+        handler = MetalArchivesPageHandler(pool=pool)
+        for name, url in pages.items():
+            data = handler._get_data(url, save_screenshot=False)
+            if data.error is not None or data.html is None:
+                print(f'{name}: {data.error}')
+                continue
+            extension = 'json' if data.html.lstrip().startswith('{') else 'html'
+            path = os.path.join(FIXTURES_DIR, f'{name}.{extension}')
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write(data.html)
+            print(f'{name}: {len(data.html)} байт -> {path}')
+
+
+if __name__ == '__main__':
+    main()
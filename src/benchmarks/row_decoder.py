@@ -0,0 +1,139 @@
+"""Стоимость разбора одной строки aaData: прежний разбор через BeautifulSoup и
+html.unescape против row_decoder. Строки синтетические, в формате Metal Archives.
+
+    cd src && python -m benchmarks.row_decoder --rows 500
+"""
+import argparse
+import html
+import re
+import time
+from typing import Callable
+
+from bs4 import BeautifulSoup
+
+from app.page_handler.data_parser import row_decoder as rows
+from app.utils.utils import slug_string
+
+
+def album_search_row(i: int) -> list[str]:
+    return [
+        f'<a href="https://www.metal-archives.com/bands/Band_{i}_%26_Co/{i}">Band {i} &amp; Co</a>',
+        f'<a href="https://www.metal-archives.com/albums/Band_{i}/Album/{i + 1}">Album {i}</a>',
+        'Full-length',
+        'March 3rd, 1999 <!-- 1999-03-03 -->',
+    ]
+
+
+def song_search_row(i: int) -> list[str]:
+    return [
+        f'<a href="https://www.metal-archives.com/bands/Band_{i}/{i}" title="Band {i} (SE)">Band {i}</a>',
+        f'<a href="https://www.metal-archives.com/albums/Band_{i}/Album/{i + 1}">Album {i}</a>',
+        'Full-length',
+        f'Song {i}',
+        f'<a href="javascript:;" id="lyricsLink_{i + 2}" title="Toggle lyrics display" class="viewLyrics">Show lyrics</a>',
+    ]
+
+
+def letter_row(i: int) -> list[str]:
+    return [
+        f"<a href='https://www.metal-archives.com/bands/Band_{i}/{i}'>Band {i}</a>",
+        'Sweden',
+        'Melodic Death Metal',
+        '<span class="active">Active</span>',
+    ]
+
+
+def soup_album_search(row: list[str]) -> tuple:
+    band = BeautifulSoup(row[0], 'html.parser').find('a')
+    album = BeautifulSoup(row[1], 'html.parser').find('a')
+    return (
+        int(band.get('href').split('/').pop()), band.text.strip(), slug_string(band.text.strip()),
+        int(album.get('href').split('/').pop()), album.text.strip(), slug_string(album.text.strip()),
+    )
+
+
+def decoder_album_search(row: list[str]) -> tuple:
+    band_href, band_name = rows.first_anchor(row[0])
+    album_href, album_name = rows.first_anchor(row[1])
+    return (
+        int(band_href.split('/').pop()), band_name, rows.slug(band_name),
+        int(album_href.split('/').pop()), album_name, rows.slug(album_name),
+    )
+
+
+def soup_song_search(row: list[str]) -> tuple:
+    escaped = [html.escape(cell, quote=False) for cell in row]
+    band_link = html.unescape(escaped[0])
+    album_link = html.unescape(escaped[1])
+    song_link = BeautifulSoup(html.unescape(escaped[4]), 'html.parser').find('a', href='javascript:;')
+    return (
+        int(song_link.get('id').split('lyricsLink_')[1]),
+        re.search(r'">([^<]+)</a>', band_link).group(1), int(re.search(r'/(\d+)"', band_link).group(1)),
+        re.search(r'">([^<]+)</a>', album_link).group(1), int(re.search(r'/(\d+)"', album_link).group(1)),
+    )
+
+
+def decoder_song_search(row: list[str]) -> tuple:
+    return (
+        int(rows.lyrics_id(row[4])),
+        rows.link_text(row[0]), int(rows.link_id(row[0])),
+        rows.link_text(row[1]), int(rows.link_id(row[1])),
+    )
+
+
+def soup_letter(row: list[str]) -> tuple:
+    escaped = [html.escape(cell, quote=False) for cell in row]
+    content = html.unescape(escaped[0])
+    name = re.search(r"'>([^<]+)</a>", content).group(1)
+    return (
+        int(re.search(r"/(\d+)'", content).group(1)), name, slug_string(name),
+        escaped[2].strip(), escaped[1].strip(),
+        re.search(r'>([^<]+)<', html.unescape(escaped[3])).group(1),
+    )
+
+
+def decoder_letter(row: list[str]) -> tuple:
+    band_id, name = rows.browse_link(row[0])
+    return (
+        int(band_id), name, rows.slug(name),
+        rows.escaped(row[2]).strip(), rows.escaped(row[1]).strip(),
+        rows.tag_text(row[3]),
+    )
+
+
+CASES: list[tuple[str, Callable[[int], list[str]], Callable, Callable]] = [
+    ('search_album_info', album_search_row, soup_album_search, decoder_album_search),
+    ('advanced_search_song_info', song_search_row, soup_song_search, decoder_song_search),
+    ('bands_by_letter', letter_row, soup_letter, decoder_letter),
+]
+
+
+def per_row(decode: Callable, data: list[list[str]], repeat: int) -> tuple[float, list]:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = [decode(row) for row in data]
+    return (time.perf_counter() - started) / (repeat * len(data)), result
+
+
+def main():
+    arguments = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arguments.add_argument('--rows', type=int, default=500)
+    arguments.add_argument('--repeat', type=int, default=5)
+    args = arguments.parse_args()
+
+    print(f"{'экстрактор':<28} {'soup, мкс/строка':>18} {'decoder, мкс/строка':>20} {'ускорение':>10}  совпадает")
+    for name, make_row, soup_decode, fast_decode in CASES:
+        data = [make_row(i) for i in range(args.rows)]
+        soup_time, soup_result = per_row(soup_decode, data, args.repeat)
+        # Кеш slug сбрасывается, чтобы в замер попал и холодный первый проход
+        rows.slug.cache_clear()
+        fast_time, fast_result = per_row(fast_decode, data, args.repeat)
+        same = soup_result == fast_result
+        print(
+            f"{name:<28} {soup_time * 1e6:>18.1f} {fast_time * 1e6:>20.1f} "
+            f"{soup_time / fast_time:>10.1f}  {'да' if same else 'НЕТ'}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""Регрессионный бенчмарк PageParser на корпусе из benchmarks.fixtures.
+
+Для каждой страницы снимаются пропускная способность, p50/p99 времени
+разбора, пик памяти и число блоков по tracemalloc, а также хэш результата.
+
+Абсолютное время зависит от машины и её загрузки, поэтому для сравнения
+с baseline.json страница измеряется раундами вперемешку с эталонной
+работой (разбор фиксированной страницы стандартным html.parser). В базу
+попадает медиана отношения «самый быстрый вызов / эталон»; её рост или
+рост пика памяти больше порога, как и изменившийся результат, считаются
+регрессией.
+
+    cd src && python -m benchmarks.suite
+    cd src && python -m benchmarks.suite --update-baseline
+    cd src && python -m benchmarks.suite --recorded
+"""
+import argparse
+import gc
+import hashlib
+import json
+import os
+import statistics
+import time
+import tracemalloc
+from typing import Callable
+
+from app.core.config import settings
+from benchmarks.fixtures import band_page, load_corpus, recorded_names
+from benchmarks.parser_backends import normalize, parser_for
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+ROUNDS = 5
+
+
+def digest(value) -> str:
+    return hashlib.sha256(json.dumps(normalize(value), sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def reference_work() -> Callable[[], object]:
+    reference = parser_for('html.parser+full')
+    data = band_page(0, members=10, albums=10)
+    return lambda: reference._soup(data)
+
+
+def timed(call: Callable[[], object], repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def run(method: Callable[[str], object], data: str, repeat: int, reference: Callable[[], object]) -> dict:
+    # Первый вызов заполняет кэши (slug, регулярные выражения), он не должен попадать в пик памяти
+    method(data)
+    tracemalloc.start()
+    result = method(data)
+    peak = tracemalloc.get_traced_memory()[1]
+    blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics('filename'))
+    tracemalloc.stop()
+
+    # Сборщик мусора отключён на время замеров, иначе его паузы попадают в случайные вызовы
+    gc.collect()
+    gc.disable()
+    try:
+        timings, ratios = [], []
+        for _ in range(ROUNDS):
+            calibration = min(timed(reference, 3))
+            chunk = timed(lambda: method(data), max(1, repeat // ROUNDS))
+            timings.extend(chunk)
+            ratios.append(min(chunk) / calibration)
+    finally:
+        gc.enable()
+
+    timings.sort()
+    return {
+        'pages_per_second': round(len(timings) / sum(timings), 1),
+        'p50_ms': round(statistics.median(timings) * 1000, 3),
+        'p99_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.99))] * 1000, 3),
+        'relative': round(statistics.median(ratios), 4),
+        'peak_kb': round(peak / 1024),
+        'blocks': blocks,
+        'digest': digest(result),
+    }
+
+
+def regressions(name: str, current: dict, baseline: dict, threshold: float) -> list[str]:
+    problems = []
+    if current['digest'] != baseline['digest']:
+        problems.append(f'{name}: изменился результат разбора')
+    if current['relative'] > baseline['relative'] * (1 + threshold):
+        problems.append(f"{name}: время относительно эталона {baseline['relative']} -> {current['relative']}")
+    if current['peak_kb'] > baseline['peak_kb'] * (1 + threshold):
+        problems.append(f"{name}: пик памяти {baseline['peak_kb']} -> {current['peak_kb']} КБ")
+    return problems
+
+
+def main():
+    arguments = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arguments.add_argument('--variant', default=f'{settings.PARSER_BACKEND}+{"selective" if settings.PARSER_SELECTIVE else "full"}')
+    arguments.add_argument('--repeat', type=int, default=30)
+    arguments.add_argument('--threshold', type=float, default=0.25, help='Допустимое ухудшение, доля от базового замера')
+    arguments.add_argument('--only', nargs='*', default=None, help='Имена страниц из корпуса')
+    arguments.add_argument('--recorded', action='store_true', help='Только страницы, записанные benchmarks.recorder')
+    arguments.add_argument('--update-baseline', action='store_true')
+    args = arguments.parse_args()
+
+    parser = parser_for(args.variant)
+    reference = reference_work()
+    corpus = load_corpus()
+    if args.only:
+        corpus = {name: page for name, page in corpus.items() if name in args.only}
+    recorded = set(recorded_names())
+    if args.recorded:
+        if not recorded:
+            raise SystemExit('Записанных страниц нет: запустите python -m benchmarks.recorder')
+        corpus = {name: page for name, page in corpus.items() if name in recorded}
+
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, encoding='utf-8') as file:
+            baseline = json.load(file).get(args.variant, {})
+
+    results = {}
+    problems = []
+    print(f"{'страница':<34} {'стр/с':>9} {'p50, мс':>9} {'p99, мс':>9} {'пик, КБ':>9} {'блоков':>8}  к базе  источник")
+    for name, (extractor, data) in corpus.items():
+        current = results[name] = run(getattr(parser, extractor), data, args.repeat, reference)
+        base = baseline.get(name)
+        ratio = f"{current['relative'] / base['relative']:.2f}x" if base else '-'
+        print(
+            f"{name:<34} {current['pages_per_second']:>9} {current['p50_ms']:>9} {current['p99_ms']:>9} "
+            f"{current['peak_kb']:>9} {current['blocks']:>8}  {ratio:>6}  {'запись' if name in recorded else 'синтетика'}"
+        )
+        if base is not None:
+            problems.extend(regressions(name, current, base, args.threshold))
+
+    if args.update_baseline:
+        stored = {}
+        if os.path.exists(BASELINE_PATH):
+            with open(BASELINE_PATH, encoding='utf-8') as file:
+                stored = json.load(file)
+        stored[args.variant] = {**stored.get(args.variant, {}), **results}
+        with open(BASELINE_PATH, 'w', encoding='utf-8') as file:
+            json.dump(stored, file, indent=2, ensure_ascii=False, sort_keys=True)
+            file.write('\n')
+        print(f'Базовые замеры сохранены: {BASELINE_PATH}')
+        return
+
+    if problems:
+        raise SystemExit('Регрессии:\n' + '\n'.join(problems))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,17 @@
 import uvicorn
-from seleniumbase import SB
 
 from app.api.application import MetalParserAPI
+from app.page_handler.async_handler import AsyncPageHandler
+from app.page_handler.browser_pool import BrowserPool
+from app.page_handler.clearance import ClearanceManager
 from app.page_handler.handler import MetalArchivesPageHandler
+from app.page_handler.http_fetcher import HttpFetcher
+from app.page_handler.parse_memo import ParseMemo
+from app.page_handler.parse_pool import ParsePool
+from app.page_handler.rate_limiter import AdaptiveRateLimiter
+from app.page_handler.resource_blocking import ResourceBlocker
+from app.page_handler.response_cache import ResponseCache
+from app.core.config import settings
 
 # export PYTHON_KEYRING_BACKEND=keyring.backends.null.Keyring
 
@@ -11,7 +20,42 @@ if __name__ == "__main__":
     print("Документация: http://localhost:8000/docs")
     print("Для получения информации о случайной группе: GET http://localhost:8000/api/band/random")
 
-    with SB(uc=True, incognito=True, locale="en") as sb:
-        page_handler = MetalArchivesPageHandler(sb=sb)
+    pool = BrowserPool()
+    http_fetcher = HttpFetcher() if settings.HTTP_FAST_PATH_ENABLED else None
+    rate_limiter = AdaptiveRateLimiter() if settings.RATE_LIMIT_ENABLED else None
+    # Cookies загружаются до запуска браузеров, чтобы попасть в каждый из них
+    clearance = ClearanceManager(pool=pool, rate_limiter=rate_limiter)
+    if http_fetcher is not None:
+        clearance.subscribe(http_fetcher.update_identity)
+    clearance.load()
+    with pool:
+        clearance.start()
+        cache = ResponseCache() if settings.RESPONSE_CACHE_ENABLED else None
+        parse_pool = ParsePool() if settings.PARSE_POOL_ENABLED else None
+        if parse_pool is not None:
+            parse_pool.start()
+
+        page_handler = AsyncPageHandler(
+            MetalArchivesPageHandler(
+                pool=pool,
+                http_fetcher=http_fetcher,
+                clearance=clearance,
+                cache=cache,
+                rate_limiter=rate_limiter,
+                resource_blocker=ResourceBlocker(),
+                parse_pool=parse_pool,
+                parse_memo=ParseMemo() if settings.PARSE_MEMO_ENABLED else None,
+            )
+        )
         app = MetalParserAPI(page_handler=page_handler)
-        uvicorn.run(app, host="0.0.0.0", port=8000)
+        try:
+            uvicorn.run(app, host="0.0.0.0", port=8000)
+        finally:
+            clearance.close()
+            page_handler.close()
+            if http_fetcher is not None:
+                http_fetcher.close()
+            if cache is not None:
+                cache.close()
+            if parse_pool is not None:
+                parse_pool.close()
@@ -0,0 +1,105 @@
+"""Сохранение группы с дискографией: альбомы загружаются и записываются в базу."""
+import asyncio
+import itertools
+
+from app.api.routes.band.router import BandRouter
+from app.page_handler.data_parser.models import AlbumInformation, AlbumShortInformation, BandInformation
+from app.page_handler.models import PageInfo
+
+
+class FakeCursor:
+    def __init__(self, documents: list[dict]):
+        self.documents = documents
+
+    async def to_list(self, length: int | None = None) -> list[dict]:
+        return self.documents
+
+
+class FakeAlbums:
+    def __init__(self):
+        self.documents: dict[int, dict] = {}
+        self._ids = itertools.count(1)
+
+    def find(self, query: dict, projection: dict | None = None) -> FakeCursor:
+        return FakeCursor([dict(self.documents[album_id]) for album_id in query['id']['$in'] if album_id in self.documents])
+
+    async def bulk_write(self, operations: list, ordered: bool = True):
+        upserted = {}
+        for index, operation in enumerate(operations):
+            album_id = operation._filter['id']
+            if album_id not in self.documents:
+                upserted[index] = next(self._ids)
+            self.documents[album_id] = {**operation._doc, '_id': upserted.get(index) or self.documents[album_id]['_id']}
+        return type('BulkWriteResult', (), {'upserted_ids': upserted})()
+
+
+class FakeBands:
+    def __init__(self):
+        self.documents: dict[int, dict] = {}
+
+    async def find_one_and_replace(self, query: dict, document: dict, projection: dict | None = None, upsert: bool = False):
+        previous = self.documents.get(query['id'])
+        self.documents[query['id']] = document
+        return previous
+
+
+class FakeStats:
+    async def band_changed(self, *args, **kwargs):
+        pass
+
+    async def albums_changed(self, *args, **kwargs):
+        pass
+
+
+class FakePageHandler:
+    def __init__(self, albums: dict[int, AlbumInformation]):
+        self.albums = albums
+        self.requested: list[int] = []
+
+    async def get_album_info(self, url: str, **kwargs) -> PageInfo:
+        album_id = int(url.rsplit('/', 1)[1])
+        self.requested.append(album_id)
+        return PageInfo(url=url, processing_time=0.0, data=self.albums[album_id])
+
+
+def make_router(albums: dict[int, AlbumInformation]) -> BandRouter:
+    router = BandRouter.__new__(BandRouter)
+    router.page_handler = FakePageHandler(albums)
+    router.db = type('FakeDatabase', (), {'albums': FakeAlbums(), 'bands': FakeBands()})()
+    router.stats = FakeStats()
+    return router
+
+
+def band_with(album_ids: list[int]) -> BandInformation:
+    return BandInformation(
+        id=1, name='Band', status='Active',
+        discography=[AlbumShortInformation(id=album_id) for album_id in album_ids],
+    )
+
+
+def test_unparseable_album_does_not_break_band_ingest():
+    router = make_router({
+        10: AlbumInformation(id=10, title='First Album', type='Full-length'),
+        11: AlbumInformation(parsing_error='Ошибка при разборе HTML: boom'),
+    })
+    asyncio.run(router._replace_band_in_db(band_with([10, 11])))
+
+    stored = router.db.bands.documents[1]
+    assert stored['name'] == 'Band'
+    assert 10 in router.db.albums.documents
+
+
+def test_unparseable_album_is_retried_by_next_ingest():
+    router = make_router({
+        10: AlbumInformation(id=10, title='First Album', type='Full-length'),
+        11: AlbumInformation(parsing_error='Ошибка при разборе HTML: boom'),
+    })
+    asyncio.run(router._replace_band_in_db(band_with([10, 11])))
+    assert 11 not in router.db.albums.documents
+    assert router.db.bands.documents[1]['discography'] == [router.db.albums.documents[10]['_id']]
+
+    router.page_handler.albums[11] = AlbumInformation(id=11, title='Second Album', type='EP')
+    router.page_handler.requested.clear()
+    asyncio.run(router._replace_band_in_db(band_with([10, 11])))
+    assert router.page_handler.requested == [11]
+    assert 11 in router.db.albums.documents
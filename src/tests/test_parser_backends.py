@@ -0,0 +1,47 @@
+"""lxml и выборочный разбор (SoupStrainer) против прежнего разбора html.parser
+по всей странице на страницах корпуса бенчмарков."""
+from functools import lru_cache
+
+import pytest
+from bs4.builder import builder_registry
+
+from app.page_handler.data_parser.parser import PageParser, resolve_backend
+from benchmarks.fixtures import load_corpus
+from benchmarks.parser_backends import normalize, parser_for
+
+# Разбор до появления выбора бэкенда и SoupStrainer
+REFERENCE = 'html.parser+full'
+VARIANTS = ['html.parser+selective', 'lxml+full', 'lxml+selective']
+
+CORPUS = load_corpus()
+
+
+@lru_cache(maxsize=None)
+def reference_result(name: str):
+    extractor, data = CORPUS[name]
+    return normalize(getattr(parser_for(REFERENCE), extractor)(data))
+
+
+@pytest.mark.parametrize('variant', VARIANTS)
+@pytest.mark.parametrize('name', sorted(CORPUS))
+def test_variant_matches_reference(name: str, variant: str):
+    if variant.startswith('lxml') and builder_registry.lookup('lxml') is None:
+        pytest.skip('lxml не установлен')
+    extractor, data = CORPUS[name]
+    assert normalize(getattr(parser_for(variant), extractor)(data)) == reference_result(name)
+
+
+def test_selective_falls_back_when_region_is_missing():
+    """Если разметка сдвинулась за пределы областей, страница разбирается целиком"""
+    extractor, data = CORPUS['band_info-small']
+    # Состав группы оказывается вне разбираемых областей
+    moved = data.replace('<div id="band_members">', '<div id="band_lineup">', 1)
+    assert moved != data
+    result = normalize(getattr(parser_for('html.parser+selective'), extractor)(moved))
+    assert result['current_lineup']
+    assert result == normalize(getattr(parser_for(REFERENCE), extractor)(moved))
+
+
+def test_unknown_backend_falls_back_to_html_parser():
+    assert resolve_backend('no-such-builder') == 'html.parser'
+    assert PageParser.backend in ('html.parser', 'lxml')